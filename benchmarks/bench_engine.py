@@ -0,0 +1,57 @@
+"""Compare the Python and NumPy simulation engines on a large input.
+
+Run from the repository root after ``pip install -e .``:
+
+    python benchmarks/bench_engine.py [--cells N] [--frames N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from no_more_secrets.core.cell_store import CellStore
+from no_more_secrets.effects.engine import HAS_NUMPY, NumpyEngine, PythonEngine
+from no_more_secrets.effects.nms_effect import NMSEffect
+
+
+def make_cells(count: int) -> CellStore:
+    """Build masked characters with reveal times spread over five seconds."""
+    cells = CellStore()
+    for _ in range(count):
+        cells.append('a', 'X', 1, False, random.randint(100, 5000))
+    return cells
+
+
+def run(engine_class: type, cells: int, frames: int) -> float:
+    """Return the average milliseconds per simulated frame."""
+    effect = NMSEffect()
+    char_attrs = make_cells(cells)
+    engine = engine_class(effect, char_attrs)
+    start = time.perf_counter()
+    for _ in range(frames):
+        engine.step(0, cells, 33)
+    return (time.perf_counter() - start) * 1000.0 / frames
+
+
+def main() -> None:
+    """Run the benchmark and print one line per engine."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cells', type=int, default=200_000)
+    parser.add_argument('--frames', type=int, default=30)
+    args = parser.parse_args()
+
+    engines: list[type] = [PythonEngine]
+    if HAS_NUMPY:
+        engines.append(NumpyEngine)
+    else:
+        print("NumPy is not installed; only the python engine is measured")
+
+    for engine_class in engines:
+        ms = run(engine_class, args.cells, args.frames)
+        print(f"{engine_class.name:>6}: {ms:8.2f} ms/frame for {args.cells} cells")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Measure how parsing colored input scales with its size.
+
+Run from the repository root after ``pip install -e .``:
+
+    python benchmarks/bench_ingest.py [--max-mb N]
+
+Sizes double from 1 MB up to ``--max-mb``. With a linear-time parser the
+throughput stays roughly flat as the input grows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from no_more_secrets.effects.nms_effect import NMSEffect
+
+# A line of ``ls --color=always`` output, escape sequences included
+LINE = "\033[01;34msrc\033[0m  \033[01;32mbuild.sh\033[0m  README.md  \033[01;36mlatest\033[0m\n"
+
+
+def run(megabytes: int) -> float:
+    """Return the throughput in MB/s for an input of the given size."""
+    text = LINE * (megabytes * 1024 * 1024 // len(LINE))
+    effect = NMSEffect()
+    effect.set_preserve_colors(True)
+    start = time.perf_counter()
+    effect.parse_ansi_text(text)
+    return len(text) / (1024 * 1024) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Run the benchmark and print one line per input size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-mb', type=int, default=16)
+    args = parser.parse_args()
+
+    megabytes = 1
+    while megabytes <= args.max_mb:
+        print(f"{megabytes:>5} MB: {run(megabytes):8.2f} MB/s")
+        megabytes *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Measure render throughput with terminal I/O taken out.
+
+The whole effect runs against a headless backend, which never sleeps, so
+the frame rate is bound only by simulation and drawing. Run from the
+repository root after ``pip install -e .``:
+
+    python benchmarks/bench_render.py [--rows N] [--cols N] [--lines N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from no_more_secrets.core.output import HeadlessBackend
+from no_more_secrets.effects.nms_effect import NMSEffect
+
+
+def make_text(lines: int, cols: int) -> str:
+    """Build colored log lines that fill the screen width."""
+    body = "x" * max(1, cols - 24)
+    return "".join(
+        f"\033[32m{index:06d}\033[0m INFO  {body}\n" for index in range(lines)
+    )
+
+
+def main() -> None:
+    """Run the effect once and print frames per second and bytes per frame."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50)
+    parser.add_argument('--cols', type=int, default=200)
+    parser.add_argument('--lines', type=int, default=50)
+    parser.add_argument('--keep-screen', action='store_true',
+                        help='Also replay frames onto the in-memory screen')
+    args = parser.parse_args()
+
+    backend = HeadlessBackend(args.rows, args.cols, keep_screen=args.keep_screen)
+    effect = NMSEffect()
+    effect.set_backend(backend)
+    effect.set_seed(1)
+
+    start = time.perf_counter()
+    effect.execute(make_text(args.lines, args.cols))
+    seconds = time.perf_counter() - start
+
+    frames = max(1, backend.frames)
+    print(
+        f"{backend.frames} frames in {seconds:.2f} s: {backend.frames / seconds:.0f} frames/s, "
+        f"{backend.total_bytes / frames:.0f} bytes/frame"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+"""Benchmark the hot paths against a stored baseline.
+
+Each hot path runs over synthetic corpora (ASCII logs, ``ls --color``
+output, ``tree -C`` output, CJK and emoji text) at several sizes:
+
+- ``parse_ansi_text``: ANSI parsing into a cell store
+- ``apply_clustering``: reveal time clustering of the parsed cells
+- ``get_char_width``: display width of each character
+- ``fix_encoding_issues``: mojibake repair of the raw text
+- ``frame``: the whole effect on one screen of the corpus, rendered
+  headless, per frame
+
+Every result records operations per second, nanoseconds per cell (a
+character, or a screen cell for frames), its time relative to a fixed
+reference loop timed alongside it and, for frames, bytes per frame. The
+results are compared with the baseline file, and the run fails when a
+relative time or bytes per frame grows past the baseline by more than the
+threshold. Relative times ride out a busy machine far better than raw
+ones, but still differ between machines and Python versions, so record
+the baseline where the comparison runs. Parsing, clustering and frames
+depend on the simulation engine, so the suite pins one, the pure-Python
+engine unless ``--engine numpy`` is given, and the baseline records it;
+results are only compared with a baseline of the same engine. Run from
+the repository root after ``pip install -e .``:
+
+    python benchmarks/bench_suite.py [--sizes 1K,1M,100M] [--engine numpy] [--save]
+
+A 100M corpus takes a few GB of memory while it is parsed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import timeit
+from typing import Callable, Dict, List
+
+from no_more_secrets.core.output import HeadlessBackend
+from no_more_secrets.effects.engine import HAS_NUMPY
+from no_more_secrets.effects.nms_effect import NMSEffect
+from no_more_secrets.utils.encoding import fix_encoding_issues, get_char_width
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Results slower or larger than the baseline by more than this fraction
+# count as regressions
+DEFAULT_THRESHOLD = 0.3
+
+# Characters measured per call of the per-character benchmarks, which cost
+# the same per character at any size
+CHAR_SAMPLE = 1 << 16
+
+# Seconds the rounds of one measurement should take at most
+ROUND_BUDGET = 10
+
+# Screen the frame benchmark renders on
+ROWS = 24
+COLS = 80
+
+UNITS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+Result = Dict[str, float]
+
+
+def parse_size(value: str) -> int:
+    """Parse a size such as ``1K``, ``64K`` or ``100M`` into bytes."""
+    value = value.strip().upper()
+    try:
+        if value[-1:] in UNITS:
+            return int(float(value[:-1]) * UNITS[value[-1]])
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid size '{value}'. Use a number of bytes such as 1K or 100M")
+
+
+def format_size(size: int) -> str:
+    """Format a size in bytes as parsed by :func:`parse_size`."""
+    for unit in ("G", "M", "K"):
+        if size >= UNITS[unit] and size % UNITS[unit] == 0:
+            return f"{size // UNITS[unit]}{unit}"
+    return str(size)
+
+
+def log_lines(rng: random.Random) -> str:
+    """Build plain log lines, a few with mojibake left by a wrong decoding."""
+    levels = ["INFO", "INFO", "INFO", "DEBUG", "WARN", "ERROR"]
+    messages = [
+        "request served in {} ms",
+        "cache miss for key user:{}",
+        "retrying connection, attempt {}",
+        "donâ€™t know how to handle job {}",
+        "worker {} finished batch",
+    ]
+    return "".join(
+        f"2024-05-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:"
+        f"{rng.randint(0, 59):02d}.{rng.randint(0, 999):03d} {rng.choice(levels):<5} "
+        f"[worker-{rng.randint(1, 16)}] {rng.choice(messages).format(rng.randint(1, 9999))}\n"
+        for _ in range(256)
+    )
+
+
+def ls_lines(rng: random.Random) -> str:
+    """Build ``ls --color=always`` output: colored names in columns."""
+    kinds = ["01;34", "01;32", "01;36", "00", "00", "01;31", "01;35"]
+    lines = []
+    for _ in range(256):
+        names = []
+        for _ in range(4):
+            name = f"{rng.choice(['src', 'build', 'notes', 'data', 'run'])}_{rng.randint(1, 999)}"
+            kind = rng.choice(kinds)
+            entry = name if kind == "00" else f"\033[{kind}m{name}\033[0m"
+            names.append(entry + " " * (16 - len(name)))
+        lines.append("".join(names).rstrip() + "\n")
+    return "".join(lines)
+
+
+def tree_lines(rng: random.Random) -> str:
+    """Build ``tree -C`` output: box drawing branches and colored names."""
+    lines = []
+    for _ in range(256):
+        depth = rng.randint(0, 4)
+        branch = rng.choice(["├── ", "└── "])
+        name = f"{rng.choice(['lib', 'tests', 'docs', 'main', 'util'])}{rng.randint(1, 99)}"
+        if rng.random() < 0.4:
+            name = f"\033[01;34m{name}\033[0m"
+        elif rng.random() < 0.2:
+            name = f"\033[01;32m{name}.sh\033[0m"
+        else:
+            name += ".py"
+        lines.append("│   " * depth + branch + name + "\n")
+    return "".join(lines)
+
+
+def cjk_lines(rng: random.Random) -> str:
+    """Build wide CJK text with emoji, including joined and modified ones."""
+    words = ["日本語", "中文字符", "한국어", "テスト", "東京", "数据", "😀", "🚀", "👍🏽", "👨‍👩‍👧", "🇯🇵", "❤️"]
+    return "".join(" ".join(rng.choice(words) for _ in range(rng.randint(4, 12))) + "\n" for _ in range(256))
+
+
+CORPORA: Dict[str, Callable[[random.Random], str]] = {
+    "ascii-logs": log_lines,
+    "ls-color": ls_lines,
+    "tree-color": tree_lines,
+    "cjk-emoji": cjk_lines,
+}
+
+
+def make_corpus(name: str, size: int) -> str:
+    """Build about ``size`` bytes of UTF-8 text of a corpus, ending on a whole line.
+
+    A block of random lines is built once and repeated, so even the
+    largest corpora are built quickly and always hold the same text.
+    """
+    block = CORPORA[name](random.Random(name))
+    block_bytes = len(block.encode("utf-8"))
+    text = block * (size // block_bytes + 1)
+    text = text[:max(1, size * len(block) // block_bytes)]
+    end = text.rfind("\n")
+    return text[:end + 1] if end > 0 else text
+
+
+def reference() -> None:
+    """Fixed pure Python work that results are timed against."""
+    table: Dict[int, str] = {}
+    for i in range(2000):
+        table[i & 63] = str(i)
+
+
+def significant(value: float) -> float:
+    """Round a measurement to the digits that are worth storing."""
+    return float(f"{value:.4g}")
+
+
+def timed(func: Callable[[], object], cells: int, repeat: int) -> Result:
+    """Time a call as ops/sec, ns/cell and relative to the reference.
+
+    As with timeit, each round makes enough calls to take at least 0.2 s
+    and the best round counts. Every round times the reference right
+    before the call, and the relative time is the median of the rounds'
+    ratios, so load that comes and goes slows both sides of a ratio
+    rather than one result. Calls so slow that the rounds would take over
+    ``ROUND_BUDGET`` seconds get fewer rounds.
+    """
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    base_timer = timeit.Timer(reference)
+    base_number, _ = base_timer.autorange()
+    times = []
+    ratios = []
+    for _ in range(max(1, min(repeat, int(ROUND_BUDGET / elapsed)))):
+        base = base_timer.timeit(base_number) / base_number
+        seconds = timer.timeit(number) / number
+        times.append(seconds)
+        ratios.append(seconds / base)
+    seconds = min(times)
+    return {
+        "ops_per_sec": significant(1 / seconds),
+        "ns_per_cell": significant(seconds * 1e9 / max(1, cells)),
+        "relative_time": significant(statistics.median(ratios)),
+    }
+
+
+def bench_corpus(name: str, size: int, repeat: int, engine: str) -> Dict[str, Result]:
+    """Run the text benchmarks on one corpus at one size."""
+    text = make_corpus(name, size)
+    sample = text[:CHAR_SAMPLE]
+    effect = NMSEffect()
+    effect.set_engine(engine)
+    effect.set_seed(1)
+    effect.set_preserve_colors(True)
+    cells = effect.parse_ansi_text(text)
+    label = f"{name}/{format_size(size)}"
+
+    def widths() -> None:
+        for char in sample:
+            get_char_width(char)
+
+    return {
+        f"parse_ansi_text/{label}": timed(lambda: effect.parse_ansi_text(text), len(text), repeat),
+        f"apply_clustering/{label}": timed(lambda: effect._apply_clustering(cells), len(cells), repeat),
+        f"get_char_width/{label}": timed(widths, len(sample), repeat),
+        f"fix_encoding_issues/{label}": timed(lambda: fix_encoding_issues(text), len(text), repeat),
+    }
+
+
+def bench_frame(name: str, repeat: int, engine: str) -> Dict[str, Result]:
+    """Run the whole effect on one screen of a corpus and measure its frames."""
+    text = "".join(make_corpus(name, 1 << 16).splitlines(keepends=True)[:ROWS])
+
+    def run() -> HeadlessBackend:
+        backend = HeadlessBackend(ROWS, COLS, keep_screen=False)
+        effect = NMSEffect()
+        effect.set_backend(backend)
+        effect.set_engine(engine)
+        effect.set_seed(1)
+        effect.set_auto_decrypt(True)
+        effect.set_preserve_colors(True)
+        effect.execute(text)
+        return backend
+
+    # Seeded runs on a virtual clock always draw the same frames
+    backend = run()
+    frames = max(1, backend.frames)
+    result = timed(run, frames * ROWS * COLS, repeat)
+    result["ops_per_sec"] = significant(result["ops_per_sec"] * frames)
+    result["bytes_per_frame"] = significant(backend.total_bytes / frames)
+    return {f"frame/{name}": result}
+
+
+def changes(result: Result, old: Result) -> Dict[str, float]:
+    """Get the growth of each compared metric over its baseline, as a fraction."""
+    return {
+        metric: result[metric] / old[metric] - 1 if old[metric] else 0.0
+        for metric in ("relative_time", "bytes_per_frame")
+        if metric in result and metric in old
+    }
+
+
+def regressions(results: Dict[str, Result], baseline: Dict[str, Result], threshold: float) -> List[str]:
+    """Get the names of the results that grew past the threshold."""
+    return [
+        name for name, result in results.items()
+        if any(change > threshold for change in changes(result, baseline.get(name, {})).values())
+    ]
+
+
+def rerun(name: str, repeat: int, engine: str) -> Dict[str, Result]:
+    """Measure a result again, along with the others of its corpus and size."""
+    bench, corpus, *size = name.split("/")
+    if bench == "frame":
+        return bench_frame(corpus, repeat, engine)
+    return bench_corpus(corpus, parse_size(size[0]), repeat, engine)
+
+
+def report(results: Dict[str, Result], baseline: Dict[str, Result]) -> None:
+    """Print each result next to its baseline."""
+    print(f"{'benchmark':<36} {'ops/s':>12} {'ns/cell':>10} {'bytes/frame':>12}  vs baseline")
+    for name, result in results.items():
+        growth = changes(result, baseline.get(name, {}))
+        bytes_per_frame = result.get("bytes_per_frame", "")
+        print(
+            f"{name:<36} {result['ops_per_sec']:>12,.1f} {result['ns_per_cell']:>10.4g} {bytes_per_frame:>12}  "
+            + (", ".join(f"{metric} {change:+.0%}" for metric, change in growth.items()) or "new")
+        )
+
+
+def load_baseline(path: str, engine: str) -> Dict[str, Result]:
+    """Read the results of a baseline file measured with an engine.
+
+    Returns:
+        The results, or none if the file does not exist or was recorded
+        with another engine.
+    """
+    try:
+        with open(path, encoding="utf-8") as stream:
+            document = json.load(stream)
+    except FileNotFoundError:
+        return {}
+    if document.get("engine") != engine:
+        print(f"Baseline {path} was not recorded with the {engine} engine; nothing to compare",
+              file=sys.stderr)
+        return {}
+    return document["results"]
+
+
+def write_results(path: str, results: Dict[str, Result], engine: str) -> None:
+    """Write results with a note of the machine and engine they were measured on."""
+    document = {
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "engine": engine,
+        "results": dict(sorted(results.items())),
+    }
+    with open(path, "w", encoding="utf-8") as stream:
+        json.dump(document, stream, indent=2)
+        stream.write("\n")
+
+
+def main() -> None:
+    """Run the suite, compare it with the baseline and exit 1 on regressions."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=lambda value: [parse_size(size) for size in value.split(',')],
+                        default='1K,64K,1M', help='Corpus sizes (default: 1K,64K,1M)')
+    parser.add_argument('--corpora', type=lambda value: value.split(','), default=list(CORPORA),
+                        help=f"Corpora to run (default: {','.join(CORPORA)})")
+    parser.add_argument('--repeat', type=int, default=5, help='Rounds per measurement; the best counts')
+    parser.add_argument('--engine', choices=['python', 'numpy'], default='python',
+                        help='Simulation engine to measure (default: python, which needs no NumPy)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Allowed slowdown or growth before failing (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--baseline', default=BASELINE, help='Baseline file to compare with')
+    parser.add_argument('--save', action='store_true',
+                        help='Store the results in the baseline file instead of failing on regressions')
+    parser.add_argument('--json', metavar='FILE', help='Also write the results of this run to FILE')
+    args = parser.parse_args()
+
+    unknown = set(args.corpora) - set(CORPORA)
+    if unknown:
+        parser.error(f"unknown corpora: {', '.join(sorted(unknown))}")
+    if args.engine == 'numpy' and not HAS_NUMPY:
+        parser.error("the numpy engine requires NumPy")
+
+    results: Dict[str, Result] = {}
+    for name in args.corpora:
+        for size in args.sizes:
+            results.update(bench_corpus(name, size, args.repeat, args.engine))
+        results.update(bench_frame(name, args.repeat, args.engine))
+
+    baseline = load_baseline(args.baseline, args.engine)
+    if not args.save:
+        # Load that comes and goes can still slow a single result, so only
+        # regressions that hold up when measured again count
+        again: Dict[str, Result] = {}
+        for name in regressions(results, baseline, args.threshold):
+            if name not in again:
+                again.update(rerun(name, args.repeat, args.engine))
+            if again[name]["relative_time"] < results[name]["relative_time"]:
+                results[name] = again[name]
+    report(results, baseline)
+    failed = regressions(results, baseline, args.threshold)
+    if args.json:
+        write_results(args.json, results, args.engine)
+    if args.save:
+        # Results of other sizes stay, so quick and full runs share a file
+        write_results(args.baseline, {**baseline, **results}, args.engine)
+        print(f"Baseline saved to {args.baseline}")
+    elif failed:
+        print(f"\n{len(failed)} regression(s) past {args.threshold:.0%}:", file=sys.stderr)
+        for name in failed:
+            growth = changes(results[name], baseline[name])
+            print(f"  {name}: " + ", ".join(f"{metric} {change:+.0%}" for metric, change in growth.items()),
+                  file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
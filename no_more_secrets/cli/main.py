@@ -3,14 +3,22 @@
 from __future__ import annotations
 
 import argparse
-import re
 import sys
+from typing import Iterable
 
 from no_more_secrets import __version__
-from no_more_secrets.utils.ansi import has_ansi_codes
 
+from ..core.asciicast import AsciicastBackend, open_recording
+from ..core.charset import CHARSETS, load_charset_file, parse_unicode_ranges
+from ..core.clock import RealClock
+from ..core.scheduler import DEFAULT_FPS
+from ..effects.engine import DEFAULT_CHURN_RATE, ENGINES
+from ..effects.export import export_animation
+from ..effects.follow import DEFAULT_SCROLLBACK
 from ..effects.nms_effect import NMSEffect
-from ..utils.input_handler import get_input
+from ..utils.encoding import load_encoding_fixes
+from ..utils.input_handler import get_input, iter_file_chunks, iter_input_chunks
+from ..utils.normalize import normalize_screen
 
 
 def test_colors() -> None:
@@ -30,10 +38,43 @@ def test_colors() -> None:
     print("  tree -C | nms -a -o")
 
 
-def check_for_ansi_colors(text: str) -> bool:
-    """Check if text contains ANSI color codes."""
-    ansi_pattern = re.compile(r'\033\[[0-9;]*m')
-    return bool(ansi_pattern.search(text))
+def print_frame_stats(effect: NMSEffect) -> None:
+    """Print output statistics from the last run to stderr."""
+    if effect.frame_writer is None:
+        return
+    stats = effect.frame_writer.stats()
+    print(f"frames: {stats['frames']}", file=sys.stderr)
+    print(f"bytes: {stats['total_bytes']} ({stats['bytes_per_frame']:.1f}/frame)", file=sys.stderr)
+    print(f"writes: {stats['total_syscalls']} ({stats['syscalls_per_frame']:.2f}/frame)", file=sys.stderr)
+
+
+def parse_duration(value: str) -> float:
+    """Parse a duration such as '1.5s', '800ms' or '2' into seconds."""
+    text = value.strip().lower()
+    scale = 1.0
+    if text.endswith('ms'):
+        text, scale = text[:-2], 0.001
+    elif text.endswith('s'):
+        text = text[:-1]
+    try:
+        seconds = float(text) * scale
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid duration '{value}'")
+    if seconds < 0:
+        raise argparse.ArgumentTypeError(f"duration must not be negative: '{value}'")
+    return seconds
+
+
+def parse_size(value: str) -> tuple[int, int]:
+    """Parse a screen size such as '80x24' into (rows, columns)."""
+    cols, sep, rows = value.strip().lower().partition('x')
+    try:
+        size = int(rows), int(cols)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size '{value}', use COLUMNSxROWS")
+    if not sep or min(size) <= 0:
+        raise argparse.ArgumentTypeError(f"invalid size '{value}', use COLUMNSxROWS")
+    return size
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -48,6 +89,9 @@ Examples:
   nms "Secret message"
   echo "Custom color" | nms -a -x FF6600
   ls --color=always | nms -a -o  # Force colors through pipe
+  tail -f app.log | nms --follow  # Decrypt each new line as it arrives
+  nms -a --record demo.cast "Secret"  # Record an asciicast without waiting
+  nms --export secret.svg "Secret"  # Save an animation for a web page
         """
     )
     
@@ -62,6 +106,46 @@ Examples:
                        help='Use custom hex color (e.g., FF0000 for red, 00FF00 for green)')
     parser.add_argument('-o', '--original', action='store_true',
                        help='Preserve original terminal colors from command output')
+    parser.add_argument('--charset', choices=list(CHARSETS), default='full',
+                       help='Characters used to scramble the text (default: full)')
+    parser.add_argument('--charset-file', metavar='FILE',
+                       help='Scramble with the characters in a UTF-8 text file')
+    parser.add_argument('--charset-ranges', metavar='RANGES',
+                       help='Scramble with Unicode code points, e.g. U+2500-U+257F,2588')
+    parser.add_argument('--fps', type=float, default=DEFAULT_FPS,
+                       help=f'Maximum frames per second (default: {DEFAULT_FPS:g})')
+    parser.add_argument('--speed', type=float, default=1.0,
+                       help='Animation speed multiplier, e.g. 2 for twice as fast (default: 1)')
+    parser.add_argument('--type-duration', type=parse_duration, metavar='DURATION',
+                       help='How long typing out the scrambled text takes, e.g. 1.5s or 800ms')
+    parser.add_argument('-i', '--input', metavar='FILE',
+                       help='Read the text from a file, mapped into memory and read only as far as shown')
+    parser.add_argument('--follow', action='store_true',
+                       help='Keep reading piped input and decrypt each new line as it arrives (tail -f)')
+    parser.add_argument('--normalize', action='store_true',
+                       help='Replay carriage returns, backspaces and cursor moves in the input and '
+                            'decrypt only the final screen, e.g. for progress bars')
+    parser.add_argument('--encoding-fixes', metavar='FILE',
+                       help='Also repair the garbled text in a JSON file mapping it to the correct text')
+    parser.add_argument('--scrollback', type=int, default=DEFAULT_SCROLLBACK, metavar='LINES',
+                       help=f'Lines kept in memory in follow mode (default: {DEFAULT_SCROLLBACK})')
+    parser.add_argument('--churn-rate', type=float, default=DEFAULT_CHURN_RATE, metavar='RATE',
+                       help=f'Mask changes per second of each scrambled character (default: {DEFAULT_CHURN_RATE:.2f})')
+    parser.add_argument('--engine', choices=ENGINES, default='auto',
+                       help='Simulation engine; auto uses NumPy when installed (default: auto)')
+    parser.add_argument('--seed', type=int,
+                       help='Seed the random masks and reveal times for a reproducible run')
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--record', metavar='FILE',
+                       help='Render the effect into an asciicast v2 file instead of the terminal, '
+                            'as fast as it can be computed; compressed if FILE ends in .gz')
+    output.add_argument('--export', metavar='FILE',
+                       help='Write the effect as a self-contained animation instead of running it; '
+                            'SVG or HTML by the extension of FILE')
+    parser.add_argument('--record-size', type=parse_size, default='80x24', metavar='COLSxROWS',
+                       help='Screen size of the recording; an export uses only its width (default: 80x24)')
+    parser.add_argument('--stats', action='store_true',
+                       help='Print bytes and write calls per frame to stderr when done')
     parser.add_argument('--test-colors', action='store_true',
                        help='Test color output and exit')
     parser.add_argument('-v', '--version', action='version', version=f'nms-python {__version__}')
@@ -80,22 +164,39 @@ def main() -> None:
         test_colors()
         return
     
-    # Get input text
-    if args.text:
+    # Get input text; files and piped input are streamed so the effect
+    # starts before the whole input is read
+    text: str | None = None
+    chunks: Iterable[str]
+    if args.input:
+        if args.text:
+            print("Error: Give either TEXT or --input FILE, not both", file=sys.stderr)
+            sys.exit(1)
+        try:
+            chunks = iter_file_chunks(args.input)
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    elif args.text:
         text = args.text
+        chunks = [text]
+    elif sys.stdin.isatty():
+        text = get_input("Enter text: ")
+        chunks = [text]
     else:
-        text = get_input("Enter text: " if sys.stdin.isatty() else None)
+        chunks = iter_input_chunks()
     
-    # Show helpful message if -o flag used but no colors detected
-    if args.original:
-        if not has_ansi_codes(text):
-            print("⚠️  No colors detected in input. To force colors through pipes:", file=sys.stderr)
-            print("   ls --color=always | nms -a -o", file=sys.stderr)
-            print("   tree -C | nms -a -o", file=sys.stderr)
-            print("   Get-ChildItem | Out-String -Stream | nms -a -o", file=sys.stderr)
-            print("", file=sys.stderr)
+    if args.normalize:
+        if args.follow:
+            print("Error: --normalize needs the whole input and cannot be used with --follow", file=sys.stderr)
+            sys.exit(1)
+        try:
+            text = normalize_screen(chunks)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
     
-    if not text.strip():
+    if text is not None and not text.strip():
         print("Error: No input provided.", file=sys.stderr)
         sys.exit(1)
     
@@ -104,6 +205,24 @@ def main() -> None:
     effect.set_auto_decrypt(args.auto)
     effect.set_mask_blank(args.mask_spaces)
     effect.set_preserve_colors(args.original)
+    effect.set_fps(args.fps)
+    effect.set_speed(args.speed)
+    effect.set_type_duration(args.type_duration)
+    effect.set_scrollback(args.scrollback)
+    effect.set_churn_rate(args.churn_rate)
+    effect.set_engine(args.engine)
+    effect.set_seed(args.seed)
+    effect.set_charset_mode(args.charset)
+    try:
+        if args.encoding_fixes:
+            effect.set_encoding_fixes(load_encoding_fixes(args.encoding_fixes))
+        if args.charset_file:
+            effect.set_custom_charset(load_charset_file(args.charset_file), args.charset_file)
+        elif args.charset_ranges:
+            effect.set_custom_charset(parse_unicode_ranges(args.charset_ranges), args.charset_ranges)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
     
     # Set color - original colors take priority, then hex, then foreground
     if not args.original:
@@ -114,15 +233,68 @@ def main() -> None:
         else:
             effect.set_foreground_color(args.foreground)
     
+    # Export an animation of the whole text instead of running the effect
+    if args.export:
+        if args.follow:
+            print("Error: --export needs the whole input and cannot be used with --follow", file=sys.stderr)
+            sys.exit(1)
+        if text is None:
+            text = "".join(chunks)
+            if not text.strip():
+                print("Error: No input provided.", file=sys.stderr)
+                sys.exit(1)
+        try:
+            export_animation(effect, text, args.export, args.record_size[1])
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+    
+    # Record to a file instead of the terminal
+    recording = None
+    if args.record:
+        try:
+            recording = open_recording(args.record)
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        rows, cols = args.record_size
+        effect.set_backend(AsciicastBackend(recording, rows, cols))
+        if args.follow:
+            # Live input is recorded as it arrives
+            effect.set_clock(RealClock())
+    
     # Execute effect
     try:
-        effect.execute(text)
+        if args.follow:
+            effect.execute_follow(chunks)
+        elif text is None:
+            effect.execute_stream(chunks)
+            if not effect.received_text:
+                print("Error: No input provided.", file=sys.stderr)
+                sys.exit(1)
+        else:
+            effect.execute(text)
+        
+        # Show helpful message if -o flag used but no colors detected
+        if args.original and not effect.saw_ansi:
+            print("⚠️  No colors detected in input. To force colors through pipes:", file=sys.stderr)
+            print("   ls --color=always | nms -a -o", file=sys.stderr)
+            print("   tree -C | nms -a -o", file=sys.stderr)
+            print("   Get-ChildItem | Out-String -Stream | nms -a -o", file=sys.stderr)
+            print("", file=sys.stderr)
+        
+        if args.stats:
+            print_frame_stats(effect)
     except KeyboardInterrupt:
         print("\nInterrupted by user", file=sys.stderr)
         sys.exit(1)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if recording is not None:
+            recording.close()
 
 
 if __name__ == "__main__":
@@ -2,31 +2,62 @@
 
 from __future__ import annotations
 
+from .asciicast import AsciicastBackend, open_recording
+from .cell_store import CellStore, CellView, StyleTable
 from .char_attr import CharAttr
 from .charset import (
     CHARSET, 
+    CHARSETS,
+    Charset,
     get_random_char,
     get_random_char_excluding_control,
     get_random_printable_char,
     get_random_extended_char,
     get_random_box_drawing_char,
+    get_charset,
+    load_charset_file,
+    parse_unicode_ranges,
+    register_charset,
 )
-from .colors import Colors, get_color_map, get_color_prefix, hex_to_rgb, rgb_to_ansi
+from .clock import Clock, RealClock, VirtualClock
+from .colors import Colors, get_color_map, get_color_prefix, hex_to_rgb, rgb_to_ansi, sgr_color_to_rgb
+from .output import HeadlessBackend, OutputBackend, StreamBackend, TerminalBackend
+from .sgr import SgrState
 from .terminal import Terminal, enable_ansi_colors
 
 __all__ = [
     "CharAttr",
+    "CellStore",
+    "CellView",
+    "StyleTable",
     "CHARSET", 
     "get_random_char",
     "get_random_char_excluding_control",
     "get_random_printable_char", 
     "get_random_extended_char",
     "get_random_box_drawing_char",
+    "get_charset",
+    "CHARSETS",
+    "Charset",
+    "load_charset_file",
+    "parse_unicode_ranges",
+    "register_charset",
+    "Clock",
+    "RealClock",
+    "VirtualClock",
     "Colors",
     "get_color_map",
     "get_color_prefix", 
     "hex_to_rgb",
     "rgb_to_ansi",
+    "sgr_color_to_rgb",
+    "OutputBackend",
+    "TerminalBackend",
+    "StreamBackend",
+    "HeadlessBackend",
+    "AsciicastBackend",
+    "open_recording",
+    "SgrState",
     "Terminal",
     "enable_ansi_colors",
 ]
\ No newline at end of file
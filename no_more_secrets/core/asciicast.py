@@ -0,0 +1,112 @@
+"""Asciicast v2 recordings of the effect.
+
+:class:`AsciicastBackend` writes every frame as an output event of an
+asciicast v2 file, as played by asciinema, stamped with the time on the
+run's clock. Under the default virtual clock a recording takes only as
+long as computing its frames, however long the animation plays for.
+Recordings whose file name ends in ``.gz`` are compressed as they are
+written, so they are never held in memory.
+"""
+
+from __future__ import annotations
+
+import codecs
+import gzip
+import json
+import os
+import time
+from typing import BinaryIO, Optional, Tuple
+
+from .clock import Clock, RealClock
+from .output import DEFAULT_COLS, DEFAULT_ROWS, OutputBackend
+
+ASCIICAST_VERSION = 2
+
+# Compression level of .gz recordings; higher levels cost far more CPU for
+# little gain on terminal output
+GZIP_LEVEL = 6
+
+
+def open_recording(path: str) -> BinaryIO:
+    """Open a file to record to, compressing it if its name ends in ``.gz``.
+
+    Args:
+        path: Path of the recording
+
+    Returns:
+        A binary stream the caller must close.
+
+    Raises:
+        OSError: If the file cannot be created
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, "wb", compresslevel=GZIP_LEVEL)  # type: ignore[return-value]
+    return open(path, "wb")
+
+
+class AsciicastBackend(OutputBackend):
+    """Record frames to a binary stream in the asciicast v2 format.
+
+    The header line is written when the run starts; each frame then
+    becomes one ``[time, "o", data]`` event. The run stays on the main
+    screen, so the recording ends on the revealed text.
+    """
+
+    realtime = False
+    alternate_screen = False
+
+    def __init__(
+        self,
+        stream: BinaryIO,
+        rows: int = DEFAULT_ROWS,
+        cols: int = DEFAULT_COLS,
+        title: Optional[str] = None,
+    ) -> None:
+        """Initialize the backend.
+
+        Args:
+            stream: Binary stream the recording is written to
+            rows: Screen height of the recording
+            cols: Screen width of the recording
+            title: Title stored in the header
+        """
+        self.stream = stream
+        self.rows = rows
+        self.cols = cols
+        self.title = title
+        self.clock: Optional[Clock] = None
+        self.events = 0
+        self._start = 0.0
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+
+    def start(self, clock: Clock) -> None:
+        """Write the header and start timing events on the run's clock."""
+        self.clock = clock
+        self._start = clock.monotonic()
+        header = {
+            "version": ASCIICAST_VERSION,
+            "width": self.cols,
+            "height": self.rows,
+            "timestamp": int(time.time()),
+            "env": {"TERM": os.environ.get("TERM", "xterm-256color")},
+        }
+        if self.title:
+            header["title"] = self.title
+        self.stream.write(json.dumps(header).encode("utf-8") + b"\n")
+
+    def get_size(self) -> Tuple[int, int]:
+        """Get the screen size as (rows, columns)."""
+        return self.rows, self.cols
+
+    def write(self, frame: memoryview) -> int:
+        """Append a frame as an output event at the current time."""
+        clock = self.clock
+        if clock is None:
+            # Used on its own, frames are stamped as they arrive
+            clock = RealClock()
+            self.start(clock)
+        elapsed = clock.monotonic() - self._start
+        data = json.dumps(self._decoder.decode(frame), ensure_ascii=False)
+        self.stream.write(f'[{elapsed:.6f}, "o", {data}]\n'.encode("utf-8"))
+        self.events += 1
+        return 1
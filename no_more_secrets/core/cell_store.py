@@ -0,0 +1,393 @@
+"""Compact struct-of-arrays storage for the characters of the effect.
+
+A :class:`CharAttr` object costs a few hundred bytes per character once its
+``__dict__`` and per-character strings are counted. :class:`CellStore` keeps
+the same information in typed arrays instead, about 15 bytes per character:
+
+- ``codes``: source code points, ``array('I')``
+- ``masks``: scramble character code points, ``array('I')``
+- ``reveal_times``: milliseconds left before the reveal, ``array('i')``
+- ``flags``: space and revealed bits plus the display width, ``bytearray``
+- ``style_ids``: index into an interned :class:`StyleTable`, ``array('H')``
+- ``clusters``: full text of the few characters that are grapheme clusters
+  of several code points, by index; ``codes`` holds their first code point
+
+Indexing a store returns a :class:`CellView`, which has the attributes of a
+``CharAttr`` and reads and writes through to the arrays.
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .char_attr import CharAttr
+
+# Bits of a flags byte
+SPACE = 0x01
+REVEALED = 0x02
+WIDTH_SHIFT = 2
+WIDTH_MASK = 0x0C
+
+# array('H') limits the number of distinct styles
+MAX_STYLES = 1 << 16
+
+# Encoding whose code units are array('I') items in native byte order
+UTF32 = 'utf-32-le' if sys.byteorder == 'little' else 'utf-32-be'
+
+
+class StyleTable:
+    """Interned ANSI style prefixes, referenced from cells by index.
+
+    Index 0 is always the empty style. Once the table is full, further new
+    styles map to index 0 and are drawn without a style.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a table holding only the empty style."""
+        self.styles: List[str] = [""]
+        self._index: Dict[str, int] = {"": 0}
+
+    def intern(self, style: str) -> int:
+        """Get the index of a style, adding it to the table if needed."""
+        index = self._index.get(style)
+        if index is None:
+            if len(self.styles) >= MAX_STYLES:
+                return 0
+            index = len(self.styles)
+            self.styles.append(style)
+            self._index[style] = index
+        return index
+
+    def __getitem__(self, index: int) -> str:
+        """Get the style at an index."""
+        return self.styles[index]
+
+    def __len__(self) -> int:
+        """Number of styles in the table."""
+        return len(self.styles)
+
+
+class CellView:
+    """CharAttr-compatible view of one character of a :class:`CellStore`."""
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store: CellStore, index: int) -> None:
+        """Initialize a view.
+
+        Args:
+            store: Store holding the character
+            index: Index of the character in the store
+        """
+        self.store = store
+        self.index = index
+
+    @property
+    def source(self) -> str:
+        """Original character."""
+        cluster = self.store.clusters.get(self.index)
+        return cluster if cluster is not None else chr(self.store.codes[self.index])
+
+    @source.setter
+    def source(self, value: str) -> None:
+        self.store.codes[self.index] = ord(value[0])
+        if len(value) > 1:
+            self.store.clusters[self.index] = value
+        else:
+            self.store.clusters.pop(self.index, None)
+
+    @property
+    def mask(self) -> str:
+        """Scrambled character to display."""
+        return chr(self.store.masks[self.index])
+
+    @mask.setter
+    def mask(self, value: str) -> None:
+        self.store.masks[self.index] = ord(value)
+
+    @property
+    def width(self) -> int:
+        """Display width of the character."""
+        return (self.store.flags[self.index] & WIDTH_MASK) >> WIDTH_SHIFT
+
+    @width.setter
+    def width(self, value: int) -> None:
+        flags = self.store.flags
+        flags[self.index] = (flags[self.index] & ~WIDTH_MASK) | _width_bits(value)
+
+    @property
+    def is_space(self) -> bool:
+        """Whether the character is whitespace that is never masked."""
+        return bool(self.store.flags[self.index] & SPACE)
+
+    @is_space.setter
+    def is_space(self, value: bool) -> None:
+        self._set_flag(SPACE, value)
+
+    @property
+    def is_revealed(self) -> bool:
+        """Whether the character has been revealed."""
+        return bool(self.store.flags[self.index] & REVEALED)
+
+    @is_revealed.setter
+    def is_revealed(self, value: bool) -> None:
+        self._set_flag(REVEALED, value)
+
+    @property
+    def reveal_time(self) -> int:
+        """Time in milliseconds before the character is revealed."""
+        return self.store.reveal_times[self.index]
+
+    @reveal_time.setter
+    def reveal_time(self, value: int) -> None:
+        self.store.reveal_times[self.index] = value
+
+    @property
+    def original_color(self) -> str:
+        """Original ANSI color code."""
+        return self.store.styles[self.store.style_ids[self.index]]
+
+    @original_color.setter
+    def original_color(self, value: str) -> None:
+        self.store.style_ids[self.index] = self.store.styles.intern(value)
+
+    def _set_flag(self, bit: int, value: bool) -> None:
+        """Set or clear one flag bit."""
+        flags = self.store.flags
+        if value:
+            flags[self.index] |= bit
+        else:
+            flags[self.index] &= ~bit
+
+    def __repr__(self) -> str:
+        """String representation for debugging."""
+        return (
+            f"CellView(source={self.source!r}, mask={self.mask!r}, "
+            f"width={self.width}, is_space={self.is_space}, "
+            f"reveal_time={self.reveal_time}, is_revealed={self.is_revealed})"
+        )
+
+
+def _width_bits(width: int) -> int:
+    """Pack a display width (clamped to 0-3) into flag bits."""
+    return (min(max(width, 0), 3) << WIDTH_SHIFT) & WIDTH_MASK
+
+
+class CellStore:
+    """Growable struct-of-arrays store of characters.
+
+    Behaves like a list of :class:`CharAttr` for reading and updating
+    characters: ``len``, indexing and iteration work and return views.
+    """
+
+    def __init__(self, styles: Optional[StyleTable] = None) -> None:
+        """Initialize an empty store.
+
+        Args:
+            styles: Style table to intern styles in; stores that share a
+                table can be appended to each other without remapping
+        """
+        self.codes = array('I')
+        self.masks = array('I')
+        self.reveal_times = array('i')
+        self.flags = bytearray()
+        self.style_ids = array('H')
+        self.clusters: Dict[int, str] = {}
+        self.styles = styles if styles is not None else StyleTable()
+
+    @classmethod
+    def from_attrs(cls, char_attrs: Iterable[Any], styles: Optional[StyleTable] = None) -> CellStore:
+        """Build a store from CharAttr-like objects."""
+        store = cls(styles)
+        store.extend(char_attrs)
+        return store
+
+    def __len__(self) -> int:
+        """Number of characters in the store."""
+        return len(self.flags)
+
+    def __getitem__(self, index: int) -> CellView:
+        """Get a view of the character at an index."""
+        if index < 0:
+            index += len(self.flags)
+        if not 0 <= index < len(self.flags):
+            raise IndexError("cell index out of range")
+        return CellView(self, index)
+
+    def __iter__(self) -> Iterator[CellView]:
+        """Iterate over views of every character."""
+        for index in range(len(self.flags)):
+            yield CellView(self, index)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the arrays, excluding over-allocation."""
+        return (
+            len(self.codes) * self.codes.itemsize
+            + len(self.masks) * self.masks.itemsize
+            + len(self.reveal_times) * self.reveal_times.itemsize
+            + len(self.flags)
+            + len(self.style_ids) * self.style_ids.itemsize
+        )
+
+    def append(
+        self,
+        source: str,
+        mask: str,
+        width: int,
+        is_space: bool,
+        reveal_time: int,
+        original_color: str = "",
+        is_revealed: bool = False,
+    ) -> None:
+        """Append one character; arguments match :class:`CharAttr`."""
+        if len(source) > 1:
+            self.clusters[len(self.flags)] = source
+        self.codes.append(ord(source[0]))
+        self.masks.append(ord(mask))
+        self.reveal_times.append(reveal_time)
+        self.flags.append(
+            _width_bits(width) | (SPACE if is_space else 0) | (REVEALED if is_revealed else 0)
+        )
+        self.style_ids.append(self.styles.intern(original_color) if original_color else 0)
+
+    def append_columns(
+        self,
+        codes: array,
+        masks: array,
+        reveal_times: array,
+        flags: Union[bytes, bytearray],
+        style_ids: array,
+        clusters: Optional[Dict[int, str]] = None,
+    ) -> None:
+        """Append characters given as ready-made column values.
+
+        Args:
+            codes: Source code points, the first one of each cluster
+            masks: Scramble character code points
+            reveal_times: Milliseconds before each reveal
+            flags: Flags bytes with space, revealed and width bits
+            style_ids: Indices in this store's style table
+            clusters: Characters of several code points, by index among
+                the appended ones
+        """
+        if clusters:
+            self._add_clusters(clusters, len(self.flags))
+        self.codes.extend(codes)
+        self.masks.extend(masks)
+        self.reveal_times.extend(reveal_times)
+        self.flags.extend(flags)
+        self.style_ids.extend(style_ids)
+
+    def extend(self, cells: Iterable[Any]) -> None:
+        """Append the characters of another store or of CharAttr-like objects."""
+        if isinstance(cells, CellStore):
+            if cells.clusters:
+                self._add_clusters(cells.clusters, len(self.flags))
+            self.codes.extend(cells.codes)
+            self.masks.extend(cells.masks)
+            self.reveal_times.extend(cells.reveal_times)
+            self.flags.extend(cells.flags)
+            if cells.styles is self.styles:
+                self.style_ids.extend(cells.style_ids)
+            else:
+                remap = [self.styles.intern(style) for style in cells.styles.styles]
+                self.style_ids.extend(array('H', [remap[i] for i in cells.style_ids]))
+            return
+        for attr in cells:
+            self.append(
+                attr.source,
+                attr.mask,
+                attr.width,
+                attr.is_space,
+                attr.reveal_time,
+                attr.original_color,
+                attr.is_revealed,
+            )
+
+    def drop_front(self, count: int) -> None:
+        """Remove the first ``count`` characters, renumbering the rest from 0."""
+        if count <= 0:
+            return
+        del self.codes[:count]
+        del self.masks[:count]
+        del self.reveal_times[:count]
+        del self.flags[:count]
+        del self.style_ids[:count]
+        if self.clusters:
+            self.clusters = {
+                index - count: cluster for index, cluster in self.clusters.items() if index >= count
+            }
+
+    def _add_clusters(self, clusters: Dict[int, str], offset: int) -> None:
+        """Record clusters of appended characters, shifting their indices."""
+        if offset:
+            self.clusters.update((index + offset, cluster) for index, cluster in clusters.items())
+        else:
+            self.clusters.update(clusters)
+
+    def _clusters_in(self, start: int, stop: int) -> List[int]:
+        """Get the sorted indices of the clusters in a range."""
+        clusters = self.clusters
+        if stop - start < len(clusters):
+            return [index for index in range(start, stop) if index in clusters]
+        return sorted(index for index in clusters if start <= index < stop)
+
+    def text(self, start: int = 0, stop: Optional[int] = None) -> str:
+        """Get the source characters of a range as a string."""
+        text = self.codes[start:stop].tobytes().decode(UTF32, 'surrogatepass')
+        if not self.clusters:
+            return text
+        start, stop, _ = slice(start, stop).indices(len(self.flags))
+        pieces: List[str] = []
+        pos = 0
+        for index in self._clusters_in(start, stop):
+            pieces.append(text[pos:index - start])
+            pieces.append(self.clusters[index])
+            pos = index - start + 1
+        pieces.append(text[pos:])
+        return "".join(pieces)
+
+    def slice(self, start: int, stop: int) -> CellStore:
+        """Copy a range of characters into a new store sharing the style table."""
+        store = CellStore(self.styles)
+        if self.clusters:
+            store.clusters = {index - start: self.clusters[index] for index in self._clusters_in(start, stop)}
+        store.codes = self.codes[start:stop]
+        store.masks = self.masks[start:stop]
+        store.reveal_times = self.reveal_times[start:stop]
+        store.flags = self.flags[start:stop]
+        store.style_ids = self.style_ids[start:stop]
+        return store
+
+    def to_attrs(self) -> List[CharAttr]:
+        """Copy the characters out as CharAttr objects."""
+        char_attrs = []
+        for view in self:
+            attr = CharAttr(
+                view.source, view.mask, view.width, view.is_space, view.reveal_time, view.original_color
+            )
+            attr.is_revealed = view.is_revealed
+            char_attrs.append(attr)
+        return char_attrs
+
+
+def code_widths(cells: Any, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+    """Iterate over (code point, display width) pairs of a range of characters.
+
+    Args:
+        cells: A :class:`CellStore` or a sequence of CharAttr-like objects
+        start: First index
+        stop: Index after the last one, or None for the end
+
+    Yields:
+        The code point and display width of each character.
+    """
+    if stop is None:
+        stop = len(cells)
+    if isinstance(cells, CellStore):
+        codes, flags = cells.codes, cells.flags
+        return ((codes[i], (flags[i] & WIDTH_MASK) >> WIDTH_SHIFT) for i in range(start, stop))
+    return ((ord(attr.source[0]), attr.width) for attr in cells[start:stop])
@@ -3,6 +3,9 @@
 from __future__ import annotations
 
 import random
+from typing import Dict, Iterable, List, Tuple
+
+from ..utils.encoding import get_char_width
 
 # Complete CP437 (IBM PC) character set - all 256 characters
 # Characters 0-31 are control characters with special glyphs in CP437
@@ -40,27 +43,185 @@ CHARSET = [
 ]
 
 
+# CHARSET has glyphs for code points 1-31 only, so from the space onwards
+# code point N is at index N - 1
+_OFFSET = 1
+
+
+class Charset:
+    """Immutable pool of scramble characters.
+
+    The characters are kept as a tuple together with their code points,
+    computed once, so masks are drawn from the pool as integers without
+    converting characters.
+    """
+
+    __slots__ = ("name", "chars", "codes")
+
+    def __init__(self, name: str, chars: Iterable[str]) -> None:
+        """Initialize a charset.
+
+        Args:
+            name: Name the charset is registered under
+            chars: Characters in the pool; duplicates are dropped
+
+        Raises:
+            ValueError: If the pool is empty or holds a character wider
+                than one column, which would shift the masks after it
+        """
+        pool = tuple(dict.fromkeys(chars))
+        if not pool:
+            raise ValueError(f"Charset '{name}' has no characters")
+        wide = next((char for char in pool if get_char_width(char) != 1), None)
+        if wide is not None:
+            raise ValueError(
+                f"Charset '{name}' has the wide character '{wide}' (U+{ord(wide):04X}); "
+                "scramble characters must be one column wide"
+            )
+        self.name = name
+        self.chars: Tuple[str, ...] = pool
+        self.codes: Tuple[int, ...] = tuple(ord(c) for c in pool)
+
+    def __len__(self) -> int:
+        """Number of characters in the pool."""
+        return len(self.chars)
+
+    def __repr__(self) -> str:
+        """String representation for debugging."""
+        return f"Charset({self.name!r}, {len(self.chars)} chars)"
+
+
+CHARSETS: Dict[str, Charset] = {}
+
+
+def register_charset(name: str, chars: Iterable[str]) -> Charset:
+    """Add a charset to the registry, replacing any with the same name.
+
+    Args:
+        name: Name used to select the charset
+        chars: Characters in the pool
+
+    Returns:
+        The registered charset.
+    """
+    charset = Charset(name, chars)
+    CHARSETS[name] = charset
+    return charset
+
+
+register_charset("full", CHARSET)
+register_charset("no_control", CHARSET[32 - _OFFSET:])
+register_charset("printable", CHARSET[32 - _OFFSET:127 - _OFFSET])
+register_charset("extended", CHARSET[128 - _OFFSET:])
+register_charset("box_drawing", CHARSET[176 - _OFFSET:224 - _OFFSET])
+
+_FULL = CHARSETS["full"].chars
+_NO_CONTROL = CHARSETS["no_control"].chars
+_PRINTABLE = CHARSETS["printable"].chars
+_EXTENDED = CHARSETS["extended"].chars
+_BOX_DRAWING = CHARSETS["box_drawing"].chars
+
+
 def get_random_char() -> str:
     """Get a random character from the complete CP437 charset."""
-    return random.choice(CHARSET)
+    return random.choice(_FULL)
 
 
 def get_random_char_excluding_control() -> str:
     """Get a random character from CP437 charset excluding control characters (0-31)."""
-    # Start from index 31 (space character) to exclude control characters
-    return random.choice(CHARSET[31:])
+    return random.choice(_NO_CONTROL)
 
 
 def get_random_printable_char() -> str:
     """Get a random character from standard ASCII printable range (32-126)."""
-    return random.choice(CHARSET[31:127])
+    return random.choice(_PRINTABLE)
 
 
 def get_random_extended_char() -> str:
     """Get a random character from CP437 extended range (128-255)."""
-    return random.choice(CHARSET[128:])
+    return random.choice(_EXTENDED)
 
 
 def get_random_box_drawing_char() -> str:
     """Get a random box drawing character from CP437 (176-223)."""
-    return random.choice(CHARSET[176:224])
\ No newline at end of file
+    return random.choice(_BOX_DRAWING)
+
+
+def get_charset(mode: str) -> Tuple[str, ...]:
+    """Get the characters a charset mode scrambles with.
+
+    Args:
+        mode: Name of a registered charset, such as "full", "no_control",
+            "printable", "extended" or "box_drawing"; unknown names give
+            the full charset
+    """
+    charset = CHARSETS.get(mode, CHARSETS["full"])
+    return charset.chars
+
+
+def parse_unicode_ranges(spec: str) -> List[str]:
+    """Expand a list of Unicode code points and ranges into characters.
+
+    Entries are separated by commas. Each is a hexadecimal code point,
+    optionally prefixed with ``U+`` or ``0x``, or two of them joined by a
+    dash, e.g. ``"U+2500-U+257F,2588"``. Control characters, surrogates and
+    whitespace are skipped.
+
+    Args:
+        spec: Comma-separated code points and ranges
+
+    Returns:
+        The characters, in order.
+
+    Raises:
+        ValueError: If an entry is not a valid code point or range.
+    """
+    chars: List[str] = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        low_text, _, high_text = entry.partition("-")
+        low = _parse_code_point(low_text)
+        high = _parse_code_point(high_text) if high_text else low
+        if high < low:
+            raise ValueError(f"Invalid range '{entry}'")
+        chars.extend(chr(code) for code in range(low, high + 1) if _is_glyph(code))
+    return chars
+
+
+def _parse_code_point(text: str) -> int:
+    """Parse a hexadecimal code point such as "U+2500", "0x41" or "41"."""
+    text = text.strip()
+    if text[:2].lower() in ("u+", "0x"):
+        text = text[2:]
+    try:
+        code = int(text, 16)
+    except ValueError:
+        raise ValueError(f"Invalid code point '{text}'") from None
+    if not 0 <= code <= 0x10FFFF:
+        raise ValueError(f"Code point '{text}' is out of range")
+    return code
+
+
+def _is_glyph(code: int) -> bool:
+    """Check whether a code point can be drawn as a scramble character."""
+    if 0xD800 <= code <= 0xDFFF:
+        return False
+    char = chr(code)
+    return char.isprintable() and not char.isspace()
+
+
+def load_charset_file(path: str) -> List[str]:
+    """Read the characters of a custom charset from a UTF-8 text file.
+
+    Every character in the file except whitespace is part of the charset.
+
+    Args:
+        path: Path of the file
+
+    Returns:
+        The characters, in order of first appearance.
+    """
+    with open(path, encoding="utf-8") as file:
+        return [char for char in file.read() if _is_glyph(ord(char))]
@@ -0,0 +1,65 @@
+"""Clocks that the effect reads time from and sleeps on.
+
+:class:`RealClock` is the wall clock. :class:`VirtualClock` only moves
+when slept on, so a full animation runs as fast as it can be computed and
+always produces the same frames for the same seed, e.g. in tests or when
+rendering offline.
+"""
+
+from __future__ import annotations
+
+import time
+
+
+class Clock:
+    """Source of monotonic time in seconds."""
+
+    # Whether time passes on its own, rather than only when slept on
+    realtime = True
+
+    def monotonic(self) -> float:
+        """Get the current time in seconds from an arbitrary start."""
+        raise NotImplementedError
+
+    def sleep(self, seconds: float) -> None:
+        """Wait for a number of seconds."""
+        raise NotImplementedError
+
+
+class RealClock(Clock):
+    """The system's monotonic clock; sleeping blocks the thread."""
+
+    def monotonic(self) -> float:
+        """Get the time of ``time.monotonic``."""
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        """Block for a number of seconds."""
+        time.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """A clock that stands still until it is slept on.
+
+    Sleeping returns at once and advances the clock by exactly the time
+    slept, so there is never any oversleep or drift.
+    """
+
+    realtime = False
+
+    def __init__(self, start: float = 0.0) -> None:
+        """Initialize the clock.
+
+        Args:
+            start: Time the clock starts at, in seconds
+        """
+        self.now = start
+
+    def monotonic(self) -> float:
+        """Get the virtual time."""
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Advance the virtual time; negative durations are ignored."""
+        if seconds > 0:
+            self.now += seconds
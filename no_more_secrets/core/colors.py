@@ -50,6 +50,54 @@ def rgb_to_ansi(r: int, g: int, b: int) -> str:
     return f"\033[1;38;2;{r};{g};{b}m"
 
 
+# xterm's palette for the 16 basic colors: normal (30-37) then bright (90-97)
+XTERM_COLORS = (
+    (0, 0, 0), (205, 0, 0), (0, 205, 0), (205, 205, 0),
+    (0, 0, 238), (205, 0, 205), (0, 205, 205), (229, 229, 229),
+    (127, 127, 127), (255, 0, 0), (0, 255, 0), (255, 255, 0),
+    (92, 92, 255), (255, 0, 255), (0, 255, 255), (255, 255, 255),
+)
+
+# Levels of the 6x6x6 color cube in the 256-color palette
+CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+
+
+def sgr_color_to_rgb(color: str) -> tuple[int, int, int] | None:
+    """Convert an SGR color to RGB with xterm's palette.
+
+    Args:
+        color: Color parameters as kept by ``SgrState``, e.g. ``"31"``,
+            ``"94"``, ``"38;5;208"`` or ``"48;2;10;20;30"``
+
+    Returns:
+        The (r, g, b) color, or None for the default color or parameters
+        that are not a color.
+    """
+    params = color.split(';')
+    try:
+        values = [int(param) for param in params]
+    except ValueError:
+        return None
+    code = values[0]
+    if 30 <= code <= 37 or 40 <= code <= 47:
+        return XTERM_COLORS[code % 10]
+    if 90 <= code <= 97 or 100 <= code <= 107:
+        return XTERM_COLORS[8 + code % 10]
+    if code in (38, 48) and len(values) == 5 and values[1] == 2:
+        r, g, b = (min(255, value) for value in values[2:])
+        return r, g, b
+    if code in (38, 48) and len(values) == 3 and values[1] == 5 and 0 <= values[2] <= 255:
+        index = values[2]
+        if index < 16:
+            return XTERM_COLORS[index]
+        if index < 232:
+            index -= 16
+            return CUBE_LEVELS[index // 36], CUBE_LEVELS[index // 6 % 6], CUBE_LEVELS[index % 6]
+        level = 8 + 10 * (index - 232)
+        return level, level, level
+    return None
+
+
 def get_color_map() -> dict[str, int]:
     """Get mapping of color names to color codes."""
     return {
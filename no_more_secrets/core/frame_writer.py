@@ -0,0 +1,89 @@
+"""Frame assembly with a single write per frame."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, TextIO
+
+from .output import OutputBackend, TerminalBackend
+
+
+class FrameWriter:
+    """Collect a frame in a reusable byte buffer and write it in one call.
+
+    Finished frames go to an output backend, by default the terminal on
+    ``sys.stdout`` (see :class:`~.output.TerminalBackend`).
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        encoding: str = "utf-8",
+        backend: Optional[OutputBackend] = None,
+    ) -> None:
+        """Initialize the writer.
+
+        Args:
+            stream: Output stream of the default terminal backend, defaults
+                to ``sys.stdout``
+            encoding: Encoding used for text written to the frame
+            backend: Backend that receives the frames; overrides ``stream``
+        """
+        self.backend = backend if backend is not None else TerminalBackend(stream, encoding)
+        self.encoding = encoding
+        self._buffer = bytearray()
+        self._length = 0
+
+        self.frame_bytes = 0
+        self.frame_syscalls = 0
+        self.total_bytes = 0
+        self.total_syscalls = 0
+        self.frames = 0
+
+    def write(self, text: str) -> None:
+        """Append text to the current frame."""
+        if text:
+            self.write_bytes(text.encode(self.encoding, errors="replace"))
+
+    def write_bytes(self, data: bytes) -> None:
+        """Append already encoded bytes to the current frame."""
+        end = self._length + len(data)
+        self._buffer[self._length:end] = data
+        self._length = end
+
+    def flush(self) -> int:
+        """Write the pending frame and start a new one.
+
+        Returns:
+            Number of bytes written for the frame.
+        """
+        length = self._length
+        syscalls = 0
+        # The frame is dropped even if the backend raises, so it is not
+        # sent again at the start of the next one
+        self._length = 0
+
+        if length:
+            # Release the views even if the backend raises, or the buffer
+            # stays exported and cannot grow for the next frame
+            with memoryview(self._buffer) as view, view[:length] as frame:
+                syscalls = self.backend.write(frame)
+
+        self.frame_bytes = length
+        self.frame_syscalls = syscalls
+        self.total_bytes += length
+        self.total_syscalls += syscalls
+        self.frames += 1
+        return length
+
+    def stats(self) -> Dict[str, Any]:
+        """Return byte and syscall counters for the frames written so far."""
+        frames = max(1, self.frames)
+        return {
+            "frames": self.frames,
+            "total_bytes": self.total_bytes,
+            "total_syscalls": self.total_syscalls,
+            "bytes_per_frame": self.total_bytes / frames,
+            "syscalls_per_frame": self.total_syscalls / frames,
+            "last_frame_bytes": self.frame_bytes,
+            "last_frame_syscalls": self.frame_syscalls,
+        }
@@ -0,0 +1,235 @@
+"""Output backends: where frames go and where the screen size comes from.
+
+The effect assembles every frame in a :class:`~.frame_writer.FrameWriter`,
+which hands the finished bytes to a backend in one call.
+:class:`TerminalBackend` writes to the terminal on standard output,
+:class:`StreamBackend` to any binary stream such as a file, pipe or socket,
+and :class:`HeadlessBackend` replays frames onto a screen in memory without
+any I/O. Headless frames are not paced in real time, so the effect renders
+them as fast as the CPU allows, e.g. to benchmark rendering or in tests.
+"""
+
+from __future__ import annotations
+
+import codecs
+import os
+import sys
+import time
+from typing import BinaryIO, Optional, TextIO, Tuple
+
+from ..utils.normalize import VirtualScreen
+from .clock import Clock
+from .terminal import Terminal
+
+DEFAULT_ROWS = 24
+DEFAULT_COLS = 80
+
+
+class OutputBackend:
+    """Destination for rendered frames.
+
+    Subclasses implement :meth:`get_size` and :meth:`write`; by default a
+    backend has no keyboard to wait for.
+    """
+
+    # Whether frames are watched as they are written; when False the effect
+    # runs on a virtual clock unless given one, so it never sleeps
+    realtime = True
+
+    # Whether the run takes place on the terminal's alternate screen, which
+    # is left again afterwards so the original contents come back
+    alternate_screen = True
+
+    def start(self, clock: Clock) -> None:
+        """Prepare for a run, before its first frame is written.
+
+        Args:
+            clock: Clock the run is timed with
+        """
+
+    def get_size(self) -> Tuple[int, int]:
+        """Get the screen size as (rows, columns)."""
+        raise NotImplementedError
+
+    def write(self, frame: memoryview) -> int:
+        """Write one complete frame.
+
+        Args:
+            frame: Encoded bytes of the frame, only valid during the call
+
+        Returns:
+            Number of system calls made.
+        """
+        raise NotImplementedError
+
+    def wait_for_keypress(self) -> None:
+        """Wait until the viewer presses a key."""
+
+
+class TerminalBackend(OutputBackend):
+    """The terminal on a text stream, ``sys.stdout`` by default.
+
+    On Unix the frame goes straight to the stream's file descriptor with
+    ``os.write``. Elsewhere, or when the stream has no usable descriptor
+    (for example when it has been replaced in tests), the frame is handed to
+    the stream's binary buffer or the stream itself in a single write.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, encoding: str = "utf-8") -> None:
+        """Initialize the backend.
+
+        Args:
+            stream: Output stream, defaults to ``sys.stdout``
+            encoding: Encoding of the frames, used when writing text
+        """
+        self.stream = stream if stream is not None else sys.stdout
+        self.encoding = encoding
+        self._fd: Optional[int] = None
+        self._binary: Optional[BinaryIO] = None
+        self._resolved = False
+
+    def _resolve(self) -> None:
+        """Find where frames go, once the first frame is written."""
+        self._fd = self._resolve_fd()
+        self._binary = getattr(self.stream, "buffer", None) if self._fd is None else None
+        self._resolved = True
+
+    def _resolve_fd(self) -> Optional[int]:
+        """Return the stream's file descriptor if frames can go straight to it."""
+        if Terminal.get_platform() == "windows":
+            # Raw fd writes bypass the console's Unicode handling on Windows
+            return None
+        try:
+            fd = self.stream.fileno()
+        except (AttributeError, OSError, ValueError):
+            return None
+        return fd if isinstance(fd, int) else None
+
+    def get_size(self) -> Tuple[int, int]:
+        """Get the terminal size as (rows, columns)."""
+        return Terminal.get_size()
+
+    def write(self, frame: memoryview) -> int:
+        """Write a frame to the file descriptor, binary buffer or text stream."""
+        if not self._resolved:
+            self._resolve()
+        if self._fd is not None:
+            # Anything still sitting in the text layer must go first
+            self.stream.flush()
+            syscalls = 0
+            offset = 0
+            while offset < len(frame):
+                offset += os.write(self._fd, frame[offset:])
+                syscalls += 1
+            return syscalls
+        if self._binary is not None:
+            self.stream.flush()
+            self._binary.write(frame)
+            self._binary.flush()
+        else:
+            self.stream.write(str(frame, self.encoding, "replace"))
+            self.stream.flush()
+        return 1
+
+    def wait_for_keypress(self) -> None:
+        """Wait for a keypress in a cross-platform way."""
+        try:
+            if Terminal.get_platform() == 'windows':
+                try:
+                    import msvcrt
+                    msvcrt.getch()
+                except ImportError:
+                    time.sleep(2)  # Fallback if msvcrt not available
+            else:
+                # Unix - set terminal to raw mode temporarily
+                try:
+                    import termios
+                    import tty
+                    fd = sys.stdin.fileno()
+                    old_settings = termios.tcgetattr(fd)
+                    try:
+                        tty.setraw(sys.stdin.fileno())
+                        sys.stdin.read(1)
+                    finally:
+                        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+                except ImportError:
+                    time.sleep(2)  # Fallback if termios/tty not available
+        except Exception:
+            time.sleep(2)  # Fallback
+
+
+class StreamBackend(OutputBackend):
+    """Any writable binary stream, such as a file, pipe, pty or socket.
+
+    A stream has no size or keyboard of its own, so the screen size is
+    given and the effect never waits for a keypress.
+    """
+
+    def __init__(self, stream: BinaryIO, rows: int = DEFAULT_ROWS, cols: int = DEFAULT_COLS) -> None:
+        """Initialize the backend.
+
+        Args:
+            stream: Binary stream that receives the frames
+            rows: Screen height the frames are drawn for
+            cols: Screen width the frames are drawn for
+        """
+        self.stream = stream
+        self.rows = rows
+        self.cols = cols
+
+    def get_size(self) -> Tuple[int, int]:
+        """Get the screen size as (rows, columns)."""
+        return self.rows, self.cols
+
+    def write(self, frame: memoryview) -> int:
+        """Write a frame to the stream and flush it."""
+        self.stream.write(frame)
+        self.stream.flush()
+        return 1
+
+
+class HeadlessBackend(OutputBackend):
+    """A screen in memory, written to without I/O or real-time pacing.
+
+    Frames are replayed onto a :class:`~..utils.normalize.VirtualScreen`
+    of the given size, whose contents :meth:`text` returns. Pass
+    ``keep_screen=False`` to only count frames and bytes, e.g. to measure
+    rendering alone.
+    """
+
+    realtime = False
+
+    def __init__(self, rows: int = DEFAULT_ROWS, cols: int = DEFAULT_COLS, keep_screen: bool = True) -> None:
+        """Initialize the backend.
+
+        Args:
+            rows: Screen height
+            cols: Screen width
+            keep_screen: Replay frames onto the in-memory screen
+        """
+        self.rows = rows
+        self.cols = cols
+        self.screen = VirtualScreen(rows) if keep_screen else None
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self.frames = 0
+        self.total_bytes = 0
+
+    def get_size(self) -> Tuple[int, int]:
+        """Get the screen size as (rows, columns)."""
+        return self.rows, self.cols
+
+    def write(self, frame: memoryview) -> int:
+        """Replay a frame onto the screen; no system calls are made."""
+        self.frames += 1
+        self.total_bytes += len(frame)
+        if self.screen is not None:
+            self.screen.feed(self._decoder.decode(frame))
+        return 0
+
+    def text(self) -> str:
+        """Get the screen contents as text with SGR sequences for colors.
+
+        Returns:
+            One line per row, or ``""`` when the screen is not kept.
+        """
+        return self.screen.text() if self.screen is not None else ""
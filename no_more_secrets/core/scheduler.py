@@ -0,0 +1,70 @@
+"""Frame pacing for the NMS effect."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from .clock import Clock, RealClock
+
+DEFAULT_FPS = 30.0
+
+
+class FrameScheduler:
+    """Pace frames against a clock and track simulated time.
+
+    Frame deadlines are derived from the start time rather than from the end
+    of the previous sleep, so oversleeping on one frame is made up on the
+    next instead of accumulating. Simulated time advances by the real time
+    that passed, scaled by ``speed``, so slow frames do not stretch the
+    animation.
+    """
+
+    def __init__(self, fps: float = DEFAULT_FPS, speed: float = 1.0, clock: Optional[Clock] = None) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            fps: Maximum frames per second
+            speed: Multiplier applied to simulated time
+            clock: Clock to read and sleep on, defaults to the wall clock
+        """
+        self.frame_interval = 1.0 / fps
+        self.speed = speed
+        self.clock = clock if clock is not None else RealClock()
+        self.elapsed_ms = 0.0
+        self._last = 0.0
+        self._next = 0.0
+
+    def start(self) -> None:
+        """Start timing from now and reset simulated time."""
+        self._last = self._next = self.clock.monotonic()
+        self.elapsed_ms = 0.0
+
+    @property
+    def frame_ms(self) -> float:
+        """Simulated milliseconds covered by one frame."""
+        return self.frame_interval * 1000.0 * self.speed
+
+    def tick(self, frames: int = 1) -> float:
+        """Wait for a later frame slot.
+
+        Args:
+            frames: Number of frame slots to advance; more than one skips
+                frames in which nothing would change
+
+        Returns:
+            Simulated milliseconds elapsed since the previous tick.
+        """
+        self._next += self.frame_interval * max(1, frames)
+        now = self.clock.monotonic()
+        delay = self._next - now
+        if delay > 0:
+            self.clock.sleep(delay)
+            now = self.clock.monotonic()
+        elif delay < -self.frame_interval:
+            # Running behind: start over from now rather than bursting frames
+            self._next = now
+
+        delta_ms = (now - self._last) * 1000.0 * self.speed
+        self._last = now
+        self.elapsed_ms += delta_ms
+        return delta_ms
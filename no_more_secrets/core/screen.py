@@ -0,0 +1,353 @@
+"""Screen buffers and differential rendering for the NMS effect."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from itertools import compress
+from operator import ne
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from .cell_store import WIDTH_MASK, WIDTH_SHIFT, CellStore, code_widths
+from .char_attr import CharAttr
+from .colors import Colors
+from .sgr import switch_style
+
+# A rendered cell: (text, style prefix, display width)
+Cell = Tuple[str, str, int]
+
+BLANK: Cell = (" ", "", 1)
+
+# Right half of a double-width character; never printed on its own
+CONTINUATION: Cell = ("", "", 0)
+
+TAB_WIDTH = 8
+
+TAB = 0x09
+NEWLINE = 0x0A
+DELETE = 0x7F
+
+# Screen position of a laid out character: (row, col, span)
+Position = Tuple[int, int, int]
+
+# Printable ASCII and newlines, which need no per-character layout rules
+PLAIN_BYTES = bytes(range(0x20, 0x7F)) + b"\n"
+
+# Maps a flags byte to the display width it holds, for bytes.translate
+FLAG_WIDTHS = bytes((flag & WIDTH_MASK) >> WIDTH_SHIFT for flag in range(256))
+
+
+class Layout:
+    """Terminal-style placement of characters onto screen rows.
+
+    Newlines start a new row, tabs advance to the next tab stop and other
+    control characters take no space. Characters that would overflow the
+    last column wrap to the next row. Characters can be added in several
+    batches; placement continues where the previous batch stopped.
+
+    Only the index of the first character of each row is stored. Columns
+    are recomputed from the start of the row by :meth:`place` when a range
+    of rows is drawn, so the layout costs nothing per character.
+    """
+
+    def __init__(self, cols: int) -> None:
+        """Initialize an empty layout.
+
+        Args:
+            cols: Width of the screen in columns
+        """
+        self.cols = max(1, cols)
+        self.size = 0
+        self.row_starts = array('q', [0])
+        self._col = 0
+
+    @property
+    def rows(self) -> int:
+        """Number of rows used so far."""
+        return len(self.row_starts)
+
+    def _span(self, code: int, width: int, col: int) -> int:
+        """Get the columns a character takes at a column, or 0 for none."""
+        if code == TAB:
+            return min(TAB_WIDTH - col % TAB_WIDTH, self.cols - col)
+        if code < 32 or code == DELETE:
+            return 0
+        return min(width, self.cols)
+
+    def extend(self, cells: Any) -> None:
+        """Place more characters after the ones already laid out.
+
+        Args:
+            cells: A CellStore or a sequence of CharAttr-like objects
+        """
+        plain = _plain_text(cells)
+        if plain is not None:
+            self._extend_plain(plain)
+            return
+
+        row_starts = self.row_starts
+        cols = self.cols
+        index = self.size
+        col = self._col
+
+        for code, width in code_widths(cells):
+            index += 1
+            if code == NEWLINE:
+                col = 0
+                row_starts.append(index)
+                continue
+            span = self._span(code, width, col)
+            if not span:
+                continue
+            if col + span > cols:
+                col = 0
+                row_starts.append(index - 1)
+            col += span
+
+        self.size = index
+        self._col = col
+
+    def _extend_plain(self, text: bytes) -> None:
+        """Place narrow printable ASCII and newlines a whole line at a time."""
+        row_starts = self.row_starts
+        cols = self.cols
+        index = self.size
+        col = self._col
+
+        for number, line in enumerate(text.split(b"\n")):
+            if number:
+                index += 1  # The newline
+                row_starts.append(index)
+                col = 0
+            length = len(line)
+            room = cols - col
+            if length > room:
+                # Wrap where the line overflows, then every cols characters
+                row_starts.extend(range(index + room, index + length, cols))
+                col = (length - room - 1) % cols + 1
+            else:
+                col += length
+            index += length
+
+        self.size = index
+        self._col = col
+
+    def drop_rows(self, count: int) -> int:
+        """Forget the first rows, as when they have scrolled away for good.
+
+        The characters of the remaining rows are renumbered from 0, so
+        the caller drops the same number of characters from its store.
+
+        Args:
+            count: Number of rows to drop; at least one row is kept
+
+        Returns:
+            The number of characters on the dropped rows.
+        """
+        count = max(0, min(count, self.rows - 1))
+        if not count:
+            return 0
+        dropped = self.row_starts[count]
+        self.row_starts = array('q', [start - dropped for start in self.row_starts[count:]])
+        self.size -= dropped
+        return dropped
+
+    def place(self, cells: Any, start: int, stop: int) -> Iterator[Tuple[int, int, int, int]]:
+        """Compute the screen positions of a range of laid out characters.
+
+        Args:
+            cells: The characters the layout was built from
+            start: First index
+            stop: Index after the last one
+
+        Yields:
+            (index, row, col, span) for every character that occupies a cell.
+        """
+        stop = min(stop, self.size)
+        if start >= stop:
+            return
+        row_starts = self.row_starts
+        row = bisect_right(row_starts, start) - 1
+        index = row_starts[row]
+        next_start = row_starts[row + 1] if row + 1 < len(row_starts) else self.size
+        col = 0
+
+        for code, width in code_widths(cells, index, stop):
+            while index == next_start:
+                row += 1
+                col = 0
+                next_start = row_starts[row + 1] if row + 1 < len(row_starts) else self.size
+            span = 0 if code == NEWLINE else self._span(code, width, col)
+            if span:
+                if index >= start:
+                    yield index, row, col, span
+                col += span
+            index += 1
+
+    def cell_range(self, first_row: int, last_row: int) -> Tuple[int, int]:
+        """Get the indices of the characters shown on a range of rows.
+
+        Args:
+            first_row: First row, inclusive
+            last_row: Last row, exclusive
+
+        Returns:
+            (start, stop) indices into the laid out characters.
+        """
+        first_row = max(0, min(first_row, self.rows))
+        start = self.row_starts[first_row] if first_row < self.rows else self.size
+        stop = self.row_starts[last_row] if last_row < self.rows else self.size
+        return start, max(start, stop)
+
+
+def _plain_text(cells: Any) -> Optional[bytes]:
+    """Get a store's text as bytes if it is narrow printable ASCII and newlines."""
+    if not isinstance(cells, CellStore):
+        return None
+    text = cells.text()
+    if not text.isascii():
+        return None
+    data = text.encode('ascii')
+    if data.translate(None, PLAIN_BYTES) or cells.flags.translate(FLAG_WIDTHS).count(1) != len(data):
+        return None
+    return data
+
+
+def layout_cells(
+    char_attrs: Sequence[CharAttr], cols: int
+) -> Tuple[List[Optional[Position]], int]:
+    """Assign a screen position to every character.
+
+    Args:
+        char_attrs: Characters to lay out
+        cols: Width of the screen in columns
+
+    Returns:
+        A list of (row, col, span) tuples, or None for characters that do not
+        occupy a cell, and the number of rows used.
+    """
+    layout = Layout(cols)
+    layout.extend(char_attrs)
+    positions: List[Optional[Position]] = [None] * layout.size
+    for index, row, col, span in layout.place(char_attrs, 0, layout.size):
+        positions[index] = (row, col, span)
+    return positions, layout.rows
+
+
+class ScreenBuffer:
+    """Fixed-size grid of rendered cells."""
+
+    def __init__(self, rows: int, cols: int) -> None:
+        """Initialize a blank screen buffer.
+
+        Args:
+            rows: Number of rows
+            cols: Number of columns
+        """
+        self.rows = rows
+        self.cols = cols
+        self.cells: List[List[Cell]] = [[BLANK] * cols for _ in range(rows)]
+
+    def clear(self) -> None:
+        """Reset every cell to blank."""
+        for line in self.cells:
+            line[:] = [BLANK] * self.cols
+
+    def put(self, row: int, col: int, text: str, style: str = "", width: int = 1) -> None:
+        """Place text at a position, covering ``width`` columns.
+
+        Args:
+            row: Zero-based row
+            col: Zero-based column
+            text: Text to display in the cell
+            style: ANSI escape prefix applied to the text
+            width: Number of columns the text occupies
+        """
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return
+        line = self.cells[row]
+        line[col] = (text, style, width)
+        if width > 1:
+            for extra in range(col + 1, min(col + width, self.cols)):
+                line[extra] = CONTINUATION
+
+
+class DiffRenderer:
+    """Render a back buffer by emitting only the cells that changed.
+
+    The front buffer mirrors what is currently on the terminal. Each call to
+    :meth:`render` compares the back buffer against it and produces cursor
+    addressing and text for the differing cells only. Styles are emitted
+    only where they change between consecutive cells that are written, and
+    reset once at the end of the frame.
+    """
+
+    def __init__(self, rows: int, cols: int) -> None:
+        """Initialize renderer buffers for a screen of the given size.
+
+        Args:
+            rows: Number of rows
+            cols: Number of columns
+        """
+        self.rows = rows
+        self.cols = cols
+        self.front = ScreenBuffer(rows, cols)
+        self.back = ScreenBuffer(rows, cols)
+
+    def invalidate(self) -> None:
+        """Forget what is on screen so the next render redraws every cell."""
+        for line in self.front.cells:
+            line[:] = [CONTINUATION] * self.cols
+
+    def scroll(self, lines: int) -> str:
+        """Scroll the terminal contents up, keeping the front buffer in step.
+
+        Args:
+            lines: Number of rows to scroll by
+
+        Returns:
+            The escape sequence that scrolls the terminal.
+        """
+        lines = min(lines, self.rows)
+        if lines <= 0:
+            return ""
+        cells = self.front.cells
+        del cells[:lines]
+        cells.extend([BLANK] * self.cols for _ in range(lines))
+        return f"\033[{lines}S"
+
+    def render(self) -> str:
+        """Return the escape sequences that bring the terminal up to date."""
+        parts: List[str] = []
+        cursor_row = cursor_col = -1
+        current = ""
+
+        for row, (back_line, front_line) in enumerate(
+            zip(self.back.cells, self.front.cells)
+        ):
+            if back_line == front_line:
+                continue
+
+            # Find the changed columns without a Python-level loop over all
+            for col in compress(range(len(back_line)), map(ne, back_line, front_line)):
+                cell = back_line[col]
+                front_line[col] = cell
+
+                text, style, width = cell
+                if not text:
+                    continue
+
+                if style != current and not style:
+                    parts.append(Colors.RESET)
+                    current = style
+                if row != cursor_row or col != cursor_col:
+                    parts.append(Colors.move_cursor(row + 1, col + 1))
+                if style != current:
+                    parts.append(switch_style(current, style))
+                    current = style
+                parts.append(text)
+                cursor_row, cursor_col = row, col + width
+
+        if current:
+            parts.append(Colors.RESET)
+        return "".join(parts)
@@ -0,0 +1,173 @@
+"""Select Graphic Rendition (SGR) state for preserved colors.
+
+Terminal output often sets attributes and colors with several escape
+sequences in a row, e.g. ``\\033[1m\\033[34m``, or changes a single
+attribute with ``\\033[22m``. :class:`SgrState` folds any number of SGR
+sequences into the resulting combination of attributes, foreground and
+background color, and renders it back as one canonical sequence, so equal
+styles always produce equal strings and intern to the same style ID.
+"""
+
+from __future__ import annotations
+
+from typing import List, NamedTuple
+
+from .colors import Colors
+
+# Attribute bits, indexed by the SGR parameter that turns them on (1-9)
+BOLD = 1 << 1
+DIM = 1 << 2
+ITALIC = 1 << 3
+UNDERLINE = 1 << 4
+BLINK = 1 << 5
+RAPID_BLINK = 1 << 6
+REVERSE = 1 << 7
+HIDDEN = 1 << 8
+STRIKE = 1 << 9
+
+# Attribute bits cleared by each "off" parameter
+ATTRIBUTES_OFF = {
+    22: BOLD | DIM,
+    23: ITALIC,
+    24: UNDERLINE,
+    25: BLINK | RAPID_BLINK,
+    27: REVERSE,
+    28: HIDDEN,
+    29: STRIKE,
+}
+
+
+class SgrState(NamedTuple):
+    """Attributes and colors in effect after a series of SGR sequences.
+
+    Colors are kept as their SGR parameters, e.g. ``"31"``, ``"38;5;208"``
+    or ``"48;2;10;20;30"``, or ``""`` for the terminal default.
+    """
+
+    attributes: int = 0
+    fg: str = ""
+    bg: str = ""
+
+    def apply(self, sequence: str) -> SgrState:
+        """Get the state after an SGR sequence such as ``\\033[1;31m``.
+
+        Unknown and malformed parameters are skipped, as terminals do.
+        Sub-parameters given with colons, e.g. ``4:3`` or ``38:5:208``,
+        are read for extended colors and otherwise ignored.
+
+        Args:
+            sequence: Complete escape sequence ending in ``m``
+
+        Returns:
+            The new state; this one is left unchanged.
+        """
+        params = sequence[2:-1].split(';')
+        attributes, fg, bg = self
+        i = 0
+        while i < len(params):
+            code_text, _, sub_text = params[i].partition(':')
+            i += 1
+            if not code_text:
+                code = 0
+            elif code_text.isdecimal():
+                code = int(code_text)
+            else:
+                continue
+            if sub_text and code in (38, 48):
+                color = _colon_color(code, sub_text.split(':'))
+                if color:
+                    if code == 38:
+                        fg = color
+                    else:
+                        bg = color
+                continue
+            if code == 4 and sub_text == "0":
+                code = 24  # Underline style 0 is no underline
+            if code == 0:
+                attributes, fg, bg = 0, "", ""
+            elif 1 <= code <= 9:
+                attributes |= 1 << code
+            elif code in ATTRIBUTES_OFF:
+                attributes &= ~ATTRIBUTES_OFF[code]
+            elif 30 <= code <= 37 or 90 <= code <= 97:
+                fg = str(code)
+            elif 40 <= code <= 47 or 100 <= code <= 107:
+                bg = str(code)
+            elif code == 39:
+                fg = ""
+            elif code == 49:
+                bg = ""
+            elif code in (38, 48):
+                # Extended colors: 5;n for 256 colors, 2;r;g;b for truecolor
+                count = {"5": 2, "2": 4}.get(params[i] if i < len(params) else "", 0)
+                values = params[i + 1:i + count]
+                if count and i + count <= len(params) and all(value.isdecimal() for value in values):
+                    color = ";".join([str(code)] + params[i:i + count])
+                    if code == 38:
+                        fg = color
+                    else:
+                        bg = color
+                i += count
+        return SgrState(attributes, fg, bg)
+
+    @property
+    def sequence(self) -> str:
+        """Canonical escape sequence that sets this state from the default.
+
+        Returns:
+            The sequence, or ``""`` for the default state.
+        """
+        params: List[str] = [str(code) for code in range(1, 10) if self.attributes & (1 << code)]
+        if self.fg:
+            params.append(self.fg)
+        if self.bg:
+            params.append(self.bg)
+        return f"\033[{';'.join(params)}m" if params else ""
+
+
+def _colon_color(code: int, sub: List[str]) -> str:
+    """Get the parameters of an extended color given with colons.
+
+    Both ``38:5:n`` and ``38:2:r:g:b``, with or without the color space
+    ID of ``38:2::r:g:b``, are read.
+
+    Args:
+        code: 38 for the foreground or 48 for the background
+        sub: Sub-parameters after the code
+
+    Returns:
+        The color as semicolon parameters, or ``""`` if it is malformed.
+    """
+    if sub[0] == "5" and len(sub) >= 2:
+        values = sub[1:2]
+    elif sub[0] == "2" and len(sub) >= 4:
+        values = sub[-3:]
+    else:
+        return ""
+    if not all(value.isdecimal() for value in values):
+        return ""
+    return ";".join([str(code), sub[0]] + [str(int(value)) for value in values])
+
+
+DEFAULT_STATE = SgrState()
+
+
+def switch_style(current: str, style: str) -> str:
+    """Get the escape sequence that changes one canonical style to another.
+
+    Args:
+        current: Style in effect, ``""`` for the default
+        style: Style to change to, ``""`` for the default
+
+    Returns:
+        A reset when returning to the default, the new style when coming
+        from the default, and otherwise the new style with a reset folded
+        into its parameters.
+    """
+    if not style:
+        return Colors.RESET
+    if not current:
+        return style
+    if style.startswith("\033["):
+        return "\033[0;" + style[2:]
+    return Colors.RESET + style
@@ -0,0 +1,105 @@
+"""Bucketed timer wheel for scheduling per-cell events."""
+
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from typing import DefaultDict, Iterable, List, Optional
+
+# Width of one bucket in simulated milliseconds
+DEFAULT_SLOT_MS = 10
+
+
+class TimerWheel:
+    """Schedule integer items at future times and pop them once due.
+
+    Items are kept in buckets of ``slot_ms`` milliseconds keyed by slot
+    number. An item fires at the end of its slot's window, so it can be up
+    to one slot late but never early. Popping costs time proportional to
+    the number of due items plus the number of slots passed, not to the
+    number of items scheduled.
+    """
+
+    def __init__(self, slot_ms: int = DEFAULT_SLOT_MS) -> None:
+        """Initialize an empty wheel.
+
+        Args:
+            slot_ms: Width of one bucket in milliseconds
+        """
+        self.slot_ms = max(1, slot_ms)
+        self._slots: DefaultDict[int, List[int]] = defaultdict(list)
+        self._cursor = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Number of items still scheduled."""
+        return self._count
+
+    def clear(self) -> None:
+        """Drop every scheduled item and restart at time zero."""
+        self._slots.clear()
+        self._cursor = 0
+        self._count = 0
+
+    def schedule(self, item: int, due_ms: float) -> None:
+        """Schedule an item.
+
+        Args:
+            item: Item to return from :meth:`pop_due`
+            due_ms: Time at which the item becomes due; times in the past
+                are due at the next pop
+        """
+        self._slots[max(math.ceil(due_ms / self.slot_ms), self._cursor)].append(item)
+        self._count += 1
+
+    def schedule_many(self, items: Iterable[int], due_times: Iterable[float]) -> None:
+        """Schedule items paired with their due times; see :meth:`schedule`."""
+        slots = self._slots
+        slot_ms = self.slot_ms
+        cursor = self._cursor
+        ceil = math.ceil
+        count = 0
+        for item, due_ms in zip(items, due_times):
+            slot = ceil(due_ms / slot_ms)
+            slots[slot if slot > cursor else cursor].append(item)
+            count += 1
+        self._count += count
+
+    def pop_due(self, now_ms: float) -> List[int]:
+        """Remove and return the items due at a time.
+
+        Args:
+            now_ms: Current time; must not go backwards between calls
+
+        Returns:
+            The due items, earliest slot first.
+        """
+        last = int(now_ms // self.slot_ms)
+        if last < self._cursor or not self._slots:
+            self._cursor = max(self._cursor, last + 1)
+            return []
+
+        slots = self._slots
+        if last - self._cursor > len(slots):
+            # Far jump: visiting the scheduled slots is cheaper than the range
+            keys = sorted(slot for slot in slots if slot <= last)
+        else:
+            keys = [slot for slot in range(self._cursor, last + 1) if slot in slots]
+        self._cursor = last + 1
+
+        due: List[int] = []
+        for slot in keys:
+            due.extend(slots.pop(slot))
+        self._count -= len(due)
+        return due
+
+    def next_due(self) -> Optional[float]:
+        """Time at which the earliest scheduled item becomes due, if any."""
+        slots = self._slots
+        if not slots:
+            return None
+        # Scan forward first: with busy wheels the next slot is usually close
+        for slot in range(self._cursor, self._cursor + min(len(slots), 64)):
+            if slot in slots:
+                return slot * self.slot_ms
+        return min(slots) * self.slot_ms
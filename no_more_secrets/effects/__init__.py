@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from .export import export_animation, render_html, render_svg
 from .nms_effect import NMSEffect
 
-__all__ = ["NMSEffect"]
\ No newline at end of file
+__all__ = ["NMSEffect", "render_svg", "render_html", "export_animation"]
\ No newline at end of file
@@ -0,0 +1,365 @@
+"""Simulation engines that advance the reveal countdown each frame.
+
+The pure-Python engine walks the characters one at a time. When NumPy is
+installed, the vectorized engine works on NumPy views of the same
+:class:`CellStore` arrays and updates a whole range of characters with a
+handful of array operations per frame.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Any, List
+
+from ..core.cell_store import REVEALED, SPACE, CellStore
+from ..core.timer_wheel import TimerWheel
+
+if TYPE_CHECKING:
+    from .nms_effect import NMSEffect
+
+# NumPy is optional; without it only the pure-Python engine is available
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    HAS_NUMPY = False
+
+ENGINES = ["auto", "python", "numpy"]
+
+# Below this many characters array set-up costs more than it saves
+NUMPY_MIN_CELLS = 4096
+
+# Masked characters swap their mask with this chance every CHURN_PERIOD_MS
+CHURN_CHANCE = 1 / 6
+CHURN_PERIOD_MS = 50
+
+# The same churn as a Poisson rate: mask changes per second per character
+DEFAULT_CHURN_RATE = -math.log(1 - CHURN_CHANCE) * 1000 / CHURN_PERIOD_MS
+
+# Clustering: chance that a character pulls its neighbours to its reveal time
+CLUSTER_CHANCE = 0.3
+CLUSTER_JITTER_MS = 200
+
+
+class Engine:
+    """Range tracking shared by the engines.
+
+    Engines are event driven: when characters enter the simulated range,
+    their reveal times are scheduled once relative to the engine's clock,
+    and each step only touches the characters that are due. The store's
+    ``reveal_times`` are left as they were when scheduled.
+
+    Mask churn is a Poisson process per pending character: the time to its
+    next mask change is drawn from the exponential distribution with mean
+    ``1000 / churn_rate`` ms, so a character changes in a frame of ``t`` ms
+    with chance ``1 - exp(-churn_rate * t / 1000)``, as with the old
+    per-frame dice roll.
+
+    After each step, ``changed`` lists the characters that were revealed or
+    given a new mask, so only those need to be drawn again.
+    """
+
+    name = ""
+
+    def __init__(self, effect: NMSEffect, cells: CellStore) -> None:
+        """Initialize the engine.
+
+        Args:
+            effect: Effect whose settings drive the simulation
+            cells: Characters to simulate; the engine keeps a reference, so
+                characters appended to the store later are simulated too
+        """
+        self.effect = effect
+        self.cells = cells
+        self.now_ms = 0
+        self.start = 0
+        self.stop = 0
+        self.changed: List[int] = []
+        rate = effect.churn_rate
+        self.churn_mean_ms = 1000.0 / rate if rate > 0 else 0.0
+
+    @property
+    def pending(self) -> int:
+        """Number of scheduled characters not revealed yet."""
+        raise NotImplementedError
+
+    def _reset(self) -> None:
+        """Forget every scheduled character."""
+        raise NotImplementedError
+
+    def _schedule(self, start: int, stop: int) -> None:
+        """Schedule the reveal of a range of characters."""
+        raise NotImplementedError
+
+    def _reveal_due(self) -> None:
+        """Reveal the scheduled characters that are due at ``now_ms``."""
+        raise NotImplementedError
+
+    def _churn(self, until_ms: float) -> None:
+        """Swap the masks of pending characters due to change before a time.
+
+        A character changes at most once per step; its next change is drawn
+        from ``until_ms`` on, which the exponential distribution allows.
+        """
+        raise NotImplementedError
+
+    def step(self, start: int, stop: int, step_ms: int) -> bool:
+        """Advance the simulation of a range of characters.
+
+        Characters that were not in the range before are scheduled first.
+        When ``start`` moves, as on a new page, the clock restarts at zero.
+
+        Args:
+            start: First index to simulate
+            stop: Index after the last one to simulate
+            step_ms: Simulated milliseconds since the previous step
+
+        Returns:
+            True once every character in the range has been revealed.
+        """
+        stop = min(stop, len(self.cells))
+        if start != self.start or stop < self.stop:
+            self._reset()
+            self.now_ms = 0
+            self.start = self.stop = start
+        if stop > self.stop:
+            self._schedule(self.stop, stop)
+            self.stop = stop
+
+        self.changed = []
+        self._reveal_due()
+        if self.pending:
+            self._churn(self.now_ms + step_ms)
+        self.now_ms += step_ms
+        return not self.pending
+
+    def _next_due(self) -> float | None:
+        """Time of the earliest scheduled reveal or mask change, if any."""
+        raise NotImplementedError
+
+    def next_event_ms(self) -> float | None:
+        """Simulated milliseconds until the next character changes.
+
+        Returns:
+            The time until the next reveal or mask change, or None when
+            nothing is scheduled.
+        """
+        if not self.pending:
+            return None
+        due = self._next_due()
+        return None if due is None else max(0, due - self.now_ms)
+
+
+class PythonEngine(Engine):
+    """Reveal simulation that keeps reveals and mask changes in timer wheels."""
+
+    name = "python"
+
+    def __init__(self, effect: NMSEffect, cells: CellStore) -> None:
+        """Initialize the engine.
+
+        Args:
+            effect: Effect whose settings drive the simulation
+            cells: Characters to simulate; the engine keeps a reference, so
+                characters appended to the store later are simulated too
+        """
+        super().__init__(effect, cells)
+        self.wheel = TimerWheel()
+        # Fine slots keep the churn rate from drifting with bucket rounding
+        self.churn_wheel = TimerWheel(slot_ms=1)
+
+    @property
+    def pending(self) -> int:
+        """Number of scheduled characters not revealed yet."""
+        return len(self.wheel)
+
+    def _reset(self) -> None:
+        """Forget every scheduled character."""
+        self.wheel.clear()
+        self.churn_wheel.clear()
+
+    def _schedule(self, start: int, stop: int) -> None:
+        """Schedule the reveal of a range of characters."""
+        cells = self.cells
+        reveal_times = cells.reveal_times
+        waiting = [
+            index for index, flag in zip(range(start, stop), cells.flags[start:stop])
+            if not flag & (SPACE | REVEALED)
+        ]
+        now_ms = self.now_ms
+        self.wheel.schedule_many(waiting, [now_ms + max(reveal_times[index], 0) for index in waiting])
+        self._schedule_churn(waiting, now_ms)
+
+    def _schedule_churn(self, indices: List[int], from_ms: float) -> None:
+        """Draw the time of the next mask change of some characters."""
+        if not self.churn_mean_ms:
+            return
+        delays = self.effect.random_source.exponentials(self.churn_mean_ms, len(indices))
+        self.churn_wheel.schedule_many(indices, [from_ms + delay for delay in delays])
+
+    def _reveal_due(self) -> None:
+        """Reveal the scheduled characters that are due at ``now_ms``."""
+        flags = self.cells.flags
+        due = self.wheel.pop_due(self.now_ms)
+        for index in due:
+            flags[index] |= REVEALED
+        self.changed.extend(due)
+
+    def _churn(self, until_ms: float) -> None:
+        """Swap the masks of pending characters due to change before a time."""
+        flags = self.cells.flags
+        masks = self.cells.masks
+        # Characters revealed since their churn was scheduled drop out here
+        due = [index for index in self.churn_wheel.pop_due(until_ms) if not flags[index] & REVEALED]
+        codes = self.effect.random_source.choices(self.effect.charset.codes, len(due))
+        for index, code in zip(due, codes):
+            masks[index] = code
+        self.changed.extend(due)
+        self._schedule_churn(due, until_ms)
+
+    def _next_due(self) -> float | None:
+        """Time of the earliest scheduled reveal or mask change, if any."""
+        times = [due for due in (self.wheel.next_due(), self.churn_wheel.next_due()) if due is not None]
+        return min(times) if times else None
+
+
+class NumpyEngine(Engine):
+    """Vectorized reveal simulation backed by NumPy.
+
+    Scheduled characters are kept sorted by reveal time, so each step
+    reveals the next slice of the sorted order. The time of each pending
+    character's next mask change is kept alongside and compared with the
+    clock in one array operation per step. Each step wraps the store's
+    arrays in NumPy views without copying and drops the views before
+    returning so the store can keep growing.
+    """
+
+    name = "numpy"
+
+    def __init__(self, effect: NMSEffect, cells: CellStore) -> None:
+        """Initialize the engine.
+
+        Args:
+            effect: Effect whose settings drive the simulation
+            cells: Characters to simulate; the engine keeps a reference, so
+                characters appended to the store later are simulated too
+        """
+        if not HAS_NUMPY:
+            raise RuntimeError("The numpy engine requires NumPy to be installed")
+        super().__init__(effect, cells)
+        self.rng = effect.random_source.numpy()
+        self.pool = np.array(effect.charset.codes, dtype=np.uint32)
+        self._reset()
+
+    @property
+    def pending(self) -> int:
+        """Number of scheduled characters not revealed yet."""
+        return len(self.order)
+
+    def _reset(self) -> None:
+        """Forget every scheduled character."""
+        self.order = np.zeros(0, dtype=np.intp)
+        self.due = np.zeros(0, dtype=np.int64)
+        self.churn_at = np.zeros(0, dtype=np.float64)
+
+    def _churn_delays(self, count: int) -> Any:
+        """Draw the time until the next mask change of ``count`` characters."""
+        if not self.churn_mean_ms:
+            return np.full(count, np.inf)
+        return self.rng.exponential(self.churn_mean_ms, count)
+
+    def _schedule(self, start: int, stop: int) -> None:
+        """Schedule the reveal of a range of characters."""
+        flags = np.frombuffer(self.cells.flags, dtype=np.uint8)[start:stop]
+        reveal_times = np.frombuffer(self.cells.reveal_times, dtype=np.intc)[start:stop]
+        waiting = np.flatnonzero((flags & (SPACE | REVEALED)) == 0)
+        due = self.now_ms + np.maximum(reveal_times[waiting], 0).astype(np.int64)
+
+        churn_at = self.now_ms + self._churn_delays(waiting.size)
+
+        order = np.concatenate((self.order, waiting + start))
+        due = np.concatenate((self.due, due))
+        churn_at = np.concatenate((self.churn_at, churn_at))
+        sort = np.argsort(due, kind="stable")
+        self.order, self.due, self.churn_at = order[sort], due[sort], churn_at[sort]
+
+    def _reveal_due(self) -> None:
+        """Reveal the scheduled characters that are due at ``now_ms``."""
+        count = int(np.searchsorted(self.due, self.now_ms, side="right"))
+        if count:
+            flags = np.frombuffer(self.cells.flags, dtype=np.uint8)
+            flags[self.order[:count]] |= REVEALED
+            self.changed.extend(self.order[:count].tolist())
+            self.order, self.due = self.order[count:], self.due[count:]
+            self.churn_at = self.churn_at[count:]
+
+    def _next_due(self) -> float | None:
+        """Time of the earliest scheduled reveal or mask change, if any."""
+        if not len(self.due):
+            return None
+        return float(min(self.due[0], self.churn_at.min()))
+
+    def _churn(self, until_ms: float) -> None:
+        """Swap the masks of pending characters due to change before a time."""
+        hit = np.flatnonzero(self.churn_at <= until_ms)
+        if not hit.size:
+            return
+        masks = np.frombuffer(self.cells.masks, dtype=np.uintc)
+        masks[self.order[hit]] = self.pool[self.rng.integers(0, len(self.pool), hit.size)]
+        self.changed.extend(self.order[hit].tolist())
+        self.churn_at[hit] = until_ms + self._churn_delays(hit.size)
+
+
+def apply_clustering_numpy(cells: CellStore, rng: Any = None) -> None:
+    """Vectorized version of ``NMSEffect._apply_clustering``.
+
+    Each non-space character starts a cluster with a 30% chance and pulls
+    itself and up to one neighbour on either side to its reveal time, give
+    or take 200 ms. Where clusters overlap the later one wins, as in the
+    sequential version.
+
+    Args:
+        cells: Characters whose reveal times are adjusted in place
+        rng: NumPy random generator, a new one when omitted
+    """
+    count = len(cells)
+    if not count:
+        return
+    if rng is None:
+        rng = np.random.default_rng()
+
+    times = np.frombuffer(cells.reveal_times, dtype=np.intc)
+    is_space = (np.frombuffer(cells.flags, dtype=np.uint8) & SPACE) != 0
+
+    centers = np.flatnonzero(~is_space & (rng.random(count) < CLUSTER_CHANCE))
+    reach = rng.integers(1, 4, centers.size) // 2
+    base = times[centers]
+
+    # Apply right neighbours first so that, as in the sequential loop, a
+    # cell covered by several clusters ends up with the later cluster's time
+    for offset in (1, 0, -1):
+        chosen = reach >= abs(offset)
+        targets = centers[chosen] + offset
+        bases = base[chosen]
+        inside = (targets >= 0) & (targets < count)
+        targets, bases = targets[inside], bases[inside]
+        keep = ~is_space[targets]
+        targets, bases = targets[keep], bases[keep]
+        jitter = rng.integers(-CLUSTER_JITTER_MS, CLUSTER_JITTER_MS + 1, targets.size)
+        times[targets] = bases + jitter
+
+
+def create_engine(effect: NMSEffect, cells: CellStore) -> Engine:
+    """Create the simulation engine selected on the effect.
+
+    ``auto`` picks the NumPy engine when NumPy is installed.
+
+    Args:
+        effect: Effect whose ``engine`` setting selects the implementation
+        cells: Characters to simulate
+    """
+    if effect.engine == "numpy" or (effect.engine == "auto" and HAS_NUMPY):
+        if HAS_NUMPY:
+            return NumpyEngine(effect, cells)
+    return PythonEngine(effect, cells)
@@ -0,0 +1,292 @@
+"""Export the effect as a self-contained SVG or HTML animation.
+
+The timeline the effect would play is computed once, from the same
+prepared cells, reveal times and colors as a terminal run, and turned
+into CSS keyframe animations that any browser plays without a terminal.
+
+Nothing is stored per frame. The cells of a row that appear in the same
+typing frame become one masked and one revealed ``<text>`` element, in
+which neighbouring cells that reveal in the same frame and share a style
+are merged into one span. Animation delays and styles are shared classes.
+Output size therefore grows with the number of cells, not with cells
+times frames.
+
+Unlike the terminal, the export shows the whole text at once instead of
+a page at a time, and the masks hold still: the jumble phase and the
+churn of masked cells are left out.
+"""
+
+from __future__ import annotations
+
+import html
+import math
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from ..core.cell_store import SPACE
+from ..core.colors import XTERM_COLORS, sgr_color_to_rgb
+from ..core.output import DEFAULT_COLS
+from ..core.screen import Layout
+from ..core.sgr import BOLD, DIM, ITALIC, STRIKE, UNDERLINE, SgrState
+from .nms_effect import JUMBLE_MS, NMSEffect
+
+# Geometry of a character cell in pixels
+FONT_SIZE = 14
+CELL_WIDTH = 8.4
+LINE_HEIGHT = 17
+BASELINE = 13
+PADDING = 8
+
+# Colors of masked text and of the screen
+DEFAULT_FOREGROUND = XTERM_COLORS[7]
+BACKGROUND = "#000000"
+
+# Characters that cannot appear in an XML document
+_INVALID_XML = re.compile("[^\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]")
+
+# Groups fade in as they are typed, masks hide and revealed text shows at
+# its reveal time; the delays come from the group and reveal classes
+_STYLESHEET = (
+    "text{white-space:pre;fill:%s}"
+    ".t{opacity:0;animation:1ms step-end forwards nms-show}"
+    ".m,.r{animation:1ms step-end forwards}"
+    ".m{animation-name:nms-hide}"
+    ".r{visibility:hidden;animation-name:nms-reveal}"
+    "@keyframes nms-show{to{opacity:1}}"
+    "@keyframes nms-hide{to{visibility:hidden}}"
+    "@keyframes nms-reveal{to{visibility:visible}}"
+)
+
+
+class _Segment(NamedTuple):
+    """Cells of a row that appear in the same typing frame.
+
+    Each piece is ``[key, text]``; neighbouring cells with the same key
+    share a piece, and the key of the blanks between cells is None.
+    """
+
+    row: int
+    col: int
+    masks: List[list]
+    texts: List[list]
+
+
+def _add(pieces: List[list], key: Any, text: str) -> None:
+    """Append text to the last piece if it has the same key, else start a piece."""
+    if pieces and pieces[-1][0] == key:
+        pieces[-1][1] += text
+    else:
+        pieces.append([key, text])
+
+
+def _xml_text(text: str) -> str:
+    """Escape text for XML, replacing characters XML cannot hold."""
+    return escape(_INVALID_XML.sub("\ufffd", text))
+
+
+def _hex(rgb: Tuple[int, int, int]) -> str:
+    """Format a color for CSS."""
+    return "#%02x%02x%02x" % rgb
+
+
+def _style_css(state: SgrState) -> str:
+    """Get the CSS declarations drawing text in an SGR state.
+
+    Background colors are not drawn.
+    """
+    rgb = (sgr_color_to_rgb(state.fg) if state.fg else None) or DEFAULT_FOREGROUND
+    attributes = state.attributes
+    if attributes & DIM:
+        rgb = (rgb[0] // 2, rgb[1] // 2, rgb[2] // 2)
+    declarations = [f"fill:{_hex(rgb)}"]
+    if attributes & BOLD:
+        declarations.append("font-weight:bold")
+    if attributes & ITALIC:
+        declarations.append("font-style:italic")
+    lines = [name for bit, name in ((UNDERLINE, "underline"), (STRIKE, "line-through")) if attributes & bit]
+    if lines:
+        declarations.append(f"text-decoration:{' '.join(lines)}")
+    return ";".join(declarations)
+
+
+def _frames(ms: float, frame_ms: float) -> int:
+    """Get the first frame at or after a simulated time."""
+    return max(0, math.ceil(ms / frame_ms - 1e-9))
+
+
+def _seconds(seconds: float) -> str:
+    """Format an animation delay."""
+    return f"{seconds:.3f}".rstrip("0").rstrip(".") + "s"
+
+
+def _tspans(pieces: List[list], classes: Callable[[Any], str]) -> str:
+    """Write pieces of a segment as spans with the classes of their keys."""
+    return "".join(
+        _xml_text(text) if key is None else f'<tspan class="{classes(key)}">{_xml_text(text)}</tspan>'
+        for key, text in pieces
+    )
+
+
+def render_svg(effect: NMSEffect, text: str, cols: int = DEFAULT_COLS) -> str:
+    """Render the effect on a text as an animated SVG document.
+
+    The animation follows the effect's settings: typing duration, speed,
+    frame rate, seed, charset, reveal color and ``preserve_colors``. It
+    always decrypts on its own, after the same pause as auto mode.
+
+    Args:
+        effect: Configured effect whose timeline and colors are used
+        text: Text to encrypt, which may hold ANSI color codes
+        cols: Width of the screen in columns
+
+    Returns:
+        The SVG document.
+    """
+    cells = effect.prepare_text(text)
+    layout = Layout(cols)
+    layout.extend(cells)
+
+    # The terminal timeline in frames; delays are in real seconds
+    total = len(cells)
+    frame_ms = 1000.0 / effect.fps * effect.speed
+    frame_seconds = frame_ms / effect.speed / 1000
+    type_ms = effect.type_duration_ms(total)
+    reveal_start = (
+        _frames(type_ms, frame_ms) * frame_seconds
+        + 1 / effect.speed
+        + _frames(JUMBLE_MS, frame_ms) * frame_seconds
+    )
+
+    reveal_state = SgrState().apply(effect.reveal_color_prefix())
+    state_classes: Dict[str, int] = {}
+    style_classes: Dict[str, int] = {}
+
+    def style_class(style: str) -> int:
+        """Get the class number of a style prefix, sharing equal CSS."""
+        number = state_classes.get(style)
+        if number is None:
+            state = SgrState().apply(style) if style else reveal_state
+            number = style_classes.setdefault(_style_css(state), len(style_classes))
+            state_classes[style] = number
+        return number
+
+    codes = cells.codes
+    clusters = cells.clusters
+    masks = cells.masks
+    flags = cells.flags
+    reveal_times = cells.reveal_times
+    style_ids = cells.style_ids
+    styles = cells.styles
+
+    groups: Dict[int, List[_Segment]] = {}
+    reveals = set()
+    segment: Optional[_Segment] = None
+    key = None
+    end = 0
+    rows = 0
+    for index, row, col, span in layout.place(cells, 0, total):
+        if flags[index] & SPACE:
+            continue
+        appear = _frames((index + 1) * type_ms / total, frame_ms) if type_ms else 0
+        if segment is None or (row, appear) != key:
+            segment = _Segment(row, col, [], [])
+            groups.setdefault(appear, []).append(segment)
+            key = (row, appear)
+        elif col > end:
+            _add(segment.masks, None, " " * (col - end))
+            _add(segment.texts, None, " " * (col - end))
+        end = col + span
+        rows = row + 1
+        if span > 1:
+            # Fonts rarely draw wide characters exactly two cells wide, so
+            # the cells after one are placed afresh
+            key = None
+
+        reveal = _frames(max(reveal_times[index], 0), frame_ms)
+        reveals.add(reveal)
+        _add(segment.masks, reveal, chr(masks[index]) + " " * (span - 1))
+        source = clusters[index] if clusters and index in clusters else chr(codes[index])
+        if source.isspace():
+            _add(segment.texts, None, source)
+        else:
+            style = style_class(styles[style_ids[index]] if effect.preserve_colors else "")
+            _add(segment.texts, (reveal, style), source)
+
+    css = [_STYLESHEET % _hex(DEFAULT_FOREGROUND)]
+    css.extend(f".a{frame}{{animation-delay:{_seconds(frame * frame_seconds)}}}" for frame in sorted(groups))
+    css.extend(
+        f".v{frame}{{animation-delay:{_seconds(reveal_start + frame * frame_seconds)}}}"
+        for frame in sorted(reveals)
+    )
+    css.extend(f".s{number}{{{declarations}}}" for declarations, number in style_classes.items())
+
+    width = round(2 * PADDING + cols * CELL_WIDTH, 1)
+    height = 2 * PADDING + rows * LINE_HEIGHT
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:g}" height="{height}" '
+        f'viewBox="0 0 {width:g} {height}" font-family="monospace" font-size="{FONT_SIZE}" '
+        f'xml:space="preserve">',
+        f"<style>{''.join(css)}</style>",
+        f'<rect width="100%" height="100%" fill="{BACKGROUND}"/>',
+    ]
+    for frame in sorted(groups):
+        parts.append(f'<g class="t a{frame}">')
+        for segment in groups[frame]:
+            position = f'x="{round(PADDING + segment.col * CELL_WIDTH, 1):g}" y="{PADDING + segment.row * LINE_HEIGHT + BASELINE}"'
+            parts.append(f'<text {position}>{_tspans(segment.masks, lambda reveal: f"m v{reveal}")}</text>')
+            if any(key is not None for key, _ in segment.texts):
+                revealed = _tspans(segment.texts, lambda key: f"r v{key[0]} s{key[1]}")
+                parts.append(f"<text {position}>{revealed}</text>")
+        parts.append("</g>")
+    parts.append("</svg>")
+    return "\n".join(parts) + "\n"
+
+
+def render_html(
+    effect: NMSEffect, text: str, cols: int = DEFAULT_COLS, title: str = "No More Secrets"
+) -> str:
+    """Render the effect on a text as an HTML page holding the SVG animation.
+
+    Args:
+        effect: Configured effect whose timeline and colors are used
+        text: Text to encrypt, which may hold ANSI color codes
+        cols: Width of the screen in columns
+        title: Title of the page
+
+    Returns:
+        The HTML document.
+    """
+    return (
+        "<!DOCTYPE html>\n"
+        '<html>\n<head>\n<meta charset="utf-8">\n'
+        f"<title>{html.escape(title)}</title>\n"
+        f"<style>body{{margin:0;background:{BACKGROUND}}}</style>\n"
+        "</head>\n<body>\n"
+        f"{render_svg(effect, text, cols)}"
+        "</body>\n</html>\n"
+    )
+
+
+def export_animation(effect: NMSEffect, text: str, path: str, cols: int = DEFAULT_COLS) -> None:
+    """Write the animation to an SVG or HTML file, chosen by its extension.
+
+    Args:
+        effect: Configured effect whose timeline and colors are used
+        text: Text to encrypt, which may hold ANSI color codes
+        path: File to write, ending in ``.svg``, ``.html`` or ``.htm``
+        cols: Width of the screen in columns
+
+    Raises:
+        ValueError: If the extension is not one of these
+        OSError: If the file cannot be written
+    """
+    suffix = path.lower().rpartition(".")[2]
+    if suffix == "svg":
+        document = render_svg(effect, text, cols)
+    elif suffix in ("html", "htm"):
+        document = render_html(effect, text, cols)
+    else:
+        raise ValueError(f"Cannot export to '{path}': use a .svg or .html file")
+    with open(path, "w", encoding="utf-8") as stream:
+        stream.write(document)
@@ -0,0 +1,137 @@
+"""Line ring buffer for following a stream that never ends (``tail -f``)."""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Deque, Iterator, List, Optional, Tuple
+
+from ..core.cell_store import SPACE, CellStore
+from ..core.screen import NEWLINE, Layout
+from .engine import Engine
+
+DEFAULT_SCROLLBACK = 1000
+
+
+class FollowLine:
+    """One line of followed input, laid out on as many rows as it needs."""
+
+    def __init__(self, cols: int) -> None:
+        """Initialize an empty line.
+
+        Args:
+            cols: Width of the screen in columns
+        """
+        self.cells = CellStore()
+        self.layout = Layout(cols)
+        self.settled = True
+        self.engine: Optional[Engine] = None
+
+    @property
+    def rows(self) -> int:
+        """Number of screen rows the line takes up."""
+        return self.layout.rows
+
+    def add(self, cells: CellStore) -> None:
+        """Append characters to the line."""
+        self.cells.extend(cells)
+        self.layout.extend(cells)
+        if any(not flag & SPACE for flag in cells.flags):
+            self.settled = False
+
+
+class FollowBuffer:
+    """Fixed-size ring buffer of the most recent lines of a stream.
+
+    Lines that fall out of the buffer are dropped together with their
+    characters, so memory stays bounded however long the stream runs.
+    """
+
+    def __init__(self, cols: int, max_lines: int = DEFAULT_SCROLLBACK, max_line_cells: int = 0) -> None:
+        """Initialize the buffer.
+
+        Args:
+            cols: Width of the screen in columns
+            max_lines: Number of lines kept
+            max_line_cells: Start a new line once a line has this many
+                characters; 0 for no limit
+        """
+        self.cols = cols
+        self.max_line_cells = max_line_cells
+        self.lines: Deque[FollowLine] = deque(maxlen=max(1, max_lines))
+        self._current: Optional[FollowLine] = None
+        self._rows_before_current = 0
+
+    @property
+    def total_rows(self) -> int:
+        """Rows used by every line seen so far, including dropped ones."""
+        current = self._current.rows if self._current is not None else 0
+        return self._rows_before_current + current
+
+    def _finish_line(self) -> None:
+        """Close the current line so the next character starts a new one."""
+        if self._current is not None:
+            self._rows_before_current += self._current.rows
+            self._current = None
+
+    def extend(self, cells: Any) -> None:
+        """Add characters, splitting them into lines at newlines.
+
+        Args:
+            cells: A CellStore or a sequence of CharAttr-like objects
+        """
+        if not isinstance(cells, CellStore):
+            cells = CellStore.from_attrs(cells)
+        start = 0
+        for index, code in enumerate(cells.codes):
+            if code == NEWLINE:
+                self._add_to_current(cells.slice(start, index), force=True)
+                start = index + 1
+                self._finish_line()
+                continue
+            if self.max_line_cells and index + 1 - start + self._current_length() >= self.max_line_cells:
+                self._add_to_current(cells.slice(start, index + 1))
+                start = index + 1
+                self._finish_line()
+        self._add_to_current(cells.slice(start, len(cells)))
+
+    def _current_length(self) -> int:
+        """Number of characters already on the current line."""
+        return len(self._current.cells) if self._current is not None else 0
+
+    def _add_to_current(self, cells: CellStore, force: bool = False) -> None:
+        """Append characters to the current line, starting one if needed.
+
+        Args:
+            cells: Characters to append
+            force: Start a line even when there is nothing to append
+        """
+        if not len(cells) and not force:
+            return
+        if self._current is None:
+            self._current = FollowLine(self.cols)
+            self.lines.append(self._current)
+        if len(cells):
+            self._current.add(cells)
+
+    def visible(self, height: int) -> Iterator[Tuple[FollowLine, int]]:
+        """Yield the lines on a screen showing the last ``height`` rows.
+
+        Args:
+            height: Number of rows on screen
+
+        Yields:
+            (line, row) pairs where row is the screen row of the line's first
+            row; it is negative when the top of the line is scrolled off.
+        """
+        shown: List[FollowLine] = []
+        used = 0
+        for line in reversed(self.lines):
+            if used >= height:
+                break
+            shown.append(line)
+            used += line.rows
+
+        row = min(height, self.total_rows) - used
+        for line in reversed(shown):
+            yield line, row
+            row += line.rows
@@ -2,23 +2,94 @@
 
 from __future__ import annotations
 
-import random
 import re
 import sys
-import time
-from typing import List
-
-from ..core.char_attr import CharAttr
-from ..core.charset import (
-    get_random_char,
-    get_random_char_excluding_control,
-    get_random_printable_char,
-    get_random_extended_char,
-    get_random_box_drawing_char,
-)
+from array import array
+from itertools import takewhile
+from typing import Dict, Iterable, List, Tuple
+
+from ..core.cell_store import REVEALED, SPACE, UTF32, WIDTH_SHIFT, CellStore, StyleTable
+from ..core.charset import CHARSETS, Charset
+from ..core.clock import Clock, RealClock, VirtualClock
 from ..core.colors import Colors, get_color_map, get_color_prefix, hex_to_rgb, rgb_to_ansi
-from ..core.terminal import Terminal, enable_ansi_colors
-from ..utils.encoding import get_char_width
+from ..core.frame_writer import FrameWriter
+from ..core.output import OutputBackend, TerminalBackend
+from ..core.random_source import RandomSource
+from ..core.scheduler import DEFAULT_FPS, FrameScheduler
+from ..core.sgr import DEFAULT_STATE, SgrState
+from ..core.screen import DiffRenderer, Layout, ScreenBuffer
+from ..core.terminal import enable_ansi_colors
+from ..utils.ansi import ANSI_PATTERN
+from ..utils.encoding import EncodingRepairer, get_char_width
+from ..utils.grapheme import cluster_width, joined_clusters
+from ..utils.input_handler import BackgroundReader
+from .engine import (
+    CLUSTER_CHANCE,
+    CLUSTER_JITTER_MS,
+    DEFAULT_CHURN_RATE,
+    ENGINES,
+    HAS_NUMPY,
+    Engine,
+    NUMPY_MIN_CELLS,
+    PythonEngine,
+    apply_clustering_numpy,
+    create_engine,
+)
+from .follow import DEFAULT_SCROLLBACK, FollowBuffer
+
+# Duration of the jumble phase in simulated milliseconds
+JUMBLE_MS = 2000
+
+# Without an explicit duration, typing takes this long per character, capped
+TYPE_MS_PER_CHAR = 4
+MAX_AUTO_TYPE_MS = 2000
+
+# Pause before scrolling to the next page of a long input in auto mode
+PAGE_HOLD_MS = 1000
+
+# Pages of input laid out ahead of the screen, counting the one shown
+LOOKAHEAD_PAGES = 2
+
+# Longest escape sequence held back when a chunk ends in the middle of one
+MAX_ESCAPE_LENGTH = 32
+
+
+def _token_pattern(repairer: EncodingRepairer) -> re.Pattern[str]:
+    """Compile a pattern matching escape sequences and a repairer's mojibake."""
+    return re.compile(f"{ANSI_PATTERN.pattern}|{repairer.pattern.pattern}")
+
+
+_default_repairer = EncodingRepairer()
+
+# Escape sequences and mojibake to repair, longest mojibake first
+TOKEN_PATTERN = _token_pattern(_default_repairer)
+
+# Whitespace shown unmasked, keyed by the mask_blank setting
+UNMASKED_PATTERNS = {False: re.compile(r'\s'), True: re.compile(r'[^\S ]')}
+
+
+class _CellFlags(Dict[str, int]):
+    """Flags byte of each distinct character, computed on first use."""
+    
+    def __init__(self, mask_blank: bool) -> None:
+        """Initialize an empty table for a mask_blank setting."""
+        super().__init__()
+        self.mask_blank = mask_blank
+    
+    def __missing__(self, char: str) -> int:
+        """Compute and remember the flags of a new character."""
+        is_space = char.isspace() and (not self.mask_blank or char != ' ')
+        flag = get_char_width(char) << WIDTH_SHIFT | (SPACE if is_space else 0)
+        self[char] = flag
+        return flag
+
+
+# Flags of every ASCII character as a bytes.translate table, keyed by the
+# mask_blank setting
+ASCII_FLAGS = {
+    blank: bytes(_CellFlags(blank)[chr(byte)] for byte in range(128)) + bytes(128)
+    for blank in (False, True)
+}
 
 
 class NMSEffect:
@@ -33,6 +104,21 @@ class NMSEffect:
         self.custom_hex_color: str | None = None
         self.preserve_colors = False
         self.charset_mode = "full"  # "full", "no_control", "printable", "extended", "box_drawing"
+        self.charset = CHARSETS["full"]
+        self.fps = DEFAULT_FPS
+        self.speed = 1.0
+        self.type_duration: float | None = None
+        self.scrollback = DEFAULT_SCROLLBACK
+        self.churn_rate = DEFAULT_CHURN_RATE
+        self.repairer = _default_repairer
+        self._token_pattern = TOKEN_PATTERN
+        self.engine = "auto"  # "auto", "python", "numpy"
+        self.random_source = RandomSource()
+        self.backend: OutputBackend | None = None
+        self.clock: Clock | None = None
+        self.frame_writer: FrameWriter | None = None
+        self.received_text = False
+        self._start_stream()
     
     def set_auto_decrypt(self, setting: bool) -> None:
         """Set auto-decrypt mode."""
@@ -73,108 +159,323 @@ class NMSEffect:
         """Set whether to preserve original terminal colors."""
         self.preserve_colors = setting
     
+    def set_fps(self, fps: float) -> None:
+        """Set the maximum number of frames drawn per second."""
+        if fps > 0:
+            self.fps = fps
+        else:
+            print(f"ERROR: Invalid frame rate '{fps}'. Use a positive number", file=sys.stderr)
+            self.fps = DEFAULT_FPS
+    
+    def set_speed(self, speed: float) -> None:
+        """Set the animation speed multiplier (2.0 plays twice as fast)."""
+        if speed > 0:
+            self.speed = speed
+        else:
+            print(f"ERROR: Invalid speed '{speed}'. Use a positive number", file=sys.stderr)
+            self.speed = 1.0
+    
+    def set_type_duration(self, seconds: float | None) -> None:
+        """Set how long typing out the scrambled text takes.
+        
+        Args:
+            seconds: Target duration, or None to derive it from the text length
+        """
+        if seconds is None or seconds >= 0:
+            self.type_duration = seconds
+        else:
+            print(f"ERROR: Invalid type duration '{seconds}'. Use zero or more seconds", file=sys.stderr)
+            self.type_duration = None
+    
+    def type_duration_ms(self, count: int) -> float:
+        """Get the typewriter phase duration in simulated milliseconds.
+        
+        Args:
+            count: Number of characters typed in the phase
+        """
+        if self.type_duration is not None:
+            return self.type_duration * 1000
+        return min(count * TYPE_MS_PER_CHAR, MAX_AUTO_TYPE_MS)
+    
+    def set_scrollback(self, lines: int) -> None:
+        """Set how many lines follow mode keeps in its ring buffer."""
+        if lines > 0:
+            self.scrollback = lines
+        else:
+            print(f"ERROR: Invalid scrollback '{lines}'. Use a positive number of lines", file=sys.stderr)
+            self.scrollback = DEFAULT_SCROLLBACK
+    
+    def set_churn_rate(self, rate: float) -> None:
+        """Set how many times per second each scrambled character changes.
+        
+        Args:
+            rate: Average mask changes per second, or 0 to keep masks fixed
+        """
+        if rate >= 0:
+            self.churn_rate = rate
+        else:
+            print(f"ERROR: Invalid churn rate '{rate}'. Use zero or a positive number", file=sys.stderr)
+            self.churn_rate = DEFAULT_CHURN_RATE
+    
+    def set_encoding_fixes(self, fixes: Dict[str, str]) -> None:
+        """Repair more kinds of mojibake while parsing input.
+        
+        Args:
+            fixes: Garbled text to correct text, used besides the built-in
+                replacements, e.g. from ``load_encoding_fixes``
+        """
+        try:
+            self.repairer = EncodingRepairer(fixes)
+        except ValueError as e:
+            print(f"ERROR: {e}. Using the built-in replacements", file=sys.stderr)
+            self.repairer = _default_repairer
+        self._token_pattern = _token_pattern(self.repairer)
+    
+    def set_engine(self, engine: str) -> None:
+        """Set the simulation engine.
+        
+        Args:
+            engine: One of "auto", "python", "numpy"; "auto" uses NumPy when
+                it is installed
+        """
+        if engine not in ENGINES:
+            print(f"ERROR: Invalid engine '{engine}'. Valid engines: {', '.join(ENGINES)}", file=sys.stderr)
+            self.engine = "auto"
+        elif engine == "numpy" and not HAS_NUMPY:
+            print("ERROR: The numpy engine requires NumPy. Falling back to the python engine", file=sys.stderr)
+            self.engine = "python"
+        else:
+            self.engine = engine
+    
+    def _uses_numpy(self) -> bool:
+        """Check whether the vectorized engine is in use."""
+        return HAS_NUMPY and self.engine in ("auto", "numpy")
+    
+    def set_seed(self, seed: int | None) -> None:
+        """Seed the random source so masks and reveal times repeat between runs.
+        
+        Args:
+            seed: Seed value, or None for a different run every time
+        """
+        self.random_source = RandomSource(seed)
+    
     def set_charset_mode(self, mode: str) -> None:
         """Set the character set mode for scrambling effect.
         
         Args:
-            mode: One of "full", "no_control", "printable", "extended", "box_drawing"
+            mode: One of "full", "no_control", "printable", "extended", "box_drawing",
+                or the name of a charset added with ``register_charset``
         """
-        valid_modes = ["full", "no_control", "printable", "extended", "box_drawing"]
-        if mode in valid_modes:
+        if mode in CHARSETS:
             self.charset_mode = mode
         else:
-            print(f"ERROR: Invalid charset mode '{mode}'. Valid modes: {', '.join(valid_modes)}", file=sys.stderr)
+            print(f"ERROR: Invalid charset mode '{mode}'. Valid modes: {', '.join(CHARSETS)}", file=sys.stderr)
             self.charset_mode = "full"
+        self.charset = CHARSETS[self.charset_mode]
     
+    def set_custom_charset(self, chars: Iterable[str], name: str = "custom") -> None:
+        """Scramble with a user-defined set of characters.
+        
+        Args:
+            chars: Characters to scramble with, e.g. from
+                ``load_charset_file`` or ``parse_unicode_ranges``
+            name: Name reported as the charset mode
+        """
+        try:
+            self.charset = Charset(name, chars)
+            self.charset_mode = name
+        except ValueError as e:
+            print(f"ERROR: {e}. Using the full charset", file=sys.stderr)
+            self.set_charset_mode("full")
+
+    def set_backend(self, backend: OutputBackend | None) -> None:
+        """Send frames to an output backend instead of the terminal.
+
+        Args:
+            backend: Backend such as a ``StreamBackend`` or
+                ``HeadlessBackend``, or None for the terminal on stdout
+        """
+        self.backend = backend
+
+    def set_clock(self, clock: Clock | None) -> None:
+        """Read time from and sleep on a given clock.
+
+        Args:
+            clock: Clock such as a ``VirtualClock``, under which a whole run
+                takes no real time, or None for the backend's default: the
+                wall clock, or a virtual clock for a headless backend
+        """
+        self.clock = clock
+
     def _get_scramble_char(self) -> str:
         """Get a scrambling character based on the current charset mode."""
-        if self.charset_mode == "full":
-            return get_random_char()
-        elif self.charset_mode == "no_control":
-            return get_random_char_excluding_control()
-        elif self.charset_mode == "printable":
-            return get_random_printable_char()
-        elif self.charset_mode == "extended":
-            return get_random_extended_char()
-        elif self.charset_mode == "box_drawing":
-            return get_random_box_drawing_char()
-        else:
-            return get_random_char()  # fallback
+        return self.random_source.choice(self.charset.chars)
     
-    def parse_ansi_text(self, text: str) -> List[CharAttr]:
+    def _get_scramble_chars(self, count: int) -> List[str]:
+        """Get ``count`` scrambling characters in one call."""
+        return self.random_source.choices(self.charset.chars, count)
+    
+    def parse_ansi_text(self, text: str) -> CellStore:
         """Parse text with ANSI codes and preserve color information."""
-        char_attrs = []
-        current_color = ""
+        self._start_stream()
+        return self._parse_chunk(text, final=True)
+    
+    def _start_stream(self) -> None:
+        """Reset parser state before parsing a new text or stream."""
+        self._stream_style = DEFAULT_STATE
+        self._stream_tail = ""
+        self._styles = StyleTable()
+        self._style_ids: Dict[SgrState, int] = {DEFAULT_STATE: 0}
+        self._cell_flags = _CellFlags(self.mask_blank)
+        self.saw_ansi = False
+    
+    def _parse_chunk(self, text: str, final: bool = False) -> CellStore:
+        """Parse the next piece of a text that may arrive in several chunks.
         
-        # More comprehensive ANSI escape sequence pattern
-        ansi_pattern = re.compile(r'\033\[[0-9;]*[a-zA-Z]')
+        SGR sequences are folded into the style in effect, which carries
+        over between chunks; other escape sequences are dropped. An escape
+        sequence or mojibake cut off at the end of a chunk is held back
+        until the rest of it arrives.
         
-        i = 0
-        while i < len(text):
-            # Check for ANSI escape sequence
-            if text[i:i+1] == '\033':
-                # Find the full ANSI sequence
-                match = ansi_pattern.match(text[i:])
-                if match:
-                    ansi_code = match.group()
-                    if ansi_code == '\033[0m':
-                        current_color = ""  # Reset color
-                    else:
-                        # Only store color if we're preserving colors
-                        if self.preserve_colors:
-                            current_color = ansi_code
-                    i += len(ansi_code)
-                    continue
-            
-            # Regular character
-            char = text[i]
-            
-            # Determine if it's a space character we should preserve
-            is_space = char.isspace() and (not self.mask_blank or char != ' ')
-            
-            # For non-space characters, use a mask based on charset mode
-            if is_space:
-                mask = char
-            else:
-                mask = self._get_scramble_char()
-            
-            # Get display width
-            width = get_char_width(char)
-            
-            # Set reveal time - create clusters by grouping characters
-            reveal_time = random.randint(1000, 6000)  # 1-6 seconds
-            
-            char_attrs.append(CharAttr(char, mask, width, is_space, reveal_time, current_color))
-            i += 1
+        Args:
+            text: Next chunk of text
+            final: Whether this is the last chunk
+        """
+        state = self._stream_style
+        text = self._stream_tail + text
+        self._stream_tail = ""
+        
+        if not final:
+            cut = self.repairer.incomplete_start(text)
+            escape = text.rfind('\033', max(0, len(text) - MAX_ESCAPE_LENGTH))
+            if escape != -1 and not ANSI_PATTERN.match(text, escape):
+                cut = min(cut, escape)
+            self._stream_tail = text[cut:]
+            text = text[:cut]
+        
+        # One sweep finds escape sequences and mojibake; the plain text
+        # between them is collected with its style and turned into cells
+        # in bulk afterwards
+        pieces: List[str] = []
+        style_ids = array('H')
+        pos = 0
+        fixes = self.repairer.fixes
+        for match in self._token_pattern.finditer(text):
+            piece = text[pos:match.start()]
+            token = match.group()
+            pos = match.end()
+            is_escape = token[0] == '\033'
+            if not is_escape:
+                # Repair the mojibake as if it had arrived correctly encoded
+                piece += fixes[token]
+            if piece:
+                pieces.append(piece)
+                style_ids.extend(array('H', [self._style_id(state)]) * len(piece))
+            if is_escape:
+                self.saw_ansi = True
+                # Only track styles if we're preserving colors
+                if self.preserve_colors and token[-1] == 'm':
+                    state = state.apply(token)
+        pieces.append(text[pos:])
+        style_ids.extend(array('H', [self._style_id(state)]) * (len(text) - pos))
+        
+        self._stream_style = state
+        cells = CellStore(self._styles)
+        self._append_text(cells, "".join(pieces), style_ids)
         
         # Apply clustering effect
-        self._apply_clustering(char_attrs)
+        self._apply_clustering(cells)
         
-        return char_attrs
+        return cells
+    
+    def _style_id(self, state: SgrState) -> int:
+        """Get the style table index of an SGR state, interning it if new."""
+        style_id = self._style_ids.get(state)
+        if style_id is None:
+            style_id = self._style_ids[state] = self._styles.intern(state.sequence)
+        return style_id
     
-    def _apply_clustering(self, char_attrs: List[CharAttr]) -> None:
+    def _append_text(self, cells: CellStore, text: str, style_ids: array) -> None:
+        """Append plain text to a store, building each column in bulk.
+        
+        Masks and reveal times (1-6 seconds) are drawn for the whole text at
+        once. Flags of ASCII text come from a translate table, others are
+        looked up per distinct character. Grapheme clusters of several code
+        points become one cell each, styled like their first code point.
+        """
+        clusters: Dict[int, str] = {}
+        matches = list(joined_clusters(text))
+        if matches:
+            # Keep the first code point of each cluster in the text
+            pieces: List[str] = []
+            kept = array('H')
+            pos = 0
+            for match in matches:
+                start = match.start()
+                clusters[start - (pos - len(kept))] = match.group()
+                pieces.append(text[pos:start + 1])
+                kept.extend(style_ids[pos:start + 1])
+                pos = match.end()
+            pieces.append(text[pos:])
+            kept.extend(style_ids[pos:])
+            text = "".join(pieces)
+            style_ids = kept
+        
+        count = len(text)
+        codes = array('I')
+        codes.frombytes(text.encode(UTF32, 'surrogatepass'))
+        
+        # Whitespace we preserve is shown as itself instead of a mask
+        masks = array('I', self.random_source.choices(self.charset.codes, count))
+        for match in UNMASKED_PATTERNS[self.mask_blank].finditer(text):
+            masks[match.start()] = codes[match.start()]
+        
+        flags: bytes | bytearray
+        if text.isascii():
+            # The common case: every flag comes from one table lookup in C
+            flags = text.encode('ascii').translate(ASCII_FLAGS[self.mask_blank])
+        else:
+            if self._cell_flags.mask_blank != self.mask_blank:
+                self._cell_flags = _CellFlags(self.mask_blank)
+            flags = bytearray(map(self._cell_flags.__getitem__, text))
+            for index, cluster in clusters.items():
+                flags[index] = cluster_width(cluster) << WIDTH_SHIFT
+        
+        reveal_times = array('i', self.random_source.randints(1000, 6000, count))
+        cells.append_columns(codes, masks, reveal_times, flags, style_ids, clusters)
+    
+    def _apply_clustering(self, char_attrs: CellStore) -> None:
         """Apply clustering effect to character attributes."""
-        for i in range(len(char_attrs)):
-            if not char_attrs[i].is_space:
-                # 30% chance to create a cluster
-                if random.random() < 0.3:
-                    base_time = char_attrs[i].reveal_time
-                    # Cluster with 1-3 adjacent characters
-                    cluster_size = random.randint(1, 3)
-                    for j in range(max(0, i-cluster_size//2), min(len(char_attrs), i+cluster_size//2+1)):
-                        if not char_attrs[j].is_space:
-                            # Make nearby characters reveal around the same time
-                            char_attrs[j].reveal_time = base_time + random.randint(-200, 200)
-    
-    def prepare_text(self, text: str) -> List[CharAttr]:
+        if self._uses_numpy() and len(char_attrs) >= NUMPY_MIN_CELLS:
+            apply_clustering_numpy(char_attrs, self.random_source.numpy())
+            return
+        flags = char_attrs.flags
+        reveal_times = char_attrs.reveal_times
+        source = self.random_source
+        
+        # 30% chance for each character to create a cluster
+        centers = [i for i in source.hits(len(char_attrs), CLUSTER_CHANCE) if not flags[i] & SPACE]
+        # Cluster with 1-3 adjacent characters
+        cluster_sizes = source.randints(1, 3, len(centers))
+        jitter = iter(source.randints(-CLUSTER_JITTER_MS, CLUSTER_JITTER_MS, 3 * len(centers)))
+        for i, cluster_size in zip(centers, cluster_sizes):
+            base_time = reveal_times[i]
+            for j in range(max(0, i-cluster_size//2), min(len(char_attrs), i+cluster_size//2+1)):
+                if not flags[j] & SPACE:
+                    # Make nearby characters reveal around the same time
+                    reveal_times[j] = base_time + next(jitter)
+    
+    def prepare_text(self, text: str) -> CellStore:
         """Prepare text for the decryption effect."""
         # Always parse ANSI codes to properly handle colored input
         # But only preserve colors if preserve_colors is True
         return self.parse_ansi_text(text)
     
-    def _prepare_text_simple(self, text: str) -> List[CharAttr]:
+    def _prepare_text_simple(self, text: str) -> CellStore:
         """Prepare text without ANSI parsing (original method)."""
-        char_attrs = []
+        char_attrs = CellStore()
+        masks = self._get_scramble_chars(len(text))
+        reveal_times = self.random_source.randints(1000, 6000, len(text))
         
         # Handle the text character by character, including multi-byte UTF-8
         i = 0
@@ -189,19 +490,12 @@ class NMSEffect:
             is_space = char.isspace() and (not self.mask_blank or char != ' ')
             
             # For non-space characters, use a mask based on charset mode
-            if is_space:
-                mask = char
-            else:
-                mask = self._get_scramble_char()
+            mask = char if is_space else masks[i]
             
             # Get display width
             width = get_char_width(char)
             
-            # Set reveal time - create clusters by grouping characters
-            # Characters reveal in waves across the text
-            reveal_time = random.randint(1000, 6000)  # 1-6 seconds
-            
-            char_attrs.append(CharAttr(char, mask, width, is_space, reveal_time))
+            char_attrs.append(char, mask, width, is_space, reveal_times[i])
             i += 1
         
         # Apply clustering effect
@@ -209,147 +503,464 @@ class NMSEffect:
         
         return char_attrs
     
-    def _wait_for_keypress(self) -> None:
-        """Wait for a keypress in a cross-platform way."""
-        try:
-            if Terminal.get_platform() == 'windows':
-                try:
-                    import msvcrt
-                    msvcrt.getch()
-                except ImportError:
-                    time.sleep(2)  # Fallback if msvcrt not available
+    def _draw_cells(
+        self,
+        back: ScreenBuffer,
+        char_attrs: CellStore,
+        layout: Layout,
+        start: int,
+        stop: int,
+        row_offset: int,
+        color_prefix: str,
+        jumble: bool = False,
+    ) -> None:
+        """Draw the current state of a range of characters into a buffer.
+
+        Args:
+            back: Buffer receiving the cells
+            char_attrs: Character attributes to draw
+            layout: Layout the characters were placed with
+            start: First index to draw
+            stop: Index after the last one to draw
+            row_offset: Added to each layout row to get the screen row
+            color_prefix: Escape prefix for revealed characters
+            jumble: Draw a fresh scramble character for every masked cell
+        """
+        placed = (
+            (index, row + row_offset, col, span)
+            for index, row, col, span in layout.place(char_attrs, start, stop)
+        )
+        self._draw_placed(back, char_attrs, placed, stop - start, color_prefix, jumble)
+
+    def _draw_placed(
+        self,
+        back: ScreenBuffer,
+        char_attrs: CellStore,
+        placed: Iterable[Tuple[int, int, int, int]],
+        count: int,
+        color_prefix: str,
+        jumble: bool = False,
+    ) -> None:
+        """Draw the current state of characters at known screen positions.
+
+        Args:
+            back: Buffer receiving the cells
+            char_attrs: Character attributes to draw
+            placed: (index, row, col, span) of each character to draw
+            count: At most how many characters ``placed`` holds
+            color_prefix: Escape prefix for revealed characters
+            jumble: Draw a fresh scramble character for every masked cell
+        """
+        codes = char_attrs.codes
+        clusters = char_attrs.clusters
+        masks = char_attrs.masks
+        flags = char_attrs.flags
+        style_ids = char_attrs.style_ids
+        styles = char_attrs.styles
+        put = back.put
+        jumbled = iter(self._get_scramble_chars(count) if jumble else ())
+
+        for index, row, col, span in placed:
+            flag = flags[index]
+
+            if flag & SPACE:
+                put(row, col, " " * span, "", span)
+            elif flag & REVEALED:
+                style = styles[style_ids[index]] if self.preserve_colors else ""
+                if not style:
+                    style = color_prefix
+                source = clusters[index] if clusters and index in clusters else chr(codes[index])
+                put(row, col, source, style, span)
             else:
-                # Unix - set terminal to raw mode temporarily
-                try:
-                    import termios
-                    import tty
-                    fd = sys.stdin.fileno()
-                    old_settings = termios.tcgetattr(fd)
-                    try:
-                        tty.setraw(sys.stdin.fileno())
-                        sys.stdin.read(1)
-                    finally:
-                        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-                except ImportError:
-                    time.sleep(2)  # Fallback if termios/tty not available
-        except Exception:
-            time.sleep(2)  # Fallback
+                mask = next(jumbled) if jumble else chr(masks[index])
+                put(row, col, mask + " " * (span - 1), "", span)
+
+    def _place_page(
+        self, char_attrs: CellStore, layout: Layout, top: int, start: int, stop: int
+    ) -> Dict[int, Tuple[int, int, int, int]]:
+        """Get the screen position of each character on screen.
+
+        Placing characters walks their rows, so it is done once per page
+        rather than on every frame.
+
+        Args:
+            char_attrs: Characters the layout was built from
+            layout: Screen positions of the characters
+            top: First layout row shown on screen
+            start: First index shown on screen
+            stop: Index after the last one shown
+
+        Returns:
+            (index, row, col, span) with the screen row, keyed by index in order.
+        """
+        return {
+            index: (index, row - top, col, span)
+            for index, row, col, span in layout.place(char_attrs, start, stop)
+        }
+
+    def _draw_frame(
+        self,
+        renderer: DiffRenderer,
+        char_attrs: CellStore,
+        page: Dict[int, Tuple[int, int, int, int]],
+        color_prefix: str,
+        jumble: bool = False,
+        until: int | None = None,
+        changed: Iterable[int] | None = None,
+    ) -> str:
+        """Draw the characters inside the viewport into the back buffer.
+
+        Args:
+            renderer: Renderer whose back buffer receives the frame
+            char_attrs: Character attributes to draw
+            page: Positions of the characters on screen, from ``_place_page``
+            color_prefix: Escape prefix for revealed characters
+            jumble: Draw a fresh scramble character for every masked cell
+            until: Only draw the characters before this index
+            changed: Only draw these characters; the others are drawn as
+                they are already
+
+        Returns:
+            The escape sequences for the cells that changed since the last frame.
+        """
+        placed: Iterable[Tuple[int, int, int, int]]
+        if changed is not None:
+            placed = [page[index] for index in changed if index in page]
+        elif until is not None:
+            placed = takewhile(lambda cell: cell[0] < until, page.values())
+        else:
+            placed = page.values()
+        self._draw_placed(renderer.back, char_attrs, placed, len(page), color_prefix, jumble)
+        return renderer.render()
+
+    def _idle_frames(self, engine: Engine, reader: BackgroundReader, scheduler: FrameScheduler) -> int:
+        """Number of frames to wait before the next one that changes anything.
+        
+        While input is still arriving, every frame is drawn so new text
+        shows up promptly.
+        """
+        idle_ms = engine.next_event_ms()
+        if not idle_ms or not reader.done:
+            return 1
+        return max(1, int(idle_ms // scheduler.frame_ms))
+
+    def _read_cells(self, reader: BackgroundReader, timeout: float | None = 0) -> CellStore:
+        """Parse the chunks that arrived since the last call.
+        
+        Once the input has ended, text the parser held back is added too.
+        
+        Args:
+            reader: Reader the chunks come from
+            timeout: Seconds to wait for the first chunk, as in ``poll``
+        """
+        cells = CellStore(self._styles)
+        for chunk in reader.poll(timeout):
+            cells.extend(self._parse_chunk(chunk))
+        if reader.done:
+            cells.extend(self._parse_chunk("", final=True))
+        return cells
+    
+    def _tick(self, scheduler: FrameScheduler, reader: BackgroundReader, frames: int = 1) -> float:
+        """Wait for a later frame slot, as ``FrameScheduler.tick`` does.
+
+        A virtual clock never waits, so while input is still arriving the
+        frame waits for the input instead, for up to one frame of real time.
+        Otherwise frames would be drawn as fast as the CPU allows and
+        virtual time would run far ahead of a slow producer.
+        """
+        if not reader.done and not scheduler.clock.realtime:
+            reader.wait(scheduler.frame_interval)
+        return scheduler.tick(frames)
+    
+    def _pull(self, reader: BackgroundReader, char_attrs: CellStore, layout: Layout, rows: int) -> None:
+        """Add text that arrived since the last frame, until enough rows are laid out.
+        
+        Reading stops once the layout has ``rows`` rows, so input is
+        taken in only as fast as it is shown.
+        """
+        if reader.done or layout.rows > rows:
+            return
+        new_attrs = self._read_cells(reader)
+        if len(new_attrs):
+            char_attrs.extend(new_attrs)
+            layout.extend(new_attrs)
+    
+    def _wait_for_page(self, clock: Clock) -> None:
+        """Pause before scrolling to the next page of a long input."""
+        if self.auto_decrypt:
+            clock.sleep(PAGE_HOLD_MS / 1000 / self.speed)
+        else:
+            self._wait_for_keypress()
+
+    def reveal_color_prefix(self) -> str:
+        """Get the escape prefix used for revealed characters."""
+        if self.custom_hex_color:
+            r, g, b = hex_to_rgb(self.custom_hex_color)
+            return rgb_to_ansi(r, g, b)
+        return get_color_prefix(
+            color_name=None if self.foreground_color == Colors.BLUE else 
+            next((name for name, code in get_color_map().items() if code == self.foreground_color), None)
+        )
+    
+    def _get_backend(self) -> OutputBackend:
+        """Get the backend frames go to, the terminal unless one was set."""
+        return self.backend if self.backend is not None else TerminalBackend()
+
+    def _get_clock(self, backend: OutputBackend) -> Clock:
+        """Get the clock to pace frames with, virtual unless a backend needs real time."""
+        if self.clock is not None:
+            return self.clock
+        return RealClock() if backend.realtime else VirtualClock()
+
+    def _wait_for_keypress(self) -> None:
+        """Wait for a keypress on the output backend, if it has a keyboard."""
+        self._get_backend().wait_for_keypress()
     
     def execute(self, text: str) -> str:
         """Execute the complete NMS effect - movie style."""
         if not text.strip():
             return ""
+        return self.execute_stream([text])
+    
+    def execute_stream(self, chunks: Iterable[str]) -> str:
+        """Execute the effect on text that arrives in pieces, such as a pipe.
+        
+        The animation starts as soon as the first chunk arrives. Text that
+        arrives later is added to the screen and decrypted while the effect
+        runs, and the effect finishes once the input has ended and all of it
+        has been revealed.
+        
+        Args:
+            chunks: Iterable of text chunks, read on a background thread
+        """
+        reader = BackgroundReader(chunks)
+        self._start_stream()
+        self.received_text = False
+        
+        # Wait for the first visible text before taking over the screen
+        char_attrs = CellStore(self._styles)
+        while not self.received_text and not reader.done:
+            char_attrs.extend(self._read_cells(reader, timeout=None))
+            self.received_text = any(not chr(code).isspace() for code in char_attrs.codes)
+        if not self.received_text:
+            return ""
 
         # Enable ANSI colors on Windows
         enable_ansi_colors()
 
-        # Get the color prefix
-        if self.custom_hex_color:
-            r, g, b = hex_to_rgb(self.custom_hex_color)
-            color_prefix = rgb_to_ansi(r, g, b)
-        else:
-            color_prefix = get_color_prefix(
-                color_name=None if self.foreground_color == Colors.BLUE else 
-                next((name for name, code in get_color_map().items() if code == self.foreground_color), None)
-            )
+        color_prefix = self.reveal_color_prefix()
+
+        backend = self._get_backend()
+        clock = self._get_clock(backend)
+        backend.start(clock)
+        writer = FrameWriter(backend=backend)
+        self.frame_writer = writer
 
         try:
             # Save current terminal state and clear screen
-            print("\033[?47h", end='')  # Save screen
-            print("\033[2J", end='')    # Clear screen
-            print("\033[H", end='')     # Home cursor
-            print("\033[?25l", end='')  # Hide cursor
-            sys.stdout.flush()
+            if backend.alternate_screen:
+                writer.write(Colors.SCREEN_SAVE)
+            writer.write(Colors.CLEAR_SCREEN)
+            writer.write(Colors.CURSOR_HOME)
+            writer.write(Colors.CURSOR_HIDE)
+            writer.flush()
             
-            # Prepare character attributes
-            char_attrs = self.prepare_text(text)
+            # Only the rows that fit on screen are simulated and drawn
+            rows, cols = backend.get_size()
+            layout = Layout(cols)
+            layout.extend(char_attrs)
+            renderer = DiffRenderer(rows, cols)
+            scheduler = FrameScheduler(self.fps, self.speed, clock)
+            engine = create_engine(self, char_attrs)
+            top = 0
             
-            # Phase 1: Type out scrambled text
-            print("\033[H", end='')
-            for attr in char_attrs:
-                if attr.is_space:
-                    print(attr.source, end='')
+            # Phase 1: Type out scrambled text, as many characters per frame
+            # as it takes to finish within the target duration
+            start, stop = layout.cell_range(top, top + rows)
+            duration_ms = self.type_duration_ms(stop - start)
+            page_range = None
+            scheduler.start()
+            while True:
+                self._pull(reader, char_attrs, layout, top + LOOKAHEAD_PAGES * rows)
+                start, stop = layout.cell_range(top, top + rows)
+                if (start, stop) != page_range:
+                    page = self._place_page(char_attrs, layout, top, start, stop)
+                    page_range = (start, stop)
+                total = stop - start
+                if scheduler.elapsed_ms >= duration_ms:
+                    count = total
                 else:
-                    print(attr.mask, end='')
-                sys.stdout.flush()
-                time.sleep(0.004)
+                    count = int(total * scheduler.elapsed_ms / duration_ms)
+                writer.write(self._draw_frame(renderer, char_attrs, page, color_prefix, until=start + count))
+                writer.flush()
+                if count == total:
+                    break
+                self._tick(scheduler, reader)
             
             # Wait for keypress or auto-decrypt
             if self.auto_decrypt:
-                time.sleep(1)
+                clock.sleep(1 / self.speed)
             else:
                 self._wait_for_keypress()
             
             # Phase 2: Jumble effect using charset mode
-            start_time = time.time()
-            while time.time() - start_time < 2.0:
-                print("\033[H", end='')
-                for attr in char_attrs:
-                    if attr.is_space:
-                        print(attr.source, end='')
-                    else:
-                        print(self._get_scramble_char(), end='')
-                sys.stdout.flush()
-                time.sleep(0.035)
+            scheduler.start()
+            while scheduler.elapsed_ms < JUMBLE_MS:
+                self._pull(reader, char_attrs, layout, top + LOOKAHEAD_PAGES * rows)
+                start, stop = layout.cell_range(top, top + rows)
+                if (start, stop) != page_range:
+                    page = self._place_page(char_attrs, layout, top, start, stop)
+                    page_range = (start, stop)
+                writer.write(self._draw_frame(renderer, char_attrs, page, color_prefix, jumble=True))
+                writer.flush()
+                self._tick(scheduler, reader)
             
-            # Phase 3: Reveal effect with EXPLICIT color codes
+            # Phase 3: Reveal effect, redrawing only the cells that changed.
+            # The engine schedules reveal times once and only touches the
+            # cells that are due, and only those are drawn again; when
+            # nothing is due, sleep until the next event. Once the screen is
+            # revealed, scroll to expose and decrypt the next rows until the
+            # end of the input is on screen.
+            step_ms = 0
+            carry_ms = 0.0
+            redraw = True
             while True:
-                print("\033[H", end='')  # Go to start of screen
+                self._pull(reader, char_attrs, layout, top + LOOKAHEAD_PAGES * rows)
+                start, stop = layout.cell_range(top, top + rows)
+                all_revealed = engine.step(start, stop, step_ms)
+                if (start, stop) != page_range:
+                    page = self._place_page(char_attrs, layout, top, start, stop)
+                    page_range = (start, stop)
+                    redraw = True
+                changed = None if redraw else engine.changed
+                writer.write(self._draw_frame(renderer, char_attrs, page, color_prefix, changed=changed))
+                writer.flush()
+                redraw = False
                 
-                all_revealed = True
-                any_changed = False
+                if all_revealed and top + rows < layout.rows:
+                    self._wait_for_page(clock)
+                    top = min(top + rows, layout.rows - rows)
+                    # Rows above the screen stay revealed and are never
+                    # shown again, so memory stays proportional to the screen
+                    char_attrs.drop_front(layout.drop_rows(top))
+                    top = 0
+                    engine = create_engine(self, char_attrs)
+                    page_range = None
+                    renderer.back.clear()
+                    scheduler.start()
+                    step_ms = 0
+                    carry_ms = 0.0
+                    continue
+                if all_revealed and reader.done:
+                    break
                 
-                for i, attr in enumerate(char_attrs):
-                    if attr.is_space:
-                        print(attr.source, end='')
-                        continue
-                    
-                    # Check if this character should be revealed
-                    if attr.reveal_time > 0:
-                        # Still scrambled - use charset mode for scrambling
-                        attr.reveal_time -= 50
-                        if random.randint(0, 5) == 0:
-                            attr.mask = self._get_scramble_char()
-                        print(attr.mask, end='')  # WHITE/NORMAL
-                        all_revealed = False
-                    else:
-                        # REVEAL THIS CHARACTER WITH ORIGINAL OR CHOSEN COLOR
-                        if not attr.is_revealed:
-                            attr.is_revealed = True
-                            any_changed = True
-                        
-                        # Choose color based on preserve_colors setting
-                        if self.preserve_colors and attr.original_color:
-                            # Use original color from terminal
-                            color_prefix_final = attr.original_color
-                            if not color_prefix_final.endswith('m'):
-                                color_prefix_final += 'm'
-                            print(color_prefix_final + attr.source + "\033[0m", end='')
-                        else:
-                            # Use selected/custom color
-                            print(color_prefix + attr.source + "\033[0m", end='')
+                carry_ms += self._tick(scheduler, reader, self._idle_frames(engine, reader, scheduler))
+                step_ms = int(carry_ms)
+                carry_ms -= step_ms
+            
+            # Show cursor and wait
+            writer.write(Colors.CURSOR_SHOW)
+            writer.flush()
+            self._wait_for_keypress()
                 
-                sys.stdout.flush()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            # Restore original terminal state
+            writer.write(Colors.CURSOR_SHOW)
+            if backend.alternate_screen:
+                writer.write(Colors.SCREEN_RESTORE)
+            writer.flush()
+        
+        return ""
+    
+    def execute_follow(self, chunks: Iterable[str]) -> str:
+        """Follow a stream that may never end, such as ``tail -f`` output.
+        
+        Each new line decrypts in place at the bottom of the screen while the
+        lines above it stay revealed. Only the most recent lines are kept, in
+        a ring buffer of ``scrollback`` lines, and only lines that are still
+        encrypted and on screen are animated, so memory and per-frame work
+        stay constant however long the stream runs. Returns once the input
+        ends and everything on screen is revealed.
+        
+        Args:
+            chunks: Iterable of text chunks, read on a background thread
+        """
+        reader = BackgroundReader(chunks)
+        self._start_stream()
+        
+        # Enable ANSI colors on Windows
+        enable_ansi_colors()
+        color_prefix = self.reveal_color_prefix()
+        
+        backend = self._get_backend()
+        clock = self._get_clock(backend)
+        backend.start(clock)
+        writer = FrameWriter(backend=backend)
+        self.frame_writer = writer
+        
+        try:
+            if backend.alternate_screen:
+                writer.write(Colors.SCREEN_SAVE)
+            writer.write(Colors.CLEAR_SCREEN)
+            writer.write(Colors.CURSOR_HOME)
+            writer.write(Colors.CURSOR_HIDE)
+            writer.flush()
+            
+            rows, cols = backend.get_size()
+            renderer = DiffRenderer(rows, cols)
+            lines = FollowBuffer(cols, self.scrollback, max_line_cells=rows * cols)
+            scheduler = FrameScheduler(self.fps, self.speed, clock)
+            shown_top = 0
+            step_ms = 0
+            carry_ms = 0.0
+            scheduler.start()
+            
+            while True:
+                lines.extend(self._read_cells(reader))
                 
-                if all_revealed:
+                # Let the terminal scroll older rows up instead of redrawing them
+                top = max(0, lines.total_rows - rows)
+                if top > shown_top:
+                    writer.write(renderer.scroll(top - shown_top))
+                    shown_top = top
+                
+                renderer.back.clear()
+                settled = True
+                for line, row in lines.visible(rows):
+                    if not line.settled:
+                        if line.engine is None:
+                            line.engine = PythonEngine(self, line.cells)
+                        line.settled = line.engine.step(0, len(line.cells), step_ms)
+                        if line.settled:
+                            line.engine = None
+                        settled = settled and line.settled
+                    self._draw_cells(
+                        renderer.back, line.cells, line.layout, 0, len(line.cells), row, color_prefix
+                    )
+                writer.write(renderer.render())
+                writer.flush()
+                
+                if settled and reader.done:
                     break
-                    
-                if any_changed:
-                    time.sleep(0.15)  # Pause on reveals
-                else:
-                    time.sleep(0.05)
+                
+                carry_ms += self._tick(scheduler, reader)
+                step_ms = int(carry_ms)
+                carry_ms -= step_ms
             
             # Show cursor and wait
-            print("\033[?25h", end='')
-            sys.stdout.flush()
+            writer.write(Colors.CURSOR_SHOW)
+            writer.flush()
             self._wait_for_keypress()
-                
+        
         except KeyboardInterrupt:
             pass
         finally:
             # Restore original terminal state
-            print("\033[?25h", end='')  # Show cursor
-            print("\033[?47l", end='')  # Restore screen
-            sys.stdout.flush()
+            writer.write(Colors.CURSOR_SHOW)
+            if backend.alternate_screen:
+                writer.write(Colors.SCREEN_RESTORE)
+            writer.flush()
         
-        return ""
\ No newline at end of file
+        return ""
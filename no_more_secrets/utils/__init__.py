@@ -4,7 +4,9 @@ from __future__ import annotations
 
 from .ansi import extract_ansi_codes, has_ansi_codes, strip_ansi_codes
 from .encoding import fix_encoding_issues, get_char_width, safe_char_decode
+from .grapheme import cluster_width, split_clusters
 from .input_handler import get_input
+from .normalize import VirtualScreen, normalize_screen
 
 __all__ = [
     "extract_ansi_codes",
@@ -13,5 +15,9 @@ __all__ = [
     "fix_encoding_issues",
     "get_char_width", 
     "safe_char_decode",
+    "cluster_width",
+    "split_clusters",
     "get_input",
+    "VirtualScreen",
+    "normalize_screen",
 ]
\ No newline at end of file
@@ -2,58 +2,183 @@
 
 from __future__ import annotations
 
-import unicodedata
-
-
-def fix_encoding_issues(text: str) -> str:
-    """Fix common encoding issues with tree characters."""
-    # Common Windows encoding issues with box-drawing characters
-    replacements = {
-        'Γö£ΓöÇΓöÇ': '├──',  # ├──
-        'ΓööΓöÇΓöÇ': '└──',  # └──
-        'Γöé': '│',           # │
-        'ΓöÇ': '─',           # ─
-        'Γö£': '├',           # ├
-        'Γöö': '└',           # └
-        'Γöé   ': '│   ',     # │ with spaces
-        'â"œâ"€â"€': '├──',      # Alternative encoding
-        'â"‚': '│',            # │
-        'â""â"€â"€': '└──',      # └──
-        'â"€': '─',            # ─
-        'â"œ': '├',            # ├
-        'â""': '└',            # └
-    }
+import json
+import re
+from bisect import bisect_right
+from typing import Dict, Mapping, Optional, Pattern
+
+from ._width_table import WIDE_ENDS, WIDE_STARTS
+
+# Every code point below the first wide range is narrow
+FIRST_WIDE = WIDE_STARTS[0]
+
+# Common Windows encoding issues with box-drawing characters
+ENCODING_FIXES = {
+    'Γö£ΓöÇΓöÇ': '├──',  # ├──
+    'ΓööΓöÇΓöÇ': '└──',  # └──
+    'Γöé': '│',           # │
+    'ΓöÇ': '─',           # ─
+    'Γö£': '├',           # ├
+    'Γöö': '└',           # └
+    'Γöé   ': '│   ',     # │ with spaces
+    'â"œâ"€â"€': '├──',      # Alternative encoding
+    'â"‚': '│',            # │
+    'â""â"€â"€': '└──',      # └──
+    'â"€': '─',            # ─
+    'â"œ': '├',            # ├
+    'â""': '└',            # └
+}
+
+
+def compile_fixes(fixes: Mapping[str, str]) -> Pattern[str]:
+    """Compile garbled sequences into one alternation, longest first.
+
+    Args:
+        fixes: Garbled text to correct text
+
+    Returns:
+        A pattern capturing any of the garbled sequences as its only group;
+        it never matches when there are none.
+    """
+    garbled = sorted(fixes, key=len, reverse=True)
+    return re.compile("(" + "|".join(map(re.escape, garbled)) + ")" if garbled else "(?!)()")
+
+
+class EncodingRepairer:
+    """Replace mojibake in one pass, in a whole text or a stream of chunks.
+
+    Every garbled sequence is found by a single compiled alternation that
+    tries longer sequences first, so ``├──`` is not repaired piecemeal. For
+    chunked input, a chunk ending in what may be the start of a garbled
+    sequence has that end held back until the next chunk arrives.
+    """
+
+    def __init__(self, extra_fixes: Optional[Mapping[str, str]] = None) -> None:
+        """Initialize a repairer.
+
+        Args:
+            extra_fixes: Replacements to use besides :data:`ENCODING_FIXES`,
+                garbled text to correct text; they take precedence
+
+        Raises:
+            ValueError: If a replacement is not a pair of strings or
+                replaces empty text
+        """
+        fixes = dict(ENCODING_FIXES)
+        for garbled, correct in (extra_fixes or {}).items():
+            if not isinstance(garbled, str) or not isinstance(correct, str):
+                raise ValueError(f"Replacement {garbled!r}: {correct!r} is not a pair of strings")
+            if not garbled:
+                raise ValueError(f"Replacement for empty text: {correct!r}")
+            fixes[garbled] = correct
+        self.fixes = fixes
+        self.pattern = compile_fixes(fixes)
+        self._first_chars = frozenset(garbled[0] for garbled in fixes)
+        # Proper prefixes of garbled sequences, which a chunk may end in
+        self._prefixes = {garbled[:end] for garbled in fixes for end in range(1, len(garbled))}
+        self._longest_prefix = max(map(len, self._prefixes), default=0)
+        self._tail = ""
+
+    def fix(self, text: str) -> str:
+        """Repair a complete text."""
+        # Text without the first character of any garbled sequence is
+        # common and needs no regex scan
+        if not any(char in text for char in self._first_chars):
+            return text
+        # Splitting on the captured sequences puts them at odd indices
+        parts = self.pattern.split(text)
+        parts[1::2] = map(self.fixes.__getitem__, parts[1::2])
+        return "".join(parts)
+
+    def incomplete_start(self, text: str) -> int:
+        """Find where a garbled sequence that may be cut off starts.
+
+        Args:
+            text: Text whose end may be followed by more text
+
+        Returns:
+            The index of the longest end of the text that begins a garbled
+            sequence, or ``len(text)`` if there is none.
+        """
+        for length in range(min(self._longest_prefix, len(text)), 0, -1):
+            if text[-length:] in self._prefixes:
+                return len(text) - length
+        return len(text)
+
+    def feed(self, text: str, final: bool = False) -> str:
+        """Repair the next chunk of a text.
+
+        Args:
+            text: Next chunk of text
+            final: Whether this is the last chunk; nothing is held back
+
+        Returns:
+            The repaired text up to any possibly cut off garbled sequence.
+        """
+        text = self._tail + text
+        cut = len(text) if final else self.incomplete_start(text)
+        text, self._tail = text[:cut], text[cut:]
+        return self.fix(text)
+
+
+def load_encoding_fixes(path: str) -> Dict[str, str]:
+    """Read extra replacements from a JSON file.
+
+    The file holds one object mapping garbled text to correct text, e.g.
+    ``{"Ã©": "é"}``.
+
+    Args:
+        path: Path of the file
+
+    Returns:
+        The replacements.
+
+    Raises:
+        ValueError: If the file is not a JSON object of strings
+    """
+    with open(path, encoding="utf-8") as file:
+        try:
+            fixes = json.load(file)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path} is not valid JSON: {e}") from e
+    if not isinstance(fixes, dict) or not all(isinstance(value, str) for value in fixes.values()):
+        raise ValueError(f"{path} must hold a JSON object mapping garbled text to correct text")
+    return fixes
+
+
+_default_repairer = EncodingRepairer()
+
+
+def fix_encoding_issues(text: str, extra_fixes: Optional[Mapping[str, str]] = None) -> str:
+    """Fix common encoding issues with tree characters.
     
-    # Apply replacements
-    for garbled, correct in replacements.items():
-        text = text.replace(garbled, correct)
+    Args:
+        text: Text to repair
+        extra_fixes: Replacements to use besides :data:`ENCODING_FIXES`
     
-    return text
+    Returns:
+        The text with every garbled sequence replaced in one pass.
+    """
+    repairer = EncodingRepairer(extra_fixes) if extra_fixes else _default_repairer
+    return repairer.fix(text)
 
 
 def get_char_width(char: str) -> int:
-    """Get display width of a character."""
+    """Get display width of a character.
+    
+    Widths come from a table of double-width ranges generated from Unicode
+    data by ``scripts/gen_width_table.py``. Box drawing, block elements
+    and geometric shapes are narrow; private use characters, often
+    terminal icons, are wide.
+    """
     try:
-        # Handle common box-drawing and tree characters
-        if ord(char) >= 0x2500 and ord(char) <= 0x257F:  # Box drawing block
-            return 1
-        elif ord(char) >= 0x2580 and ord(char) <= 0x259F:  # Block elements
-            return 1
-        elif ord(char) >= 0x25A0 and ord(char) <= 0x25FF:  # Geometric shapes
-            return 1
-        elif ord(char) >= 0xE000 and ord(char) <= 0xF8FF:  # Private use area (icons)
-            return 2  # Many terminal icons are double-width
-        
-        # Use unicodedata for standard classification
-        width = unicodedata.east_asian_width(char)
-        if width in ('F', 'W'):  # Full-width or Wide
-            return 2
-        elif width in ('H', 'Na', 'N'):  # Half-width, Narrow, or Neutral
-            return 1
-        else:
-            return 1
-    except (ValueError, TypeError):
+        code = ord(char)
+    except TypeError:
+        return 1
+    if code < FIRST_WIDE:
         return 1
+    index = bisect_right(WIDE_STARTS, code) - 1
+    return 2 if index >= 0 and code <= WIDE_ENDS[index] else 1
 
 
 def safe_char_decode(char: str) -> str:
@@ -0,0 +1,183 @@
+"""Extended grapheme clusters: sequences of code points shown as one character.
+
+A letter with combining accents, an emoji with a skin tone or joined to
+others by zero width joiners, and a pair of regional indicators forming a
+flag are each several code points but one character on screen.
+:func:`joined_clusters` finds such clusters with one regex scan, so text
+without any costs nothing more, and :func:`cluster_width` works out the
+display width of each distinct cluster once.
+
+Segmentation follows the rules of Unicode Standard Annex #29 that matter
+for terminal text. Simplifications: CR LF stays two characters, as the
+layout handles each on its own; prepended marks are not joined; and a zero
+width joiner joins any pictograph after it, whatever comes before.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from ._grapheme_table import EXTEND_RANGES
+from .encoding import get_char_width
+
+# Extended_Pictographic is not in unicodedata; these blocks hold nearly all
+# of it, and the few non-emoji in them are only joined after a joiner
+PICTOGRAPHIC_RANGES = (
+    (0x00A9, 0x00A9),
+    (0x00AE, 0x00AE),
+    (0x203C, 0x203C),
+    (0x2049, 0x2049),
+    (0x2122, 0x2122),
+    (0x2139, 0x2139),
+    (0x2194, 0x21AA),
+    (0x2300, 0x23FF),
+    (0x24C2, 0x24C2),
+    (0x25AA, 0x25FE),
+    (0x2600, 0x27BF),
+    (0x2934, 0x2935),
+    (0x2B05, 0x2B55),
+    (0x3030, 0x3030),
+    (0x303D, 0x303D),
+    (0x3297, 0x3299),
+    (0x1F000, 0x1FAFF),
+)
+
+# Hangul jamo: leading consonants, vowels and trailing consonants
+LEADING_JAMO = ((0x1100, 0x115F), (0xA960, 0xA97C))
+VOWEL_JAMO = ((0x1160, 0x11A7), (0xD7B0, 0xD7C6))
+TRAILING_JAMO = ((0x11A8, 0x11FF), (0xD7CB, 0xD7FB))
+
+REGIONAL_INDICATORS = ((0x1F1E6, 0x1F1FF),)
+
+ZERO_WIDTH_JOINER = "\u200d"
+EMOJI_PRESENTATION = "\ufe0f"
+
+# Distinct clusters whose width is remembered; the cache starts over when full
+MAX_CACHED_CLUSTERS = 4096
+
+
+def _char_class(ranges: Sequence[Tuple[int, int]]) -> str:
+    """Build a regex matching one code point in inclusive ranges.
+
+    ``re`` tests a class of Basic Multilingual Plane code points with one
+    bitmap lookup but a class with higher ones range by range, so code
+    points above U+FFFF get their own class, tried only for such code
+    points.
+    """
+    low = [(start, min(end, 0xFFFF)) for start, end in ranges if start <= 0xFFFF]
+    high = [(max(start, 0x10000), end) for start, end in ranges if end > 0xFFFF]
+    alternatives = []
+    if low:
+        alternatives.append("[" + "".join(f"\\u{start:04x}-\\u{end:04x}" for start, end in low) + "]")
+    if high:
+        alternatives.append(
+            r"(?=[\U00010000-\U0010ffff])["
+            + "".join(f"\\U{start:08x}-\\U{end:08x}" for start, end in high)
+            + "]"
+        )
+    return "(?:" + "|".join(alternatives) + ")"
+
+
+_EXTEND = _char_class(EXTEND_RANGES)
+_PICTOGRAPHIC = _char_class(PICTOGRAPHIC_RANGES)
+_REGIONAL = _char_class(REGIONAL_INDICATORS)
+_L = _char_class(LEADING_JAMO)
+_V = _char_class(VOWEL_JAMO)
+_T = _char_class(TRAILING_JAMO)
+# Precomposed Hangul syllables without (LV) and with (LVT) a trailing consonant
+_LV = "[" + "".join(f"\\u{0xAC00 + 28 * index:04x}" for index in range(399)) + "]"
+_LVT = rf"(?!{_LV})[\uac00-\ud7a3]"
+_HANGUL = rf"{_L}*(?:{_V}+|{_LV}{_V}*|{_LVT}){_T}*|{_L}+|{_T}+"
+# First two code points of a Hangul syllable that must stay together, after
+# a cheap test for any Hangul
+_HANGUL_PAIR = (
+    r"(?=[\u1100-\u11ff\ua960-\ua97f\uac00-\ud7ff])"
+    rf"(?:{_L}(?:{_L}|{_V}|{_LV}|{_LVT})|(?:{_LV}|{_V})(?:{_V}|{_T})|(?:{_LVT}|{_T}){_T})"
+)
+
+# What may follow the start of a cluster: marks, joiners and, right after
+# a joiner, a pictograph
+_TAIL = rf"(?:{_EXTEND}|(?<={ZERO_WIDTH_JOINER}){_PICTOGRAPHIC})*"
+
+# Clusters of more than one code point
+JOINED_PATTERN = re.compile(
+    rf"{_REGIONAL}{_REGIONAL}{_TAIL}"
+    rf"|(?={_HANGUL_PAIR})(?:{_HANGUL}){_TAIL}"
+    rf"|[^\x00-\x1f\x7f-\x9f]{_EXTEND}{_TAIL}"
+)
+
+# Code points without which no cluster is joined, to skip the full scan
+JOINING_PATTERN = re.compile(
+    _char_class(EXTEND_RANGES + REGIONAL_INDICATORS + LEADING_JAMO + VOWEL_JAMO + TRAILING_JAMO)
+)
+
+FLAG_PATTERN = re.compile(f"{_REGIONAL}{_REGIONAL}")
+
+
+class _ClusterWidths(Dict[str, int]):
+    """Display width of each distinct cluster, computed on first use."""
+
+    def __missing__(self, cluster: str) -> int:
+        """Compute and remember the width of a new cluster."""
+        if len(self) >= MAX_CACHED_CLUSTERS:
+            self.clear()
+        if EMOJI_PRESENTATION in cluster or FLAG_PATTERN.match(cluster):
+            width = 2
+        else:
+            width = get_char_width(cluster[0])
+        self[cluster] = width
+        return width
+
+
+_widths = _ClusterWidths()
+
+
+def cluster_width(cluster: str) -> int:
+    """Get the display width of a grapheme cluster.
+
+    Flags and clusters asking for emoji presentation are double-width;
+    otherwise the first code point decides, as marks and joined emoji
+    take no columns of their own.
+
+    Args:
+        cluster: One or more code points forming one cluster
+
+    Returns:
+        The number of columns, 1 or 2.
+    """
+    return _widths[cluster]
+
+
+def joined_clusters(text: str) -> Iterator[re.Match[str]]:
+    """Find the clusters of a text that are more than one code point.
+
+    Args:
+        text: Text without escape sequences
+
+    Returns:
+        An iterator of matches, in order; every other code point of the
+        text is a cluster of its own.
+    """
+    if text.isascii() or not JOINING_PATTERN.search(text):
+        return iter(())
+    return JOINED_PATTERN.finditer(text)
+
+
+def split_clusters(text: str) -> List[str]:
+    """Split text into grapheme clusters.
+
+    Args:
+        text: Text without escape sequences
+
+    Returns:
+        The clusters in order; joining them gives back the text.
+    """
+    clusters: List[str] = []
+    pos = 0
+    for match in joined_clusters(text):
+        clusters.extend(text[pos:match.start()])
+        clusters.append(match.group())
+        pos = match.end()
+    clusters.extend(text[pos:])
+    return clusters
@@ -2,12 +2,24 @@
 
 from __future__ import annotations
 
+import codecs
+import mmap
+import os
+import queue
+import stat
 import sys
-from typing import Optional
+import threading
+from typing import BinaryIO, Iterable, Iterator, List, Optional
 
 from ..core.terminal import Terminal
 from .encoding import fix_encoding_issues
 
+# Largest read from a pipe; smaller reads return as soon as data is available
+CHUNK_SIZE = 64 * 1024
+
+# Chunks read ahead of the effect before reading pauses
+MAX_QUEUED_CHUNKS = 16
+
 
 def get_input(prompt: Optional[str] = None) -> str:
     """Get input from pipe or user prompt."""
@@ -44,4 +56,182 @@ def get_input(prompt: Optional[str] = None) -> str:
         return input(prompt)
     else:
         print("Error: No input provided. Use pipe or provide text.", file=sys.stderr)
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+
+def iter_input_chunks(stream: Optional[BinaryIO] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yield decoded text from a pipe as soon as each piece arrives.
+
+    UTF-8 sequences split across reads are decoded incrementally, so no
+    character is broken at a chunk boundary. Encoding repair is left to the
+    effect, which does it while parsing the chunks.
+
+    Args:
+        stream: Binary stream to read, defaults to ``sys.stdin.buffer``
+        chunk_size: Maximum number of bytes per read
+    """
+    if stream is None:
+        stream = sys.stdin.buffer
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    # read1 returns whatever is available instead of waiting for a full chunk
+    read = getattr(stream, 'read1', stream.read)
+
+    while True:
+        try:
+            data = read(chunk_size)
+        except OSError:
+            break
+        if not data:
+            break
+        text = decoder.decode(data)
+        if text:
+            yield text
+
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text
+
+
+def iter_file_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yield decoded text from a file, mapped into memory instead of read.
+
+    Each chunk is decoded from the mapping only when it is asked for, so a
+    file is read no further than the effect has got, and pages already
+    decoded are handed back to the system. Files that cannot be mapped,
+    such as pipes and empty files, are read like piped input.
+
+    Args:
+        path: Path of the file
+        chunk_size: Number of bytes decoded per chunk
+
+    Returns:
+        An iterator of text chunks; the file is closed once it is exhausted.
+
+    Raises:
+        OSError: If the file cannot be opened
+    """
+    file = open(path, 'rb')
+    try:
+        info = os.fstat(file.fileno())
+        if not stat.S_ISREG(info.st_mode) or not info.st_size:
+            return _iter_and_close(file, iter_input_chunks(file, chunk_size))
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        file.seek(0)
+        return _iter_and_close(file, iter_input_chunks(file, chunk_size))
+    except BaseException:
+        file.close()
+        raise
+    return _iter_and_close(file, _iter_mapping(mapping, chunk_size))
+
+
+def _iter_mapping(mapping: mmap.mmap, chunk_size: int) -> Iterator[str]:
+    """Decode a memory mapping chunk by chunk, then close it."""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    # Pages can only be released whole, so only when chunks are made of them
+    release = hasattr(mmap, 'MADV_DONTNEED') and chunk_size % mmap.PAGESIZE == 0
+    try:
+        for pos in range(0, len(mapping), chunk_size):
+            text = decoder.decode(mapping[pos:pos + chunk_size])
+            if release:
+                mapping.madvise(mmap.MADV_DONTNEED, pos, min(chunk_size, len(mapping) - pos))
+            if text:
+                yield text
+        text = decoder.decode(b'', final=True)
+        if text:
+            yield text
+    finally:
+        mapping.close()
+
+
+def _iter_and_close(file: BinaryIO, chunks: Iterator[str]) -> Iterator[str]:
+    """Yield from an iterator of a file's chunks, closing the file at the end."""
+    try:
+        yield from chunks
+    finally:
+        file.close()
+
+
+class BackgroundReader:
+    """Collect chunks from a blocking iterable on a daemon thread."""
+
+    def __init__(self, chunks: Iterable[str], max_chunks: int = MAX_QUEUED_CHUNKS) -> None:
+        """Start reading.
+
+        Args:
+            chunks: Iterable of text chunks, such as :func:`iter_input_chunks`
+            max_chunks: Chunks collected before reading pauses until some
+                are polled; with this back pressure a huge input is not
+                read into memory faster than it is used
+        """
+        self.done = False
+        self.max_chunks = max(1, max_chunks)
+        self._queue: queue.Queue[Optional[str]] = queue.Queue(self.max_chunks + 1)
+        # An item taken off the queue by wait() and not yet polled
+        self._waiting: List[Optional[str]] = []
+        # What stopped reading early, raised by poll() once input ends
+        self._error: Optional[Exception] = None
+        self._thread = threading.Thread(target=self._read, args=(chunks,), daemon=True)
+        self._thread.start()
+
+    def _read(self, chunks: Iterable[str]) -> None:
+        """Move chunks onto the queue, then mark the end of input."""
+        try:
+            for chunk in chunks:
+                self._queue.put(chunk)
+        except Exception as e:
+            self._error = e
+        finally:
+            self._queue.put(None)
+
+    def poll(self, timeout: Optional[float] = 0) -> List[str]:
+        """Return the chunks that arrived since the last call.
+
+        At most ``max_chunks`` chunks are returned at a time, so a reader
+        that is faster than the caller cannot keep one call going.
+
+        Args:
+            timeout: Seconds to wait for the first chunk, None to wait until
+                something arrives or the input ends, 0 to not wait at all
+
+        Raises:
+            Exception: What the iterable raised, when the input ends because
+                of it rather than running out
+        """
+        chunks: List[str] = []
+        if self.done:
+            return chunks
+
+        try:
+            if self._waiting:
+                item = self._waiting.pop()
+            elif timeout != 0:
+                item = self._queue.get(timeout=timeout)
+            else:
+                item = self._queue.get_nowait()
+            while True:
+                if item is None:
+                    self.done = True
+                    if self._error is not None:
+                        raise self._error
+                    break
+                chunks.append(item)
+                if len(chunks) >= self.max_chunks:
+                    break
+                item = self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        return chunks
+
+    def wait(self, timeout: float) -> None:
+        """Block until input arrives or ends, leaving it for the next poll.
+
+        Args:
+            timeout: Most seconds to wait
+        """
+        if self.done or self._waiting:
+            return
+        try:
+            self._waiting.append(self._queue.get(timeout=timeout))
+        except queue.Empty:
+            pass
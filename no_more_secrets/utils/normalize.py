@@ -0,0 +1,259 @@
+"""Replay cursor movement in text to get the screen it would leave behind.
+
+Tools with progress bars redraw the same line many times with carriage
+returns, backspaces and CSI cursor and erase sequences. Decrypting such
+output byte by byte shows every intermediate state. :class:`VirtualScreen`
+interprets those controls instead and keeps only what would be left on a
+terminal of unlimited height, with colors preserved as SGR sequences. Given
+a number of rows, it models a terminal of that height instead.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Iterable, List, Optional, Tuple
+
+from ..core.colors import Colors
+from ..core.screen import TAB_WIDTH
+from ..core.sgr import DEFAULT_STATE, switch_style
+from .grapheme import cluster_width, split_clusters
+
+# A character on the virtual screen: (text, style), where text is one
+# grapheme cluster; the right half of a double-width character has empty text
+Cell = Tuple[str, str]
+
+BLANK: Cell = (" ", "")
+
+# Cursor moves and tabs stop at this column, like the edge of a wide terminal
+MAX_COLUMNS = 1024
+
+CONTROL_PATTERN = re.compile(
+    r'\033\[([0-?]*[ -/]*)([@-~])'            # CSI: parameters and final byte
+    r'|\033\][^\007\033]*(?:\007|\033\\)?'    # OSC, e.g. window titles
+    r'|\033[()#][0-9A-Za-z]|\033.?'           # other escapes
+    r'|([\x00-\x1f\x7f])'                     # control characters
+)
+
+# Parameters of the CSI sequences that are interpreted; private ones such
+# as "?25" and those with intermediate bytes are dropped
+PARAMS_PATTERN = re.compile(r'[0-9;:]*\Z')
+
+# Start of an escape sequence cut off at the end of a chunk
+INCOMPLETE_PATTERN = re.compile(r'\033(?:\[[0-?]*[ -/]*|\][^\007\033]*|[()#])?\Z')
+
+
+class VirtualScreen:
+    """Terminal screen of unlimited height that text can be written to.
+
+    Every control is handled in constant time or in time proportional to
+    the cells it removes, so feeding text takes time linear in its length.
+    Rows below the last one written do not exist: moving the cursor down
+    stops at the last row, and clearing the screen starts over at the top.
+    A screen of fixed height has all its rows from the start, and text
+    scrolls up off the top when a line feed reaches the bottom.
+    """
+
+    def __init__(self, rows: Optional[int] = None) -> None:
+        """Initialize an empty screen with the cursor at the top left.
+
+        Args:
+            rows: Fixed screen height, or None for unlimited height
+        """
+        self.rows = rows
+        self.lines: List[List[Cell]] = [[] for _ in range(rows or 1)]
+        self.row = 0
+        self.col = 0
+        self._state = DEFAULT_STATE
+        self._style = ""
+        self._tail = ""
+
+    def feed(self, text: str) -> None:
+        """Write text, interpreting the controls in it.
+
+        Args:
+            text: Text that may contain control characters and escape
+                sequences; an escape sequence cut off at the end is held
+                back until the next call
+        """
+        text = self._tail + text
+        escape = text.rfind('\033')
+        if escape != -1 and INCOMPLETE_PATTERN.match(text, escape):
+            text, self._tail = text[:escape], text[escape:]
+        else:
+            self._tail = ""
+
+        pos = 0
+        for match in CONTROL_PATTERN.finditer(text):
+            if match.start() > pos:
+                self._write(text[pos:match.start()])
+            pos = match.end()
+            final = match.group(2)
+            if final:
+                self._csi(match.group(1), final)
+            elif match.group(3):
+                self._control(match.group(3))
+        if pos < len(text):
+            self._write(text[pos:])
+
+    def _write(self, run: str) -> None:
+        """Write printable characters at the cursor, overwriting cells."""
+        line = self.lines[self.row]
+        col = self.col
+        if col > len(line):
+            line.extend([BLANK] * (col - len(line)))
+
+        style = self._style
+        if run.isascii():
+            cells = [(char, style) for char in run]
+        else:
+            # A grapheme cluster of several code points takes one cell, or
+            # two when it is wide, like a single character
+            cells = []
+            for cluster in split_clusters(run):
+                cells.append((cluster, style))
+                if cluster_width(cluster) == 2:
+                    cells.append(("", style))
+        line[col:col + len(cells)] = cells
+        self.col = col + len(cells)
+
+    def _control(self, char: str) -> None:
+        """Handle a C0 control character; those without an effect are dropped."""
+        if char == '\n':
+            self._line_feed()
+            self.col = 0
+        elif char in '\x0b\x0c':
+            self._line_feed()
+        elif char == '\r':
+            self.col = 0
+        elif char == '\b':
+            self.col = max(0, self.col - 1)
+        elif char == '\t':
+            self.col = min(MAX_COLUMNS, (self.col // TAB_WIDTH + 1) * TAB_WIDTH)
+
+    def _line_feed(self) -> None:
+        """Move the cursor down a row, adding one at the bottom if needed."""
+        if self.row + 1 == self.rows:
+            self._scroll(1)
+            return
+        self.row += 1
+        if self.row == len(self.lines):
+            self.lines.append([])
+
+    def _scroll(self, count: int) -> None:
+        """Scroll a fixed-height screen up, adding blank rows at the bottom."""
+        count = min(count, len(self.lines))
+        del self.lines[:count]
+        self.lines.extend([] for _ in range(count))
+
+    def _csi(self, params: str, final: str) -> None:
+        """Handle a CSI sequence; unsupported ones are dropped."""
+        if not PARAMS_PATTERN.match(params):
+            return  # Private modes such as cursor visibility
+        if final == 'm':
+            self._state = self._state.apply(f"\033[{params}m")
+            self._style = self._state.sequence
+            return
+
+        # Sub-parameters after a colon do not change cursor moves or erases
+        args = [int(arg.partition(':')[0] or 0) for arg in params.split(';')]
+        count = max(1, args[0])
+        last_row = len(self.lines) - 1
+        if final == 'A':
+            self.row = max(0, self.row - count)
+        elif final == 'B':
+            self.row = min(last_row, self.row + count)
+        elif final == 'C':
+            self.col = min(MAX_COLUMNS, self.col + count)
+        elif final == 'D':
+            self.col = max(0, self.col - count)
+        elif final == 'E':
+            self.row, self.col = min(last_row, self.row + count), 0
+        elif final == 'F':
+            self.row, self.col = max(0, self.row - count), 0
+        elif final == 'G':
+            self.col = min(MAX_COLUMNS, count - 1)
+        elif final == 'd':
+            self.row = min(last_row, count - 1)
+        elif final in 'Hf':
+            column = args[1] if len(args) > 1 else 0
+            self.row = min(last_row, count - 1)
+            self.col = min(MAX_COLUMNS, max(1, column) - 1)
+        elif final == 'J':
+            self._erase_display(args[0])
+        elif final == 'K':
+            self._erase_line(args[0])
+        elif final == 'S' and self.rows:
+            self._scroll(count)
+
+    def _erase_display(self, mode: int) -> None:
+        """Erase below (0), above (1) or all (2, 3) of the screen."""
+        if self.rows:
+            # Rows keep their places and the cursor stays where it is
+            if mode == 0:
+                self.lines[self.row + 1:] = [[] for _ in range(self.rows - self.row - 1)]
+                self._erase_line(0)
+            elif mode == 1:
+                self.lines[:self.row] = [[] for _ in range(self.row)]
+                self._erase_line(1)
+            else:
+                self.lines = [[] for _ in range(self.rows)]
+        elif mode == 0:
+            del self.lines[self.row + 1:]
+            self._erase_line(0)
+        elif mode == 1:
+            # Rows above become blank; dropping them keeps this linear
+            del self.lines[:self.row]
+            self.row = 0
+            self._erase_line(1)
+        else:
+            self.lines = [[]]
+            self.row = 0
+
+    def _erase_line(self, mode: int) -> None:
+        """Erase to the right of (0), to the left of (1) or all (2) the cursor."""
+        line = self.lines[self.row]
+        if mode == 0:
+            del line[self.col:]
+        elif mode == 1:
+            end = min(self.col + 1, len(line))
+            line[:end] = [BLANK] * end
+        else:
+            self.lines[self.row] = []
+
+    def text(self) -> str:
+        """Get the screen contents as text with SGR sequences for colors.
+
+        Trailing blanks are dropped and every line ends with the default
+        style, so lines can be parsed on their own.
+        """
+        parts: List[str] = []
+        for index, line in enumerate(self.lines):
+            if index:
+                parts.append("\n")
+            end = len(line)
+            while end and line[end - 1] == BLANK:
+                end -= 1
+            current = ""
+            for char, style in line[:end]:
+                if style != current:
+                    parts.append(switch_style(current, style))
+                    current = style
+                parts.append(char)
+            if current:
+                parts.append(Colors.RESET)
+        return "".join(parts)
+
+
+def normalize_screen(chunks: Iterable[str] | str) -> str:
+    """Replay text through a :class:`VirtualScreen` and return what is left.
+
+    Args:
+        chunks: Text, or pieces of one text in order
+
+    Returns:
+        The final screen contents, one line per row.
+    """
+    screen = VirtualScreen()
+    for chunk in [chunks] if isinstance(chunks, str) else chunks:
+        screen.feed(chunk)
+    return screen.text()
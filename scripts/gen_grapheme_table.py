@@ -0,0 +1,76 @@
+"""Generate ``no_more_secrets/utils/_grapheme_table.py`` from Unicode data.
+
+Run from the repository root after upgrading Python, whose ``unicodedata``
+module supplies the general categories the table is built from:
+
+    python scripts/gen_grapheme_table.py
+"""
+
+from __future__ import annotations
+
+import sys
+import unicodedata
+from pathlib import Path
+from typing import List, Tuple
+
+OUTPUT = Path(__file__).resolve().parent.parent / "no_more_secrets" / "utils" / "_grapheme_table.py"
+
+# Marks extend the character before them: nonspacing (Mn), enclosing (Me)
+# and spacing (Mc) marks
+EXTEND_CATEGORIES = ("Mn", "Me", "Mc")
+
+# Other code points that never start a cluster of their own
+EXTEND_RANGES = [
+    (0x200C, 0x200D),    # Zero width non-joiner and joiner
+    (0x1F3FB, 0x1F3FF),  # Emoji skin tone modifiers
+    (0xE0020, 0xE007F),  # Tags, as in subdivision flags
+]
+
+
+def is_extend(code: int) -> bool:
+    """Check whether a code point continues the cluster before it."""
+    if any(start <= code <= end for start, end in EXTEND_RANGES):
+        return True
+    return unicodedata.category(chr(code)) in EXTEND_CATEGORIES
+
+
+def extend_ranges() -> List[Tuple[int, int]]:
+    """Collect the inclusive ranges of extending code points."""
+    ranges: List[Tuple[int, int]] = []
+    for code in range(sys.maxunicode + 1):
+        if not is_extend(code):
+            continue
+        if ranges and ranges[-1][1] == code - 1:
+            ranges[-1] = (ranges[-1][0], code)
+        else:
+            ranges.append((code, code))
+    return ranges
+
+
+def render(ranges: List[Tuple[int, int]]) -> str:
+    """Render the table module."""
+    lines = [
+        '"""Code point ranges that extend a grapheme cluster, for ``grapheme``.',
+        "",
+        "Generated by scripts/gen_grapheme_table.py; do not edit by hand.",
+        '"""',
+        "",
+        f"UNICODE_VERSION = {unicodedata.unidata_version!r}",
+        "",
+        "# Inclusive (first, last) code point ranges",
+        "EXTEND_RANGES = (",
+    ]
+    lines += [f"    (0x{start:05X}, 0x{end:05X})," for start, end in ranges]
+    lines += [")", ""]
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Write the table module and report its size."""
+    ranges = extend_ranges()
+    OUTPUT.write_text(render(ranges), encoding="utf-8")
+    print(f"Wrote {len(ranges)} ranges for Unicode {unicodedata.unidata_version} to {OUTPUT}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Generate ``no_more_secrets/utils/_width_table.py`` from Unicode data.
+
+Run from the repository root after upgrading Python, whose ``unicodedata``
+module supplies the East Asian Width property:
+
+    python scripts/gen_width_table.py
+"""
+
+from __future__ import annotations
+
+import sys
+import unicodedata
+from pathlib import Path
+from typing import List, Tuple
+
+OUTPUT = Path(__file__).resolve().parent.parent / "no_more_secrets" / "utils" / "_width_table.py"
+
+# Terminal conventions that override the East Asian Width property
+NARROW_RANGES = [
+    (0x2500, 0x257F),  # Box drawing
+    (0x2580, 0x259F),  # Block elements
+    (0x25A0, 0x25FF),  # Geometric shapes
+]
+WIDE_RANGES = [
+    (0xE000, 0xF8FF),  # Private use area; many terminal icons are double-width
+]
+
+# Unassigned code points are narrow, except in blocks reserved for wide
+# ideographs; unicodedata reports every unassigned code point as "F"
+RESERVED_WIDE_RANGES = [
+    (0x3400, 0x4DBF),
+    (0x4E00, 0x9FFF),
+    (0xF900, 0xFAFF),
+    (0x20000, 0x2FFFD),
+    (0x30000, 0x3FFFD),
+]
+
+
+def is_wide(code: int) -> bool:
+    """Check whether a code point takes two columns."""
+    if any(start <= code <= end for start, end in NARROW_RANGES):
+        return False
+    if any(start <= code <= end for start, end in WIDE_RANGES):
+        return True
+    if unicodedata.category(chr(code)) == 'Cn':
+        return any(start <= code <= end for start, end in RESERVED_WIDE_RANGES)
+    return unicodedata.east_asian_width(chr(code)) in ('F', 'W')
+
+
+def wide_ranges() -> List[Tuple[int, int]]:
+    """Collect the inclusive ranges of double-width code points."""
+    ranges: List[Tuple[int, int]] = []
+    for code in range(sys.maxunicode + 1):
+        if not is_wide(code):
+            continue
+        if ranges and ranges[-1][1] == code - 1:
+            ranges[-1] = (ranges[-1][0], code)
+        else:
+            ranges.append((code, code))
+    return ranges
+
+
+def render(ranges: List[Tuple[int, int]]) -> str:
+    """Render the table module."""
+    lines = [
+        '"""Double-width code point ranges for ``get_char_width``.',
+        "",
+        "Generated by scripts/gen_width_table.py; do not edit by hand.",
+        '"""',
+        "",
+        f"UNICODE_VERSION = {unicodedata.unidata_version!r}",
+        "",
+        "# First code point of each range, for bisect",
+        "WIDE_STARTS = (",
+    ]
+    lines += [f"    0x{start:05X}," for start, _ in ranges]
+    lines += [")", "", "# Last code point of each range, inclusive", "WIDE_ENDS = ("]
+    lines += [f"    0x{end:05X}," for _, end in ranges]
+    lines += [")", ""]
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Write the table module and report its size."""
+    ranges = wide_ranges()
+    OUTPUT.write_text(render(ranges), encoding="utf-8")
+    print(f"Wrote {len(ranges)} ranges for Unicode {unicodedata.unidata_version} to {OUTPUT}")
+
+
+if __name__ == "__main__":
+    main()
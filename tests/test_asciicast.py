@@ -0,0 +1,112 @@
+"""Tests for asciicast v2 recording."""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import time
+
+import pytest
+
+from no_more_secrets.core.asciicast import AsciicastBackend, open_recording
+from no_more_secrets.core.clock import VirtualClock
+from no_more_secrets.core.colors import Colors
+from no_more_secrets.effects.nms_effect import NMSEffect
+from no_more_secrets.utils.normalize import VirtualScreen
+
+
+def record(stream, text: str = "Hello\nworld", rows: int = 5, cols: int = 20) -> NMSEffect:
+    """Record one auto-decrypting run of the effect."""
+    effect = NMSEffect()
+    effect.set_auto_decrypt(True)
+    effect.set_seed(3)
+    effect.set_backend(AsciicastBackend(stream, rows, cols, title="demo"))
+    effect.execute(text)
+    return effect
+
+
+def test_header_and_events():
+    """Test that the recording is a header followed by timed output events."""
+    stream = io.BytesIO()
+    record(stream)
+    lines = stream.getvalue().decode("utf-8").splitlines()
+
+    header = json.loads(lines[0])
+    assert header["version"] == 2
+    assert (header["width"], header["height"]) == (20, 5)
+    assert header["title"] == "demo"
+
+    events = [json.loads(line) for line in lines[1:]]
+    times = [event[0] for event in events]
+    assert all(event[1] == "o" for event in events)
+    assert times == sorted(times)
+    # Typing, the pause, jumbling and revealing take simulated seconds
+    assert times[-1] > 3
+
+
+def test_recording_ends_on_revealed_text():
+    """Test that the recording stays on the main screen and ends revealed."""
+    stream = io.BytesIO()
+    record(stream)
+    events = [json.loads(line) for line in stream.getvalue().decode("utf-8").splitlines()[1:]]
+    output = "".join(event[2] for event in events)
+
+    assert Colors.SCREEN_SAVE not in output
+    assert Colors.SCREEN_RESTORE not in output
+    screen = VirtualScreen(5)
+    screen.feed(output)
+    assert screen.text().startswith("\033[1;34mHello\033[0m\n\033[1;34mworld\033[0m")
+
+
+def test_recording_follows_given_clock():
+    """Test that events are stamped with the clock the run uses."""
+    stream = io.BytesIO()
+    clock = VirtualClock(start=100.0)
+    effect = NMSEffect()
+    effect.set_auto_decrypt(True)
+    effect.set_clock(clock)
+    effect.set_backend(AsciicastBackend(stream))
+    effect.execute("abc")
+
+    last = json.loads(stream.getvalue().splitlines()[-1])
+    assert last[0] == pytest.approx(clock.now - 100.0, abs=1e-6)
+
+
+def test_slow_producer_is_not_outrun():
+    """Test that waiting for streamed input neither spins nor runs ahead in time."""
+    def producer():
+        yield "hello\n"
+        time.sleep(0.5)
+        yield "world\n"
+
+    stream = io.BytesIO()
+    effect = NMSEffect()
+    effect.set_auto_decrypt(True)
+    effect.set_backend(AsciicastBackend(stream))
+    effect.execute_stream(producer())
+
+    events = [json.loads(line) for line in stream.getvalue().decode("utf-8").splitlines()[1:]]
+    # About one frame per frame interval of real time while input is live,
+    # and the recording as long as the animation after the input ends
+    assert effect.frame_writer.frames < 1000
+    assert events[-1][0] < 30
+    screen = VirtualScreen(24)
+    screen.feed("".join(event[2] for event in events))
+    assert "world" in screen.text()
+
+
+def test_gzip_recording(tmp_path):
+    """Test that a .gz recording is compressed as it is written."""
+    path = tmp_path / "demo.cast.gz"
+    with open_recording(str(path)) as stream:
+        record(stream)
+
+    with gzip.open(path, "rt", encoding="utf-8") as recording:
+        lines = recording.read().splitlines()
+    assert json.loads(lines[0])["version"] == 2
+    assert len(lines) > 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
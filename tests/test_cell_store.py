@@ -0,0 +1,174 @@
+"""Tests for the array-backed cell store."""
+
+from __future__ import annotations
+
+from array import array
+
+import pytest
+
+from no_more_secrets.core.cell_store import SPACE, WIDTH_SHIFT, CellStore, StyleTable, code_widths
+from no_more_secrets.core.char_attr import CharAttr
+
+
+def test_append_and_view():
+    """Test that views expose the CharAttr attributes of a cell."""
+    cells = CellStore()
+    cells.append('世', 'X', 2, False, 1500, '\033[31m')
+    cells.append(' ', ' ', 1, True, 2000)
+
+    view = cells[0]
+    assert view.source == '世'
+    assert view.mask == 'X'
+    assert view.width == 2
+    assert not view.is_space
+    assert view.reveal_time == 1500
+    assert not view.is_revealed
+    assert view.original_color == '\033[31m'
+
+    assert cells[-1].is_space
+    assert cells[1].original_color == ''
+    with pytest.raises(IndexError):
+        cells[2]
+
+
+def test_view_writes_through():
+    """Test that assigning to a view updates the store."""
+    cells = CellStore()
+    cells.append('a', 'X', 1, False, 1000)
+
+    view = cells[0]
+    view.mask = 'Y'
+    view.reveal_time = -50
+    view.is_revealed = True
+    view.original_color = '\033[32m'
+
+    assert cells.masks[0] == ord('Y')
+    assert cells.reveal_times[0] == -50
+    assert cells[0].is_revealed
+    assert cells[0].width == 1  # other flag bits untouched
+    assert cells[0].original_color == '\033[32m'
+
+    view.is_revealed = False
+    assert not cells[0].is_revealed
+
+
+def test_styles_are_interned():
+    """Test that repeated styles share one table entry."""
+    cells = CellStore()
+    for char in "abc":
+        cells.append(char, 'X', 1, False, 1000, '\033[31m')
+
+    assert len(cells.styles) == 2
+    assert list(cells.style_ids) == [1, 1, 1]
+
+
+def test_extend_remaps_styles():
+    """Test that extending from a store with another table remaps styles."""
+    first = CellStore()
+    first.append('a', 'X', 1, False, 1000, '\033[32m')
+    other = CellStore()
+    other.append('b', 'X', 1, False, 1000, '\033[31m')
+    other.append('c', 'X', 1, False, 1000, '\033[32m')
+
+    first.extend(other)
+
+    assert [cell.original_color for cell in first] == ['\033[32m', '\033[31m', '\033[32m']
+
+    shared = StyleTable()
+    a = CellStore(shared)
+    b = CellStore(shared)
+    b.append('d', 'X', 1, False, 1000, '\033[33m')
+    a.extend(b)
+    assert a[0].original_color == '\033[33m'
+
+
+def test_round_trip_with_char_attrs():
+    """Test conversion from and to CharAttr objects."""
+    attrs = [CharAttr('h', 'X', 1, False, 1200, '\033[34m'), CharAttr(' ', ' ', 1, True, 1300)]
+    attrs[0].is_revealed = True
+
+    cells = CellStore.from_attrs(attrs)
+    copied = cells.to_attrs()
+
+    assert [(a.source, a.mask, a.reveal_time, a.is_revealed, a.original_color) for a in copied] == [
+        ('h', 'X', 1200, True, '\033[34m'),
+        (' ', ' ', 1300, False, ''),
+    ]
+
+
+def test_slice_and_code_widths():
+    """Test copying a range and iterating over code points and widths."""
+    cells = CellStore()
+    for char in "ab世":
+        cells.append(char, 'X', 2 if char == '世' else 1, False, 1000)
+
+    assert cells.text() == "ab世"
+    assert cells.text(1, 2) == "b"
+
+    part = cells.slice(1, 3)
+    assert "".join(cell.source for cell in part) == "b世"
+    assert part.styles is cells.styles
+    assert list(code_widths(cells, 1)) == [(ord('b'), 1), (ord('世'), 2)]
+
+
+def test_append_columns():
+    """Test appending characters from column values."""
+    cells = CellStore()
+    styles = array('H', [0, cells.styles.intern('\033[32m')])
+    flags = bytes([1 << WIDTH_SHIFT, 1 << WIDTH_SHIFT | SPACE])
+    cells.append_columns(array('I', [97, 32]), array('I', [88, 32]), array('i', [5, 6]), flags, styles)
+
+    assert [cell.source for cell in cells] == ['a', ' ']
+    assert [cell.mask for cell in cells] == ['X', ' ']
+    assert [cell.is_space for cell in cells] == [False, True]
+    assert cells[1].reveal_time == 6
+    assert cells[1].original_color == '\033[32m'
+
+
+def test_clusters():
+    """Test that characters of several code points survive copies and slices."""
+    cells = CellStore()
+    cells.append('a', 'X', 1, False, 1000)
+    cells.append('e\u0301', 'X', 1, False, 1000)
+    cells.append('\U0001f1eb\U0001f1f7', 'X', 2, False, 1000)
+
+    assert cells[1].source == 'e\u0301'
+    assert cells.codes[1] == ord('e')
+    assert cells.text() == 'ae\u0301\U0001f1eb\U0001f1f7'
+    assert cells.text(2) == '\U0001f1eb\U0001f1f7'
+
+    part = cells.slice(1, 2)
+    assert part.clusters == {0: 'e\u0301'}
+    combined = CellStore()
+    combined.extend(part)
+    combined.extend(cells)
+    assert [cell.source for cell in combined] == ['e\u0301', 'a', 'e\u0301', '\U0001f1eb\U0001f1f7']
+    assert [attr.source for attr in combined.to_attrs()][-1] == '\U0001f1eb\U0001f1f7'
+
+    cells[1].source = 'e'
+    assert 1 not in cells.clusters
+
+
+def test_drop_front():
+    """Test that dropping characters renumbers the rest, clusters included."""
+    cells = CellStore()
+    for source in ['a', 'e\u0301', 'b', '\U0001f1eb\U0001f1f7']:
+        cells.append(source, 'X', 1, False, 1000)
+
+    cells.drop_front(2)
+    assert len(cells) == 2
+    assert cells.text() == 'b\U0001f1eb\U0001f1f7'
+    assert cells.clusters == {1: '\U0001f1eb\U0001f1f7'}
+
+
+def test_memory_per_cell():
+    """Test that a cell takes less than 16 bytes."""
+    cells = CellStore()
+    for _ in range(1000):
+        cells.append('a', 'X', 1, False, 1000, '\033[31m')
+
+    assert cells.nbytes / len(cells) < 16
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
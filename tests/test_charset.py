@@ -0,0 +1,103 @@
+"""Tests for the charset registry."""
+
+from __future__ import annotations
+
+import io
+from unittest.mock import patch
+
+import pytest
+
+from no_more_secrets.core.charset import (
+    CHARSETS,
+    Charset,
+    get_charset,
+    load_charset_file,
+    parse_unicode_ranges,
+    register_charset,
+)
+from no_more_secrets.effects.nms_effect import NMSEffect
+
+
+def test_builtin_pools():
+    """Test that the built-in pools cover their CP437 ranges exactly."""
+    assert get_charset("printable") == tuple(chr(c) for c in range(32, 127))
+    assert get_charset("extended")[0] == 'Ç'
+    assert len(get_charset("extended")) == 128
+    assert get_charset("box_drawing")[0] == '░'
+    assert get_charset("box_drawing")[-1] == '▀'
+    assert get_charset("unknown") is get_charset("full")
+
+
+def test_charset_precomputes_codes():
+    """Test that a charset keeps the code point of each character."""
+    charset = Charset("test", "aé─a")
+
+    assert charset.chars == ('a', 'é', '─')
+    assert charset.codes == (0x61, 0xE9, 0x2500)
+
+    with pytest.raises(ValueError):
+        Charset("empty", "")
+
+
+def test_charset_rejects_wide_characters():
+    """Test that characters two columns wide cannot be scramble characters."""
+    with pytest.raises(ValueError, match="U\\+30A2"):
+        Charset("katakana", "ｱｲア")
+
+    # Half-width forms take one column
+    assert len(Charset("katakana", "ｱｲｳ")) == 3
+
+
+def test_register_charset():
+    """Test that registered charsets can be selected by name."""
+    try:
+        register_charset("digits", "0123456789")
+        effect = NMSEffect()
+        effect.set_charset_mode("digits")
+
+        assert effect.charset_mode == "digits"
+        assert all(effect._get_scramble_char().isdigit() for _ in range(50))
+    finally:
+        CHARSETS.pop("digits", None)
+
+
+def test_parse_unicode_ranges():
+    """Test parsing code points and ranges."""
+    assert parse_unicode_ranges("U+41-U+43, 0x61,7A") == ['A', 'B', 'C', 'a', 'z']
+    # Whitespace and control characters are skipped
+    assert parse_unicode_ranges("1F-21") == ['!']
+
+    for spec in ("zz", "43-41", "110000"):
+        with pytest.raises(ValueError):
+            parse_unicode_ranges(spec)
+
+
+def test_load_charset_file(tmp_path):
+    """Test reading a charset from a file."""
+    path = tmp_path / "katakana.txt"
+    path.write_text("ｱｲｳ\nｴｵ ｱ\n", encoding="utf-8")
+
+    assert load_charset_file(str(path)) == list("ｱｲｳｴｵｱ")
+
+
+def test_custom_charset_on_effect():
+    """Test scrambling with a custom charset and rejecting empty or wide ones."""
+    effect = NMSEffect()
+    effect.set_custom_charset("xy")
+
+    assert effect.charset_mode == "custom"
+    assert {effect._get_scramble_char() for _ in range(50)} == {'x', 'y'}
+
+    with patch('sys.stderr', new_callable=io.StringIO):
+        effect.set_custom_charset("")
+    assert effect.charset_mode == "full"
+
+    effect.set_custom_charset("xy")
+    with patch('sys.stderr', new_callable=io.StringIO) as stderr:
+        effect.set_custom_charset("x世")
+    assert effect.charset_mode == "full"
+    assert "wide character" in stderr.getvalue()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,32 @@
+"""Tests for the real and virtual clocks."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+from no_more_secrets.core.clock import RealClock, VirtualClock
+
+
+def test_virtual_clock_advances_only_when_slept_on():
+    """Test that virtual time moves by exactly the time slept."""
+    clock = VirtualClock(start=5.0)
+    assert clock.monotonic() == 5.0
+
+    clock.sleep(0.25)
+    clock.sleep(-1.0)
+    assert clock.monotonic() == pytest.approx(5.25)
+
+
+def test_real_clock_uses_time_module():
+    """Test that the real clock reads and sleeps on the system clock."""
+    clock = RealClock()
+    with patch('time.monotonic', return_value=42.0), patch('time.sleep') as mock_sleep:
+        assert clock.monotonic() == 42.0
+        clock.sleep(0.5)
+    mock_sleep.assert_called_once_with(0.5)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -10,6 +10,7 @@ from no_more_secrets.core.colors import (
     get_color_prefix,
     hex_to_rgb,
     rgb_to_ansi,
+    sgr_color_to_rgb,
 )
 
 
@@ -72,4 +73,15 @@ def test_fg_color():
 def test_move_cursor():
     """Test cursor movement."""
     result = Colors.move_cursor(10, 20)
-    assert result == "\033[10;20H"
\ No newline at end of file
+    assert result == "\033[10;20H"
+
+
+def test_sgr_color_to_rgb():
+    """Test conversion of SGR colors to RGB with xterm's palette."""
+    assert sgr_color_to_rgb("31") == (205, 0, 0)
+    assert sgr_color_to_rgb("94") == (92, 92, 255)
+    assert sgr_color_to_rgb("38;5;208") == (255, 135, 0)
+    assert sgr_color_to_rgb("38;5;244") == (128, 128, 128)
+    assert sgr_color_to_rgb("48;2;10;20;30") == (10, 20, 30)
+    assert sgr_color_to_rgb("") is None
+    assert sgr_color_to_rgb("38;5") is None
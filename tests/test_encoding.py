@@ -5,7 +5,9 @@ from __future__ import annotations
 import pytest
 
 from no_more_secrets.utils.encoding import (
+    EncodingRepairer,
     fix_encoding_issues,
+    load_encoding_fixes,
     get_char_width,
     safe_char_decode,
 )
@@ -45,6 +47,20 @@ def test_get_char_width():
     assert get_char_width('\t') == 1
 
 
+def test_char_width_table():
+    """Test widths looked up in the generated table."""
+    assert get_char_width('中') == 2
+    assert get_char_width('가') == 2  # Hangul syllable
+    assert get_char_width('😀') == 2
+    assert get_char_width('\uFF21') == 2  # Fullwidth A
+    assert get_char_width('é') == 1
+    assert get_char_width('\u0378') == 1  # Unassigned
+    assert get_char_width('\u4DB6') == 2  # In a block reserved for ideographs
+    assert get_char_width('\u25FD') == 1  # Geometric shapes stay narrow
+    assert get_char_width('\uE000') == 2
+    assert get_char_width('') == 1
+
+
 def test_safe_char_decode():
     """Test safe character decoding."""
     # Normal ASCII
@@ -188,4 +204,38 @@ def test_malformed_input():
     # Test empty string
     assert safe_char_decode('') == ''
     assert get_char_width('') == 1  # Should handle gracefully
-    assert fix_encoding_issues('') == ''
\ No newline at end of file
+    assert fix_encoding_issues('') == ''
+
+
+def test_fix_encoding_issues_single_pass():
+    """Test that repaired text is not repaired again."""
+    assert fix_encoding_issues("â\"\"") == "└"
+    assert fix_encoding_issues("x", {"x": "Γöé"}) == "Γöé"
+    assert fix_encoding_issues("ΓöéΓöé", {"Γöé": "|"}) == "||"
+
+
+@pytest.mark.parametrize("text", [
+    "├ Γö£ΓöÇΓöÇ src\nΓööΓöÇΓöÇ â\"œâ\"€â\"€ tests\n",
+    "plain text without mojibake",
+])
+def test_repairer_chunks(text):
+    """Test that splitting the input anywhere gives the same repair."""
+    expected = fix_encoding_issues(text)
+    for cut in range(len(text) + 1):
+        repairer = EncodingRepairer()
+        chunks = repairer.feed(text[:cut]) + repairer.feed(text[cut:]) + repairer.feed("", final=True)
+        assert chunks == expected, cut
+
+
+def test_repairer_extra_fixes(tmp_path):
+    """Test user-supplied replacement tables."""
+    path = tmp_path / "fixes.json"
+    path.write_text('{"Ã©": "é", "Γöé": "|"}', encoding="utf-8")
+    repairer = EncodingRepairer(load_encoding_fixes(str(path)))
+    assert repairer.fix("cafÃ© Γöé ΓöÇ") == "café | ─"
+
+    with pytest.raises(ValueError):
+        EncodingRepairer({"": "x"})
+    path.write_text('["Ã©"]', encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_encoding_fixes(str(path))
@@ -0,0 +1,208 @@
+"""Tests for the reveal simulation engines."""
+
+from __future__ import annotations
+
+import pytest
+
+from no_more_secrets.core.cell_store import CellStore
+from no_more_secrets.core.charset import get_charset
+from no_more_secrets.effects.engine import (
+    CHURN_CHANCE,
+    NumpyEngine,
+    PythonEngine,
+    apply_clustering_numpy,
+    create_engine,
+)
+from no_more_secrets.effects.nms_effect import NMSEffect
+
+
+def make_attrs(text: str, reveal_time: int = 100) -> CellStore:
+    """Build characters with a fixed reveal time."""
+    cells = CellStore()
+    for c in text:
+        cells.append(c, 'X', 1, c == ' ', reveal_time)
+    return cells
+
+
+@pytest.mark.parametrize("engine_class", [PythonEngine, NumpyEngine])
+def test_engine_reveals_after_countdown(engine_class):
+    """Test that characters reveal once their countdown has run out."""
+    if engine_class is NumpyEngine:
+        pytest.importorskip("numpy")
+    effect = NMSEffect()
+    char_attrs = make_attrs("ab cd")
+    engine = engine_class(effect, char_attrs)
+
+    assert not engine.step(0, 5, 60)
+    assert not engine.step(0, 5, 60)
+    assert not any(attr.is_revealed for attr in char_attrs)
+
+    # Countdown has passed zero, the next step reveals everything
+    assert engine.step(0, 5, 60)
+    assert all(attr.is_revealed for attr in char_attrs if not attr.is_space)
+
+
+@pytest.mark.parametrize("engine_class", [PythonEngine, NumpyEngine])
+def test_engine_only_touches_range(engine_class):
+    """Test that characters outside the stepped range are left alone."""
+    if engine_class is NumpyEngine:
+        pytest.importorskip("numpy")
+    effect = NMSEffect()
+    char_attrs = make_attrs("abcd", reveal_time=0)
+    engine = engine_class(effect, char_attrs)
+
+    assert engine.step(1, 3, 50)
+    assert [attr.is_revealed for attr in char_attrs] == [False, True, True, False]
+
+
+@pytest.mark.parametrize("engine_class", [PythonEngine, NumpyEngine])
+def test_engine_touches_only_due_cells(engine_class):
+    """Test that reveals follow the schedule and the pending count."""
+    if engine_class is NumpyEngine:
+        pytest.importorskip("numpy")
+    effect = NMSEffect()
+    char_attrs = make_attrs("abcd")
+    for index, reveal_time in enumerate([0, 100, 200, 5000]):
+        char_attrs[index].reveal_time = reveal_time
+    engine = engine_class(effect, char_attrs)
+
+    engine.step(0, 4, 100)
+    assert [cell.is_revealed for cell in char_attrs] == [True, False, False, False]
+    assert engine.pending == 3
+    assert engine.next_event_ms() == 0  # the next reveal is due now
+
+    engine.step(0, 4, 100)
+    assert engine.pending == 2
+    engine.step(0, 4, 100)
+    assert engine.pending == 1
+
+    # Moving the range to a new page restarts the clock
+    assert engine.step(3, 3, 0)
+    assert engine.now_ms == 0
+    assert engine.next_event_ms() is None
+
+
+@pytest.mark.parametrize("engine_class", [PythonEngine, NumpyEngine])
+def test_engine_reports_changed_cells(engine_class):
+    """Test that a step lists the characters it revealed or gave a new mask."""
+    if engine_class is NumpyEngine:
+        pytest.importorskip("numpy")
+    effect = NMSEffect()
+    effect.set_churn_rate(0)
+    char_attrs = make_attrs("abcd")
+    for index, reveal_time in enumerate([0, 100, 100, 5000]):
+        char_attrs[index].reveal_time = reveal_time
+    engine = engine_class(effect, char_attrs)
+
+    engine.step(0, 4, 100)
+    assert engine.changed == [0]
+    engine.step(0, 4, 50)
+    assert sorted(engine.changed) == [1, 2]
+    engine.step(0, 4, 50)
+    assert engine.changed == []
+
+    # With churn, masks that change are reported too
+    effect.set_churn_rate(1e6)
+    engine = engine_class(effect, make_attrs("abcd", reveal_time=5000))
+    engine.step(0, 4, 0)
+    engine.step(0, 4, 10)
+    assert sorted(engine.changed) == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize("engine_class", [PythonEngine, NumpyEngine])
+def test_churn_matches_per_frame_chance(engine_class):
+    """Test that the default churn rate changes 1 in 6 masks per 50 ms frame."""
+    if engine_class is NumpyEngine:
+        pytest.importorskip("numpy")
+    effect = NMSEffect()
+    effect.set_seed(11)
+    effect.set_charset_mode("box_drawing")
+    cells = make_attrs("a" * 3000, reveal_time=60_000)
+    engine = engine_class(effect, cells)
+
+    changes = 0
+    for _ in range(20):
+        before = cells.masks[:]
+        engine.step(0, len(cells), 50)
+        changes += sum(old != new for old, new in zip(before, cells.masks))
+    # Masks that change to the same character are not counted
+    expected = 3000 * 20 * CHURN_CHANCE * (1 - 1 / len(effect.charset.codes))
+    assert abs(changes - expected) < expected * 0.05
+
+
+@pytest.mark.parametrize("engine_class", [PythonEngine, NumpyEngine])
+def test_zero_churn_rate_keeps_masks(engine_class):
+    """Test that a churn rate of zero leaves masks alone until the reveal."""
+    if engine_class is NumpyEngine:
+        pytest.importorskip("numpy")
+    effect = NMSEffect()
+    effect.set_churn_rate(0)
+    cells = make_attrs("abc", reveal_time=500)
+    engine = engine_class(effect, cells)
+
+    engine.step(0, 3, 100)
+    assert engine.next_event_ms() == 400  # idle until the reveal
+    engine.step(0, 3, 400)
+    assert bytes(cells.masks) == bytes(make_attrs("abc").masks)
+
+
+def test_numpy_engine_tracks_appended_characters():
+    """Test that the NumPy engine picks up characters added later."""
+    pytest.importorskip("numpy")
+    effect = NMSEffect()
+    char_attrs = make_attrs("ab", reveal_time=0)
+    engine = NumpyEngine(effect, char_attrs)
+    engine.step(0, 2, 50)
+
+    # The store can still grow after a step
+    char_attrs.extend(make_attrs("c" * 2000, reveal_time=0))
+
+    assert engine.step(0, len(char_attrs), 50)
+    assert all(attr.is_revealed for attr in char_attrs)
+
+
+def test_numpy_churn_changes_masks():
+    """Test that masked characters get new masks from the charset."""
+    pytest.importorskip("numpy")
+    effect = NMSEffect()
+    effect.set_charset_mode("box_drawing")
+    char_attrs = make_attrs("a" * 500, reveal_time=10_000)
+    engine = NumpyEngine(effect, char_attrs)
+
+    engine.step(0, 500, 300)
+
+    changed = [attr.mask for attr in char_attrs if attr.mask != 'X']
+    assert changed
+    assert set(changed) <= set(get_charset("box_drawing"))
+
+
+def test_numpy_clustering_stays_in_range():
+    """Test that vectorized clustering keeps reveal times near their base."""
+    pytest.importorskip("numpy")
+    char_attrs = CellStore()
+    for i in range(300):
+        char_attrs.append('a', 'X', 1, i == 5, 1000 + i * 10)
+    apply_clustering_numpy(char_attrs)
+
+    times = [attr.reveal_time for attr in char_attrs]
+    assert times[5] == 1050  # Spaces are never clustered
+    assert len(set(times)) < len(times) or times != [1000 + i * 10 for i in range(300)]
+    assert all(800 <= t <= 4190 + 200 for t in times)
+
+
+def test_create_engine_selection():
+    """Test engine selection from the effect setting."""
+    effect = NMSEffect()
+    effect.set_engine("python")
+    assert isinstance(create_engine(effect, CellStore()), PythonEngine)
+
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return
+    effect.set_engine("numpy")
+    assert isinstance(create_engine(effect, CellStore()), NumpyEngine)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,127 @@
+"""Tests for the SVG and HTML animation export."""
+
+from __future__ import annotations
+
+import re
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from no_more_secrets.cli.main import create_parser
+from no_more_secrets.effects.export import export_animation, render_html, render_svg
+from no_more_secrets.effects.nms_effect import JUMBLE_MS, NMSEffect
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def make_effect(**settings) -> NMSEffect:
+    """Create a seeded effect."""
+    effect = NMSEffect()
+    effect.set_seed(5)
+    for name, value in settings.items():
+        getattr(effect, f"set_{name}")(value)
+    return effect
+
+
+def delays(svg: str, prefix: str) -> dict[str, float]:
+    """Get the animation delay of each class starting with a prefix."""
+    return {
+        name: float(seconds)
+        for name, seconds in re.findall(rf"\.({prefix}\d+)\{{animation-delay:([\d.]+)s\}}", svg)
+    }
+
+
+def revealed_text(svg: str) -> list[str]:
+    """Get the revealed text of each row segment, in document order."""
+    root = ET.fromstring(svg)
+    texts = []
+    for element in root.iter(f"{SVG}text"):
+        spans = list(element)
+        if spans and spans[0].get("class").startswith("r "):
+            texts.append("".join(element.itertext()))
+    return texts
+
+
+def test_svg_reveals_the_text():
+    """Test that the document is valid SVG holding the escaped text."""
+    # Typed in a single frame, each row is one segment
+    svg = render_svg(make_effect(type_duration=0), "if a < b && c > d:\n    pass\n")
+
+    assert revealed_text(svg) == ["if a < b && c > d:", "pass"]
+    assert "&amp;" in svg and "&lt;" in svg
+
+
+def test_masks_hide_when_revealed():
+    """Test that every mask hides at the same time its character shows."""
+    svg = render_svg(make_effect(), "Hello world")
+    root = ET.fromstring(svg)
+    masks = [span.get("class").split()[1] for span in root.iter(f"{SVG}tspan") if span.get("class")[0] == "m"]
+    shown = [span.get("class").split()[1] for span in root.iter(f"{SVG}tspan") if span.get("class")[0] == "r"]
+
+    assert masks and sorted(set(masks)) == sorted(set(shown))
+
+
+def test_timeline_follows_settings():
+    """Test that reveals start after typing, the pause and the jumble, scaled by speed."""
+    text = "abcdefghij" * 20
+    normal = render_svg(make_effect(type_duration=1.0), text)
+    fast = render_svg(make_effect(type_duration=1.0, speed=2.0), text)
+
+    typed = delays(normal, "a")
+    assert max(typed.values()) == pytest.approx(1.0)
+    assert min(delays(normal, "v").values()) >= 1.0 + 1.0 + JUMBLE_MS / 1000
+    assert max(delays(fast, "v").values()) == pytest.approx(max(delays(normal, "v").values()) / 2, abs=0.05)
+
+
+def test_size_grows_with_cells_not_frames():
+    """Test that more frames do not add elements and more text adds them linearly."""
+    line = "2024-01-01 12:00:00 INFO request served in 12 ms\n"
+    slow = render_svg(make_effect(fps=10), line * 20)
+    fast = render_svg(make_effect(fps=120), line * 20)
+    longer = render_svg(make_effect(fps=120), line * 80)
+
+    cells = len(line.replace(" ", "").strip()) * 20
+    assert fast.count("<tspan") <= 2 * cells
+    assert slow.count("<tspan") == pytest.approx(fast.count("<tspan"), rel=0.1)
+    assert len(longer) < 5 * len(fast)
+
+
+def test_colors_become_shared_classes():
+    """Test that revealed text takes the reveal color or the original colors."""
+    text = "\033[31mred\033[0m \033[31mred\033[0m plain"
+
+    svg = render_svg(make_effect(foreground_color="green"), text)
+    assert "fill:#00cd00;font-weight:bold" in svg
+    assert "#cd0000" not in svg
+
+    svg = render_svg(make_effect(preserve_colors=True), text)
+    assert svg.count("{fill:#cd0000}") == 1
+
+
+def test_export_by_extension(tmp_path):
+    """Test that the file type follows the extension."""
+    effect = make_effect()
+    export_animation(effect, "Secret", str(tmp_path / "out.svg"))
+    export_animation(effect, "Secret", str(tmp_path / "out.HTML"))
+
+    assert (tmp_path / "out.svg").read_text(encoding="utf-8").startswith("<svg")
+    page = (tmp_path / "out.HTML").read_text(encoding="utf-8")
+    assert page.startswith("<!DOCTYPE html>") and "<svg" in page
+    assert render_html(effect, "Secret", title="a & b").count("<title>a &amp; b</title>") == 1
+
+    with pytest.raises(ValueError):
+        export_animation(effect, "Secret", str(tmp_path / "out.txt"))
+
+
+def test_export_excludes_record(capsys):
+    """Test that the command line takes an export or a recording, not both."""
+    parser = create_parser()
+    assert parser.parse_args(["--export", "out.svg", "Secret"]).export == "out.svg"
+
+    with pytest.raises(SystemExit):
+        parser.parse_args(["--export", "out.svg", "--record", "out.cast", "Secret"])
+    assert "not allowed with argument" in capsys.readouterr().err
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,63 @@
+"""Tests for the follow mode line buffer."""
+
+from __future__ import annotations
+
+import pytest
+
+from no_more_secrets.core.char_attr import CharAttr
+from no_more_secrets.effects.follow import FollowBuffer
+
+
+def make_attrs(text: str) -> list[CharAttr]:
+    """Build plain character attributes."""
+    return [CharAttr(c, 'X', 1, c.isspace(), 1000) for c in text]
+
+
+def line_text(line) -> str:
+    """Join the characters of a followed line."""
+    return "".join(attr.source for attr in line.cells)
+
+
+def test_lines_split_across_chunks():
+    """Test that a line started in one chunk continues in the next."""
+    lines = FollowBuffer(cols=80)
+    lines.extend(make_attrs("first\nsec"))
+    lines.extend(make_attrs("ond\n\nthird"))
+
+    assert [line_text(line) for line in lines.lines] == ["first", "second", "", "third"]
+    assert lines.total_rows == 4
+    assert not lines.lines[-1].settled
+
+
+def test_ring_buffer_drops_old_lines():
+    """Test that only the most recent lines are kept."""
+    lines = FollowBuffer(cols=80, max_lines=3)
+    lines.extend(make_attrs("".join(f"line {n}\n" for n in range(100))))
+
+    assert [line_text(line) for line in lines.lines] == ["line 97", "line 98", "line 99"]
+    assert lines.total_rows == 100
+
+
+def test_visible_rows_are_bottom_aligned():
+    """Test which lines are on screen and at which rows."""
+    lines = FollowBuffer(cols=4)
+    lines.extend(make_attrs("a\nbbbbbb\nc\nd"))  # 'bbbbbb' wraps onto two rows
+
+    visible = [(line_text(line), row) for line, row in lines.visible(3)]
+    assert visible == [("bbbbbb", -1), ("c", 1), ("d", 2)]
+
+    # Everything fits on a tall screen, starting at the top
+    visible = [(line_text(line), row) for line, row in lines.visible(10)]
+    assert visible[0] == ("a", 0)
+
+
+def test_long_lines_are_split():
+    """Test that a line without newlines cannot grow without bound."""
+    lines = FollowBuffer(cols=80, max_line_cells=10)
+    lines.extend(make_attrs("x" * 25))
+
+    assert [len(line.cells) for line in lines.lines] == [10, 10, 5]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
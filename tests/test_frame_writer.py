@@ -0,0 +1,110 @@
+"""Tests for the frame writer."""
+
+from __future__ import annotations
+
+import io
+
+import pytest
+
+from no_more_secrets.core.frame_writer import FrameWriter
+
+
+def test_single_write_per_frame_to_fd(tmp_path):
+    """Test that a frame goes to the file descriptor in one write."""
+    path = tmp_path / "out.bin"
+    with open(path, "w", encoding="utf-8") as stream:
+        writer = FrameWriter(stream)
+        for char in "héllo":
+            writer.write(char)
+        written = writer.flush()
+
+    assert path.read_bytes() == "héllo".encode("utf-8")
+    assert written == 6
+    assert writer.frame_bytes == 6
+    assert writer.frame_syscalls == 1
+
+
+def test_buffer_reused_between_frames(tmp_path):
+    """Test that the frame buffer is reused and only grows when needed."""
+    path = tmp_path / "out.bin"
+    with open(path, "w", encoding="utf-8") as stream:
+        writer = FrameWriter(stream)
+        writer.write("x" * 100)
+        writer.flush()
+        buffer = writer._buffer
+        capacity = len(buffer)
+
+        writer.write("short")
+        writer.flush()
+
+    assert writer._buffer is buffer
+    assert len(writer._buffer) == capacity
+    assert path.read_bytes() == b"x" * 100 + b"short"
+
+
+def test_fallback_to_text_stream():
+    """Test writing to a stream without a file descriptor."""
+    stream = io.StringIO()
+    writer = FrameWriter(stream)
+    writer.write("\033[Habc")
+    writer.flush()
+
+    assert stream.getvalue() == "\033[Habc"
+    assert writer.frame_syscalls == 1
+
+
+def test_empty_frame_costs_nothing():
+    """Test that flushing an empty frame does not write."""
+    stream = io.StringIO()
+    writer = FrameWriter(stream)
+
+    assert writer.flush() == 0
+    assert writer.frame_syscalls == 0
+    assert stream.getvalue() == ""
+
+
+def test_failed_write_leaves_buffer_usable():
+    """Test that a write error leaves the buffer neither exported nor holding the frame."""
+    class BrokenStream(io.StringIO):
+        broken = True
+
+        def write(self, text: str) -> int:
+            if self.broken:
+                raise OSError("broken pipe")
+            return super().write(text)
+
+    stream = BrokenStream()
+    writer = FrameWriter(stream)
+    writer.write("x" * 10)
+    with pytest.raises(OSError) as error:
+        writer.flush()
+
+    # The kept exception holds the traceback; the buffer must grow anyway
+    writer.write("y" * 1000)
+    assert len(writer._buffer) >= 1000
+    assert "broken pipe" in str(error.value)
+
+    # The failed frame is not sent again with the next one
+    stream.broken = False
+    writer.flush()
+    assert stream.getvalue() == "y" * 1000
+
+
+def test_stats():
+    """Test the accumulated frame statistics."""
+    stream = io.StringIO()
+    writer = FrameWriter(stream)
+    writer.write("abcd")
+    writer.flush()
+    writer.write("ef")
+    writer.flush()
+
+    stats = writer.stats()
+    assert stats["frames"] == 2
+    assert stats["total_bytes"] == 6
+    assert stats["bytes_per_frame"] == 3
+    assert stats["last_frame_bytes"] == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,36 @@
+"""Tests for grapheme cluster segmentation."""
+
+from __future__ import annotations
+
+import pytest
+
+from no_more_secrets.utils.grapheme import cluster_width, split_clusters
+
+
+@pytest.mark.parametrize("text, clusters", [
+    ("plain", ["p", "l", "a", "i", "n"]),
+    ("cafe\u0301!", ["c", "a", "f", "e\u0301", "!"]),
+    ("\U0001f468\u200d\U0001f469\u200d\U0001f467 ok", ["\U0001f468\u200d\U0001f469\u200d\U0001f467", " ", "o", "k"]),
+    ("\U0001f44d\U0001f3fd", ["\U0001f44d\U0001f3fd"]),
+    ("❤\ufe0f", ["❤\ufe0f"]),
+    ("\U0001f1eb\U0001f1f7\U0001f1e9\U0001f1ea\U0001f1ee", ["\U0001f1eb\U0001f1f7", "\U0001f1e9\U0001f1ea", "\U0001f1ee"]),
+    ("각각ᅡ", ["각", "각", "ᅡ"]),
+    ("क\u094dष\u093f", ["क\u094d", "ष\u093f"]),
+    ("\n\u0301x", ["\n", "\u0301", "x"]),
+])
+def test_split_clusters(text, clusters):
+    """Test segmentation of marks, emoji sequences, flags and Hangul."""
+    assert split_clusters(text) == clusters
+
+
+def test_cluster_width():
+    """Test that flags and emoji presentation take two columns."""
+    assert cluster_width("e\u0301") == 1
+    assert cluster_width("❤\ufe0f") == 2
+    assert cluster_width("\U0001f1eb\U0001f1f7") == 2
+    assert cluster_width("\U0001f468\u200d\U0001f469\u200d\U0001f467") == 2
+    assert cluster_width("가") == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
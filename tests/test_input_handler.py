@@ -0,0 +1,111 @@
+"""Tests for streaming input handling."""
+
+from __future__ import annotations
+
+import io
+
+import pytest
+
+from no_more_secrets.utils.input_handler import BackgroundReader, iter_file_chunks, iter_input_chunks
+
+
+class TrickleStream(io.RawIOBase):
+    """Binary stream that returns its data a few bytes per read."""
+
+    def __init__(self, data: bytes, step: int) -> None:
+        self.data = data
+        self.step = step
+        self.reads = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read1(self, size: int = -1) -> bytes:
+        self.reads += 1
+        piece, self.data = self.data[:self.step], self.data[self.step:]
+        return piece
+
+
+def test_iter_input_chunks_decodes_split_utf8():
+    """Test that multi-byte characters split across reads are kept whole."""
+    stream = TrickleStream("héllo 世界".encode("utf-8"), step=2)
+    chunks = list(iter_input_chunks(stream))
+
+    assert "".join(chunks) == "héllo 世界"
+    assert len(chunks) > 1
+    assert all("�" not in chunk for chunk in chunks)
+
+
+def test_iter_input_chunks_invalid_bytes():
+    """Test that invalid UTF-8 is replaced instead of failing."""
+    stream = TrickleStream(b"ok\xff", step=8)
+    assert "".join(iter_input_chunks(stream)) == "ok�"
+
+
+def test_background_reader_collects_chunks():
+    """Test that the background reader hands over all chunks, then ends."""
+    reader = BackgroundReader(iter(["one", "two", "three"]))
+
+    received = []
+    while not reader.done:
+        received.extend(reader.poll(timeout=None))
+
+    assert received == ["one", "two", "three"]
+    assert reader.poll() == []
+
+
+def test_background_reader_limits_chunks():
+    """Test that reading pauses once enough chunks are waiting."""
+    consumed = []
+
+    def chunks():
+        for number in range(10):
+            consumed.append(number)
+            yield str(number)
+
+    reader = BackgroundReader(chunks(), max_chunks=2)
+    first = reader.poll(timeout=None)
+    assert 1 <= len(first) <= 2
+    assert len(consumed) < 10
+
+    received = list(first)
+    while not reader.done:
+        received.extend(reader.poll(timeout=None))
+    assert received == [str(number) for number in range(10)]
+
+
+def test_background_reader_raises_read_errors():
+    """Test that an error while reading ends the input by being raised, not silently."""
+    def chunks():
+        yield "partial"
+        raise OSError("read failed")
+
+    reader = BackgroundReader(chunks())
+    received = []
+    with pytest.raises(OSError, match="read failed"):
+        while not reader.done:
+            received.extend(reader.poll(timeout=None))
+
+    assert reader.done
+    assert reader.poll() == []
+
+
+def test_iter_file_chunks(tmp_path):
+    """Test reading a file through a memory mapping, in small chunks."""
+    path = tmp_path / "input.txt"
+    path.write_bytes("héllo 世界\n".encode("utf-8") * 100)
+
+    chunks = list(iter_file_chunks(str(path), chunk_size=3))
+    assert "".join(chunks) == "héllo 世界\n" * 100
+    assert len(chunks) > 1
+
+    empty = tmp_path / "empty.txt"
+    empty.write_bytes(b"")
+    assert list(iter_file_chunks(str(empty))) == []
+
+    with pytest.raises(OSError):
+        iter_file_chunks(str(tmp_path / "missing.txt"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -3,13 +3,16 @@
 from __future__ import annotations
 
 import io
+import re
 import sys
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 from no_more_secrets.core.char_attr import CharAttr
+from no_more_secrets.core.clock import VirtualClock
 from no_more_secrets.core.colors import Colors
+from no_more_secrets.core.output import StreamBackend
 from no_more_secrets.core.charset import (
     get_random_char,
     get_random_char_excluding_control,
@@ -17,9 +20,35 @@ from no_more_secrets.core.charset import (
     get_random_extended_char,
     get_random_box_drawing_char,
 )
+from no_more_secrets.core.sgr import DEFAULT_STATE
+from no_more_secrets.effects.engine import create_engine
 from no_more_secrets.effects.nms_effect import NMSEffect
 
 
+def replay_screen(output):
+    """Replay cursor moves, clears and styles into the final screen.
+
+    Returns:
+        Dictionary mapping 1-based (row, column) to the character drawn
+        there last and the style it was drawn with.
+    """
+    screen = {}
+    state = DEFAULT_STATE
+    row = column = 1
+    for match in re.finditer(r'\033\[([0-?]*)([ -/]*[@-~])|(.)', output, re.DOTALL):
+        params, final, char = match.groups()
+        if char is not None:
+            screen[(row, column)] = (char, state)
+            column += 1
+        elif final == "m":
+            state = state.apply(match.group())
+        elif final == "H":
+            row, column = [int(value or 1) for value in (params.split(";") + [""])[:2]]
+        elif final == "J":
+            screen.clear()
+    return screen
+
+
 class TestNMSEffect:
     """Test the main NMS effect class."""
     
@@ -117,6 +146,54 @@ class TestNMSEffect:
         effect.set_preserve_colors(False)
         assert not effect.preserve_colors
     
+    def test_set_fps_and_speed(self):
+        """Test setting frame rate and speed multiplier."""
+        effect = NMSEffect()
+        
+        effect.set_fps(60)
+        effect.set_speed(2.5)
+        assert effect.fps == 60
+        assert effect.speed == 2.5
+        
+        # Invalid values fall back to defaults
+        with patch('sys.stderr', new_callable=io.StringIO):
+            effect.set_fps(0)
+            effect.set_speed(-1)
+        assert effect.fps == 30
+        assert effect.speed == 1.0
+    
+    def test_type_duration(self):
+        """Test the typewriter phase duration."""
+        effect = NMSEffect()
+        
+        # Derived from text length and capped by default
+        assert effect.type_duration_ms(100) == 400
+        assert effect.type_duration_ms(100_000) == 2000
+        
+        effect.set_type_duration(1.5)
+        assert effect.type_duration_ms(100_000) == 1500
+        
+        # Other setters leave the duration alone
+        effect.set_speed(2.0)
+        effect.set_scrollback(10)
+        assert effect.type_duration == 1.5
+        
+        with patch('sys.stderr', new_callable=io.StringIO):
+            effect.set_type_duration(-1)
+        assert effect.type_duration is None
+    
+    def test_set_churn_rate(self):
+        """Test setting how often masks change."""
+        effect = NMSEffect()
+        assert 3.6 < effect.churn_rate < 3.7
+        
+        effect.set_churn_rate(0)
+        assert effect.churn_rate == 0
+        
+        with patch('sys.stderr', new_callable=io.StringIO):
+            effect.set_churn_rate(-2)
+        assert 3.6 < effect.churn_rate < 3.7
+    
     def test_set_charset_mode(self):
         """Test setting charset mode."""
         effect = NMSEffect()
@@ -264,6 +341,51 @@ class TestNMSEffect:
         if effect.preserve_colors:
             assert dot_attr.original_color == "\033[1;34m"
     
+    def test_parse_chunks_with_split_escape(self):
+        """Test parsing a stream whose escape sequence spans two chunks."""
+        effect = NMSEffect()
+        effect.set_preserve_colors(True)
+        
+        effect._start_stream()
+        first = effect._parse_chunk("ab\033[1;3")
+        second = effect._parse_chunk("1mcd\033[0mef", final=True)
+        
+        assert [attr.source for attr in first] == ["a", "b"]
+        assert [attr.source for attr in second] == list("cdef")
+        assert second[0].original_color == "\033[1;31m"
+        assert second[3].original_color == ""
+        assert effect.saw_ansi
+    
+    def test_parse_repairs_encoding_and_many_escapes(self):
+        """Test that parsing repairs mojibake and handles escape-heavy text."""
+        effect = NMSEffect()
+        effect.set_preserve_colors(True)
+        
+        char_attrs = effect.parse_ansi_text("Γö£ΓöÇΓöÇ a\n\033[32mâ\"\"â\"€â\"€ \033b")
+        assert "".join(attr.source for attr in char_attrs) == "├── a\n└── \033b"
+        assert char_attrs[6].original_color == "\033[32m"
+        assert char_attrs[5].is_space and char_attrs[5].mask == "\n"
+        
+        text = "\033[31mx\033[0m " * 5000
+        char_attrs = effect.parse_ansi_text(text)
+        assert len(char_attrs) == 10_000
+        assert char_attrs[0].original_color == "\033[31m"
+        assert char_attrs[1].original_color == ""
+    
+    def test_parse_stacked_sgr_sequences(self):
+        """Test that consecutive SGR sequences combine into one style."""
+        effect = NMSEffect()
+        effect.set_preserve_colors(True)
+        
+        char_attrs = effect.parse_ansi_text("\033[1m\033[34ma\033[22mb\033[Kc\033[0md")
+        
+        assert "".join(attr.source for attr in char_attrs) == "abcd"
+        assert char_attrs[0].original_color == "\033[1;34m"
+        assert char_attrs[1].original_color == "\033[34m"
+        assert char_attrs[2].original_color == "\033[34m"  # erase line is not a style
+        assert char_attrs[3].original_color == ""
+        assert len(char_attrs.styles) == 3
+    
     def test_clustering_effect(self):
         """Test that clustering is applied to character attributes."""
         effect = NMSEffect()
@@ -318,10 +440,10 @@ class TestNMSEffect:
     
     @patch('no_more_secrets.effects.nms_effect.enable_ansi_colors')
     @patch('sys.stdout')
-    @patch('time.sleep')
-    def test_execute_basic(self, mock_sleep, mock_stdout, mock_enable_ansi):
+    def test_execute_basic(self, mock_stdout, mock_enable_ansi):
         """Test basic execution of the effect."""
         effect = NMSEffect()
+        effect.set_clock(VirtualClock())
         effect.set_auto_decrypt(True)  # Skip keypress waiting
         
         with patch.object(effect, '_wait_for_keypress'):
@@ -333,10 +455,10 @@ class TestNMSEffect:
     
     @patch('no_more_secrets.effects.nms_effect.enable_ansi_colors')
     @patch('sys.stdout')
-    @patch('time.sleep')
-    def test_execute_with_charset_modes(self, mock_sleep, mock_stdout, mock_enable_ansi):
+    def test_execute_with_charset_modes(self, mock_stdout, mock_enable_ansi):
         """Test execution with different charset modes."""
         effect = NMSEffect()
+        effect.set_clock(VirtualClock())
         effect.set_auto_decrypt(True)
         
         for mode in ["full", "printable", "box_drawing"]:
@@ -345,6 +467,73 @@ class TestNMSEffect:
                 result = effect.execute("Test")
                 assert result == ""
     
+    @patch('no_more_secrets.effects.nms_effect.enable_ansi_colors')
+    @patch('no_more_secrets.core.terminal.Terminal.get_size', return_value=(3, 20))
+    def test_execute_viewport(self, mock_get_size, mock_enable_ansi):
+        """Test that long input is drawn inside the screen and scrolled."""
+        effect = NMSEffect()
+        effect.set_clock(VirtualClock())
+        effect.set_auto_decrypt(True)
+        effect.set_speed(1000)
+        
+        text = "\n".join(f"line {n}" for n in range(10))
+        with patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            with patch.object(effect, '_wait_for_keypress'):
+                effect.execute(text)
+            output = mock_stdout.getvalue()
+        
+        rows = [int(row) for row in re.findall(r'\033\[(\d+);\d+H', output)]
+        assert rows
+        assert max(rows) <= 3
+        # The last page ends with the last line revealed in the chosen color;
+        # styles carry over cursor moves, so check the screen left behind
+        assert replay_screen(output)[(3, 6)] == ("9", DEFAULT_STATE.apply("\033[1;34m"))
+    
+    @patch('no_more_secrets.effects.nms_effect.enable_ansi_colors')
+    @patch('no_more_secrets.core.terminal.Terminal.get_size', return_value=(3, 20))
+    def test_execute_stream_drops_old_pages(self, mock_get_size, mock_enable_ansi):
+        """Test that a long input is read and kept only a few pages at a time."""
+        effect = NMSEffect()
+        effect.set_clock(VirtualClock())
+        effect.set_auto_decrypt(True)
+        effect.set_speed(1000)
+        
+        stores = []
+        sizes = []
+        def spy(effect, cells):
+            stores.append(cells)
+            sizes.append(len(cells))
+            return create_engine(effect, cells)
+        
+        lines = [f"line {n}\n" for n in range(200)]
+        with patch('sys.stdout', new_callable=io.StringIO):
+            with patch.object(effect, '_wait_for_keypress'):
+                with patch('no_more_secrets.effects.nms_effect.create_engine', side_effect=spy):
+                    effect.execute_stream(iter(lines))
+        
+        # Each page starts a new engine on only the rows still needed
+        assert len(sizes) > 10
+        assert max(sizes) < 40 * len(lines[0])
+        last = stores[-1]
+        assert last.text().endswith("line 199\n")
+        assert all(cell.is_revealed or cell.is_space for cell in last)
+    
+    def test_virtual_clock_runs_are_repeatable(self):
+        """Test that a seeded run on a virtual clock always draws the same frames."""
+        outputs = []
+        for _ in range(2):
+            stream = io.BytesIO()
+            effect = NMSEffect()
+            effect.set_backend(StreamBackend(stream, rows=5, cols=30))
+            effect.set_clock(VirtualClock())
+            effect.set_seed(7)
+            effect.set_auto_decrypt(True)
+            effect.execute("The quick brown fox\njumps over the lazy dog")
+            outputs.append(stream.getvalue())
+        
+        assert outputs[0] == outputs[1]
+        assert outputs[0].endswith(Colors.SCREEN_RESTORE.encode())
+    
     @patch('no_more_secrets.core.terminal.Terminal.get_platform')
     @patch('time.sleep')
     def test_wait_for_keypress_windows(self, mock_sleep, mock_get_platform):
@@ -438,6 +627,37 @@ class TestNMSEffect:
         for attr in char_attrs:
             assert attr.width >= 1
     
+    def test_mojibake_split_across_chunks(self):
+        """Test that mojibake cut off at the end of a chunk is still repaired."""
+        effect = NMSEffect()
+        effect._start_stream()
+        cells = effect._parse_chunk("a Γö£Γö")
+        cells.extend(effect._parse_chunk("ÇΓöÇ b", final=True))
+        assert "".join(cell.source for cell in cells) == "a ├── b"
+    
+    def test_set_encoding_fixes(self):
+        """Test extra replacements and the fallback for invalid ones."""
+        effect = NMSEffect()
+        effect.set_encoding_fixes({"Ã©": "é"})
+        assert "".join(cell.source for cell in effect.prepare_text("cafÃ© Γöé")) == "café │"
+        
+        with patch('sys.stderr', new_callable=io.StringIO) as mock_stderr:
+            effect.set_encoding_fixes({"": "x"})
+        assert "ERROR" in mock_stderr.getvalue()
+        assert "".join(cell.source for cell in effect.prepare_text("cafÃ©")) == "cafÃ©"
+    
+    def test_grapheme_clusters(self):
+        """Test that multi-code-point characters become one cell each."""
+        effect = NMSEffect()
+        effect.set_preserve_colors(True)
+        family = "\U0001f468\u200d\U0001f469\u200d\U0001f467"
+        cells = effect.prepare_text(f"e\u0301 \033[31m{family}\033[0m\U0001f1eb\U0001f1f7!")
+        
+        assert [cell.source for cell in cells] == ["e\u0301", " ", family, "\U0001f1eb\U0001f1f7", "!"]
+        assert [cell.width for cell in cells] == [1, 1, 2, 2, 1]
+        assert cells[2].original_color == "\033[31m"
+        assert cells[3].original_color == ""
+    
     def test_reveal_time_clustering(self):
         """Test that reveal time clustering works correctly."""
         effect = NMSEffect()
@@ -0,0 +1,98 @@
+"""Tests for the screen-normalization pre-pass."""
+
+from __future__ import annotations
+
+import pytest
+
+from no_more_secrets.utils.normalize import MAX_COLUMNS, VirtualScreen, normalize_screen
+
+
+def test_carriage_returns_keep_last_state():
+    """Test that a redrawn progress line collapses to its final state."""
+    text = "".join(f"\rDownloading {i:3d}%" for i in range(0, 101, 10)) + "\ndone\n"
+
+    assert normalize_screen(text) == "Downloading 100%\ndone\n"
+
+
+def test_backspace_and_tabs():
+    """Test that backspaces overwrite and tabs move to the next stop."""
+    assert normalize_screen("abc\b\bX") == "aXc"
+    assert normalize_screen("ab\tc") == "ab      c"
+    assert normalize_screen("abcdefgh\r\tX") == "abcdefghX"
+
+
+def test_cursor_moves_and_erase():
+    """Test CSI cursor movement and erase sequences."""
+    # Multi-line progress display redrawn in place, as docker pull does
+    text = "layer1: 10%\nlayer2: 5%\n\033[2A\033[2Klayer1: done\n\033[Klayer2: done\n"
+    assert normalize_screen(text) == "layer1: done\nlayer2: done\n"
+
+    assert normalize_screen("hello\033[3D\033[Kp!") == "hep!"
+    assert normalize_screen("abc\033[5GX") == "abc X"
+    assert normalize_screen("one\ntwo\033[1;2HX") == "oXe\ntwo"
+    assert normalize_screen("old\nstuff\033[2J\033[Hnew") == "new"
+    assert normalize_screen("abcdef\033[3G\033[1K") == "   def"
+
+    # Moves stop at the last row and at the column limit
+    assert normalize_screen("a\033[5Bb") == "ab"
+    screen = VirtualScreen()
+    screen.feed("\033[99999C")
+    assert screen.col == MAX_COLUMNS
+
+
+def test_colors_survive_overwrites():
+    """Test that colors of the final screen are kept as SGR sequences."""
+    text = "\033[1m\033[31mfail\033[0m\r\033[32mok\033[0m"
+
+    assert normalize_screen(text) == "\033[32mok\033[0;1;31mil\033[0m"
+
+
+def test_escape_split_across_chunks():
+    """Test that an escape sequence cut off between chunks is not lost."""
+    assert normalize_screen(["50%\033[", "2K\rdone"]) == "done"
+    assert normalize_screen(["a\033]0;title", "\007b"]) == "ab"
+
+
+def test_other_controls_are_dropped():
+    """Test that bells, private modes and titles leave no cells."""
+    assert normalize_screen("\033[?25la\007b\033]0;title\007c\033(Bd") == "abcd"
+
+
+def test_private_and_sub_parameters():
+    """Test that private, intermediate and colon parameters neither crash nor show."""
+    assert normalize_screen("a\033[1?mb\n") == "ab\n"
+    assert normalize_screen("a\033[>4;2mb\033[=1uc\033[2 qd") == "abcd"
+    assert normalize_screen(["a\033[>", "4;2mb"]) == "ab"
+
+    # Sub-parameters are ignored, except for extended colors
+    assert normalize_screen("a\033[4:3mb\033[m") == "a\033[4mb\033[0m"
+    assert normalize_screen("a\033[38:2::255:0:0mb\033[m") == "a\033[38;2;255;0;0mb\033[0m"
+    assert normalize_screen("abc\033[2:1Dd") == "adc"
+
+
+def test_wide_characters():
+    """Test that wide characters take two columns."""
+    assert normalize_screen("世界\r x") == " x界"
+
+
+def test_fixed_height_screen():
+    """Test that a screen of fixed height scrolls and keeps its rows."""
+    screen = VirtualScreen(rows=3)
+    screen.feed("a\nb\nc\nd")
+    assert screen.text() == "b\nc\nd"
+
+    screen.feed("\033[1S")
+    assert screen.text() == "c\nd\n"
+
+    screen.feed("\033[2J\033[3;1Hz")
+    assert screen.text() == "\n\nz"
+
+
+def test_grapheme_clusters():
+    """Test that a cluster of several code points takes the cells of one character."""
+    assert normalize_screen("e\u0301x\r\033[1Cy") == "e\u0301y"
+    assert normalize_screen("\U0001f468\u200d\U0001f469x\r\033[2Cy") == "\U0001f468\u200d\U0001f469y"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,94 @@
+"""Tests for the output backends."""
+
+from __future__ import annotations
+
+import io
+from unittest.mock import patch
+
+import pytest
+
+from no_more_secrets.core.frame_writer import FrameWriter
+from no_more_secrets.core.output import HeadlessBackend, StreamBackend, TerminalBackend
+from no_more_secrets.effects.nms_effect import NMSEffect
+
+
+def test_terminal_backend_writes_to_fd(tmp_path):
+    """Test that the terminal backend writes a frame to the descriptor."""
+    path = tmp_path / "out.bin"
+    with open(path, "w", encoding="utf-8") as stream:
+        writer = FrameWriter(backend=TerminalBackend(stream))
+        writer.write("\033[1;1Hhé")
+        writer.flush()
+
+    assert path.read_bytes() == "\033[1;1Hhé".encode("utf-8")
+    assert writer.frame_syscalls == 1
+
+
+def test_stream_backend():
+    """Test that frames go to a binary stream in one write each."""
+    stream = io.BytesIO()
+    backend = StreamBackend(stream, rows=5, cols=10)
+    writer = FrameWriter(backend=backend)
+    writer.write("héllo")
+    writer.flush()
+    writer.write(" world")
+    writer.flush()
+
+    assert backend.get_size() == (5, 10)
+    assert stream.getvalue() == "héllo world".encode("utf-8")
+    assert writer.total_syscalls == 2
+
+
+def test_headless_backend_keeps_screen():
+    """Test that frames are replayed onto a screen in memory."""
+    backend = HeadlessBackend(rows=2, cols=10)
+    writer = FrameWriter(backend=backend)
+    writer.write("\033[2J\033[1;1Hab\033[2;1H\033[31mcd\033[0m")
+    writer.flush()
+
+    assert backend.text() == "ab\n\033[31mcd\033[0m"
+    assert backend.frames == 1
+    assert writer.total_syscalls == 0
+
+
+def test_headless_backend_keeps_clusters():
+    """Test that grapheme clusters read back as written, one or two cells each."""
+    text = "e\u0301 \U0001f468\u200d\U0001f469\u200d\U0001f467 \U0001f1ef\U0001f1f5"
+    backend = HeadlessBackend(rows=1, cols=20)
+    writer = FrameWriter(backend=backend)
+    writer.write(text + "\033[1;8H!")
+    writer.flush()
+
+    assert backend.text() == text + "!"
+
+
+def test_headless_backend_without_screen():
+    """Test that a headless backend can just count what it is sent."""
+    backend = HeadlessBackend(keep_screen=False)
+    writer = FrameWriter(backend=backend)
+    writer.write("abc")
+    writer.flush()
+
+    assert backend.text() == ""
+    assert backend.total_bytes == 3
+
+
+@patch('time.sleep')
+def test_effect_renders_headless(mock_sleep):
+    """Test that the effect runs on a headless screen without waiting."""
+    backend = HeadlessBackend(rows=3, cols=20)
+    effect = NMSEffect()
+    effect.set_backend(backend)
+
+    text = "\n".join(f"line {n}" for n in range(10))
+    effect.execute(text)
+
+    mock_sleep.assert_not_called()
+    assert backend.frames > 1
+    assert effect.frame_writer.backend is backend
+    # The last page is left revealed in the default color
+    assert "\033[1;34m9\033[0m" in backend.text()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
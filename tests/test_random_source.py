@@ -0,0 +1,69 @@
+"""Tests for the seedable random source."""
+
+from __future__ import annotations
+
+import pytest
+
+from no_more_secrets.core.random_source import RandomSource
+from no_more_secrets.effects.nms_effect import NMSEffect
+
+
+def test_same_seed_same_values():
+    """Test that two sources with one seed draw the same values."""
+    first = RandomSource(42)
+    second = RandomSource(42)
+
+    assert first.choices("abcdef", 20) == second.choices("abcdef", 20)
+    assert first.randints(1000, 6000, 20) == second.randints(1000, 6000, 20)
+    assert first.hits(1000, 0.1) == second.hits(1000, 0.1)
+
+
+def test_randints_range():
+    """Test that integers stay within the inclusive range."""
+    values = RandomSource(1).randints(-2, 2, 500)
+
+    assert set(values) == {-2, -1, 0, 1, 2}
+
+
+def test_hits():
+    """Test picking indices with a fixed chance each."""
+    source = RandomSource(7)
+
+    assert source.hits(100, 0) == []
+    assert source.hits(5, 1) == [0, 1, 2, 3, 4]
+
+    picked = source.hits(100_000, 0.2)
+    assert picked == sorted(set(picked))
+    assert all(0 <= index < 100_000 for index in picked)
+    assert 19_000 < len(picked) < 21_000
+
+
+def test_exponentials_mean():
+    """Test that waiting times are positive with the requested mean."""
+    delays = RandomSource(5).exponentials(200.0, 20_000)
+
+    assert all(delay >= 0 for delay in delays)
+    assert 190 < sum(delays) / len(delays) < 210
+
+
+def test_choice_from_pool():
+    """Test that single picks come from the pool."""
+    source = RandomSource(3)
+
+    assert {source.choice("xyz") for _ in range(100)} == set("xyz")
+
+
+def test_seeded_effect_repeats_masks():
+    """Test that a seeded effect prepares the same masks and reveal times."""
+    runs = []
+    for _ in range(2):
+        effect = NMSEffect()
+        effect.set_seed(1234)
+        cells = effect.prepare_text("Hello, seeded world")
+        runs.append([(cell.mask, cell.reveal_time) for cell in cells])
+
+    assert runs[0] == runs[1]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,98 @@
+"""Tests for the frame scheduler."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+from no_more_secrets.core.clock import VirtualClock
+from no_more_secrets.core.scheduler import FrameScheduler
+
+
+class FakeTime:
+    """Monotonic clock whose sleeps can overshoot by a fixed amount."""
+
+    def __init__(self, oversleep: float = 0.0) -> None:
+        self.now = 100.0
+        self.oversleep = oversleep
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds + self.oversleep
+
+
+@pytest.fixture
+def fake_time():
+    """Patch the time module used by the scheduler."""
+    clock = FakeTime(oversleep=0.002)
+    with patch('time.monotonic', clock.monotonic), patch('time.sleep', clock.sleep):
+        yield clock
+
+
+def test_tick_returns_real_elapsed_time(fake_time):
+    """Test that simulated time follows the clock, not the frame count."""
+    scheduler = FrameScheduler(fps=20)
+    scheduler.start()
+
+    fake_time.now += 0.2  # A slow 200 ms frame
+    delta = scheduler.tick()
+
+    assert delta == pytest.approx(200.0)
+    assert fake_time.sleeps == []  # Already late, no sleep
+
+
+def test_sleep_drift_is_compensated(fake_time):
+    """Test that oversleeping shortens the following sleep."""
+    scheduler = FrameScheduler(fps=20)
+    scheduler.start()
+
+    for _ in range(10):
+        scheduler.tick()
+
+    # Ten frames at 50 ms should end up at 500 ms despite 2 ms oversleeps
+    assert scheduler.elapsed_ms == pytest.approx(502.0)
+    assert fake_time.sleeps[1] == pytest.approx(0.048)
+
+
+def test_speed_multiplier(fake_time):
+    """Test that speed scales simulated time."""
+    scheduler = FrameScheduler(fps=10, speed=2.0)
+    scheduler.start()
+    fake_time.now += 0.1
+
+    assert scheduler.tick() == pytest.approx(200.0)
+
+
+def test_tick_skips_idle_frames(fake_time):
+    """Test that several frame slots can be waited for at once."""
+    fake_time.oversleep = 0.0
+    scheduler = FrameScheduler(fps=20, speed=2.0)
+    scheduler.start()
+
+    assert scheduler.frame_ms == pytest.approx(100.0)
+    delta = scheduler.tick(frames=5)
+
+    assert fake_time.sleeps == [pytest.approx(0.25)]
+    assert delta == pytest.approx(500.0)
+
+
+def test_virtual_clock_never_sleeps(fake_time):
+    """Test that a scheduler on a virtual clock advances by whole frames."""
+    clock = VirtualClock()
+    scheduler = FrameScheduler(fps=20, speed=2.0, clock=clock)
+    scheduler.start()
+
+    assert scheduler.tick() == pytest.approx(100.0)
+    assert scheduler.tick(3) == pytest.approx(300.0)
+    assert scheduler.elapsed_ms == pytest.approx(400.0)
+    assert clock.now == pytest.approx(0.2)
+    assert fake_time.sleeps == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
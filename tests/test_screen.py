@@ -0,0 +1,190 @@
+"""Tests for screen buffers and the diff renderer."""
+
+from __future__ import annotations
+
+import pytest
+
+from no_more_secrets.core.cell_store import CellStore
+from no_more_secrets.core.char_attr import CharAttr
+from no_more_secrets.core.screen import (
+    BLANK,
+    CONTINUATION,
+    DiffRenderer,
+    Layout,
+    ScreenBuffer,
+    layout_cells,
+)
+
+
+def make_attrs(text: str) -> list[CharAttr]:
+    """Build plain character attributes for layout tests."""
+    return [CharAttr(c, c, 2 if c == '世' else 1, c.isspace(), 1000) for c in text]
+
+
+def test_layout_newlines_and_wrapping():
+    """Test that layout follows newlines and wraps at the last column."""
+    positions, rows = layout_cells(make_attrs("ab\ncdef"), cols=3)
+
+    assert positions[0] == (0, 0, 1)
+    assert positions[1] == (0, 1, 1)
+    assert positions[2] is None  # newline
+    assert positions[3] == (1, 0, 1)
+    assert positions[6] == (2, 0, 1)  # 'f' wrapped
+    assert rows == 3
+
+
+def test_layout_tabs_and_wide_chars():
+    """Test tab stops, wide characters and skipped control characters."""
+    positions, rows = layout_cells(make_attrs("a\tb\r世"), cols=80)
+
+    assert positions[1] == (0, 1, 7)
+    assert positions[2] == (0, 8, 1)
+    assert positions[3] is None  # carriage return
+    assert positions[4] == (0, 9, 2)
+    assert rows == 1
+
+
+def test_layout_incremental_rows():
+    """Test that layout can be extended and maps rows to character ranges."""
+    layout = Layout(cols=4)
+    cells = make_attrs("ab\ncd") + make_attrs("efg\nh")
+    layout.extend(cells[:5])
+    layout.extend(cells[5:])
+
+    assert layout.rows == 4
+    assert list(layout.row_starts) == [0, 3, 7, 9]
+    positions = {index: (row, col, span) for index, row, col, span in layout.place(cells, 0, 10)}
+    assert positions[5] == (1, 2, 1)  # 'e' continues row 1
+    assert positions[7] == (2, 0, 1)  # 'g' wrapped
+    assert 2 not in positions  # newline
+
+    assert layout.cell_range(0, 1) == (0, 3)
+    assert layout.cell_range(1, 3) == (3, 9)
+    assert layout.cell_range(2, 10) == (7, 10)
+    assert layout.cell_range(5, 10) == (10, 10)
+
+
+@pytest.mark.parametrize("text", ["ab\ncdef\n\nghijklmnop", "abc", "\n\n", "abcd\nefgh"])
+def test_layout_plain_text_matches_general_path(text):
+    """Test that the ASCII fast path wraps like the per-character path."""
+    store = CellStore.from_attrs(make_attrs(text))
+    fast = Layout(cols=4)
+    fast.extend(store.slice(0, 2))
+    fast.extend(store.slice(2, len(store)))
+    general = Layout(cols=4)
+    general.extend(make_attrs(text)[:2])
+    general.extend(make_attrs(text)[2:])
+
+    assert list(fast.row_starts) == list(general.row_starts)
+    assert (fast.size, fast._col) == (general.size, general._col)
+
+
+def test_layout_place_from_middle_of_row():
+    """Test that placing a range that starts mid-row keeps its columns."""
+    cells = make_attrs("a\tbcdefghij")
+    layout = Layout(cols=10)
+    layout.extend(cells)
+
+    placed = list(layout.place(cells, 2, 5))
+    assert placed == [(2, 0, 8, 1), (3, 0, 9, 1), (4, 1, 0, 1)]
+
+
+def test_layout_drop_rows():
+    """Test that dropping rows renumbers the rest as if laid out alone."""
+    store = CellStore.from_attrs(make_attrs("ab\ncdefg\nh"))
+    layout = Layout(cols=4)
+    layout.extend(store)
+
+    assert layout.drop_rows(2) == 7
+    store.drop_front(7)
+    assert list(layout.row_starts) == [0, 2]
+    assert list(layout.place(store, 0, len(store))) == [(0, 0, 0, 1), (2, 1, 0, 1)]
+    layout.extend(make_attrs("ij"))
+    assert layout.size == 5
+
+    # The last row is always kept
+    assert layout.drop_rows(5) == 2
+    assert layout.rows == 1
+
+
+def test_screen_buffer_put_wide():
+    """Test that wide characters mark their right half as a continuation."""
+    screen = ScreenBuffer(2, 4)
+    screen.put(0, 1, '世', '', 2)
+
+    assert screen.cells[0][1] == ('世', '', 2)
+    assert screen.cells[0][2] == CONTINUATION
+
+    # Out of range writes are ignored
+    screen.put(5, 5, 'x')
+    screen.clear()
+    assert all(cell == BLANK for line in screen.cells for cell in line)
+
+
+def test_render_only_changed_cells():
+    """Test that a second render only emits cells that changed."""
+    renderer = DiffRenderer(2, 10)
+    for col, char in enumerate("hello"):
+        renderer.back.put(0, col, char)
+
+    first = renderer.render()
+    assert first == "\033[1;1Hhello"
+
+    # Nothing changed, nothing emitted
+    assert renderer.render() == ""
+
+    renderer.back.put(0, 4, 'O', '\033[1;34m')
+    renderer.back.put(1, 2, 'z')
+    second = renderer.render()
+    assert second == "\033[1;5H\033[1;34mO\033[0m\033[2;3Hz"
+
+
+def test_render_adjacent_cells_skip_cursor_moves():
+    """Test that consecutive changed cells share one cursor move."""
+    renderer = DiffRenderer(1, 10)
+    renderer.back.put(0, 3, 'a')
+    renderer.back.put(0, 4, '世', '', 2)
+    renderer.back.put(0, 6, 'b')
+
+    assert renderer.render() == "\033[1;4Ha世b"
+
+
+def test_render_emits_style_once_per_run():
+    """Test that a run of cells in one style shares one escape sequence."""
+    renderer = DiffRenderer(2, 10)
+    for col, char in enumerate("abc"):
+        renderer.back.put(0, col, char, '\033[31m')
+    renderer.back.put(0, 3, 'd', '\033[1;32m')
+    renderer.back.put(1, 0, 'e', '\033[1;32m')
+
+    assert renderer.render() == "\033[1;1H\033[31mabc\033[0;1;32md\033[2;1He\033[0m"
+
+
+def test_scroll_shifts_front_buffer():
+    """Test that scrolling moves on-screen rows instead of redrawing them."""
+    renderer = DiffRenderer(3, 2)
+    for row, char in enumerate("abc"):
+        renderer.back.put(row, 0, char)
+    renderer.render()
+
+    assert renderer.scroll(1) == "\033[1S"
+
+    # Redrawing the shifted content only emits the new bottom row
+    renderer.back.clear()
+    for row, char in enumerate("bcd"):
+        renderer.back.put(row, 0, char)
+    assert renderer.render() == "\033[3;1Hd"
+    assert renderer.scroll(0) == ""
+
+
+def test_invalidate_forces_redraw():
+    """Test that invalidate causes a full redraw of the back buffer."""
+    renderer = DiffRenderer(1, 3)
+    renderer.render()
+    renderer.invalidate()
+
+    assert renderer.render() == "\033[1;1H   "
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
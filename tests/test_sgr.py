@@ -0,0 +1,73 @@
+"""Tests for SGR state tracking."""
+
+from __future__ import annotations
+
+import pytest
+
+from no_more_secrets.core.sgr import BOLD, DEFAULT_STATE, UNDERLINE, SgrState, switch_style
+
+
+def test_stacked_sequences_combine():
+    """Test that separate attribute and color sequences add up."""
+    state = DEFAULT_STATE.apply("\033[1m").apply("\033[34m").apply("\033[4m")
+
+    assert state.attributes == BOLD | UNDERLINE
+    assert state.fg == "34"
+    assert state.sequence == "\033[1;4;34m"
+
+
+def test_resets_and_attribute_off():
+    """Test full resets, attribute-off codes and default colors."""
+    state = DEFAULT_STATE.apply("\033[1;2;31;44m")
+
+    assert state.apply("\033[22m").sequence == "\033[31;44m"
+    assert state.apply("\033[39;49m").sequence == "\033[1;2m"
+    assert state.apply("\033[0m") == DEFAULT_STATE
+    assert state.apply("\033[m") == DEFAULT_STATE
+    assert DEFAULT_STATE.sequence == ""
+
+
+def test_extended_colors():
+    """Test 256-color and truecolor parameters."""
+    state = DEFAULT_STATE.apply("\033[38;5;208;48;2;10;20;30m")
+
+    assert state.fg == "38;5;208"
+    assert state.bg == "48;2;10;20;30"
+    assert state.apply("\033[92m").fg == "92"
+
+    # Truncated extended colors and unknown codes are skipped
+    assert DEFAULT_STATE.apply("\033[38;2;1m") == DEFAULT_STATE
+    assert DEFAULT_STATE.apply("\033[53;1m").sequence == "\033[1m"
+
+
+def test_malformed_and_colon_parameters():
+    """Test that non-numeric parameters are skipped and colon forms are read."""
+    assert DEFAULT_STATE.apply("\033[1?;31m").sequence == "\033[31m"
+    assert DEFAULT_STATE.apply("\033[38;5;x;1m") == DEFAULT_STATE.apply("\033[1m")
+
+    assert DEFAULT_STATE.apply("\033[38:5:208m").fg == "38;5;208"
+    assert DEFAULT_STATE.apply("\033[48:2::10:20:30m").bg == "48;2;10;20;30"
+    assert DEFAULT_STATE.apply("\033[48:2:10:20:30m").bg == "48;2;10;20;30"
+    assert DEFAULT_STATE.apply("\033[4:3m").sequence == "\033[4m"
+    assert DEFAULT_STATE.apply("\033[4m").apply("\033[4:0m") == DEFAULT_STATE
+
+
+def test_equal_styles_are_equal_strings():
+    """Test that different ways to reach a style give one sequence."""
+    one = DEFAULT_STATE.apply("\033[31;1m")
+    other = DEFAULT_STATE.apply("\033[1m").apply("\033[32m").apply("\033[31m")
+
+    assert one == other
+    assert one.sequence == other.sequence == "\033[1;31m"
+    assert SgrState(BOLD, "31") == one
+
+
+def test_switch_style():
+    """Test the sequences emitted between styles."""
+    assert switch_style("", "\033[31m") == "\033[31m"
+    assert switch_style("\033[1;31m", "") == "\033[0m"
+    assert switch_style("\033[1;31m", "\033[32m") == "\033[0;32m"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,70 @@
+"""Tests for the timer wheel."""
+
+from __future__ import annotations
+
+import pytest
+
+from no_more_secrets.core.timer_wheel import TimerWheel
+
+
+def test_items_pop_once_due():
+    """Test that items are returned once their time has come, never early."""
+    wheel = TimerWheel(slot_ms=10)
+    wheel.schedule(1, 25)
+    wheel.schedule(2, 5)
+    wheel.schedule(3, 30)
+
+    assert len(wheel) == 3
+    assert wheel.next_due() == 10
+    assert wheel.pop_due(9) == []
+    assert wheel.pop_due(10) == [2]
+    assert wheel.pop_due(29) == []  # 25 fires at the end of its slot
+    assert sorted(wheel.pop_due(30)) == [1, 3]
+    assert len(wheel) == 0
+    assert wheel.next_due() is None
+
+
+def test_past_items_fire_on_next_pop():
+    """Test that items scheduled in the past are not lost."""
+    wheel = TimerWheel(slot_ms=10)
+    wheel.pop_due(100)
+    wheel.schedule(7, 0)
+
+    assert wheel.pop_due(105) == []
+    assert wheel.pop_due(110) == [7]
+
+
+def test_schedule_many_matches_schedule():
+    """Test that batch scheduling puts items in the same slots."""
+    single = TimerWheel(slot_ms=10)
+    batch = TimerWheel(slot_ms=10)
+    single.pop_due(20)
+    batch.pop_due(20)
+    due_times = [0, 25.5, 30, 31, 95]
+    for item, due_ms in enumerate(due_times):
+        single.schedule(item, due_ms)
+    batch.schedule_many(range(5), due_times)
+
+    assert len(batch) == 5
+    assert batch.next_due() == single.next_due() == 30
+    assert batch.pop_due(40) == single.pop_due(40) == [0, 1, 2, 3]
+    assert batch.pop_due(100) == single.pop_due(100) == [4]
+
+
+def test_far_jump_pops_everything_due():
+    """Test a pop far ahead of the cursor."""
+    wheel = TimerWheel(slot_ms=1)
+    for item in range(5):
+        wheel.schedule(item, item * 1000)
+    wheel.schedule(99, 10**7)
+
+    assert sorted(wheel.pop_due(10**6)) == [0, 1, 2, 3, 4]
+    assert len(wheel) == 1
+
+    wheel.clear()
+    assert len(wheel) == 0
+    assert wheel.pop_due(10**8) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])